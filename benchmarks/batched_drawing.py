@@ -0,0 +1,56 @@
+"""
+Compare the per-patch and batched matplotlib drawing paths of PatchBayLabelGenerator.
+
+Reports the number of artists each path creates and how long drawing and saving take.
+
+    python benchmarks/batched_drawing.py --blocks 500
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from patchbay_labels import PatchBayLabelGenerator  # noqa: E402
+from TT_labels_Color import labels_per_group  # noqa: E402
+
+
+def run(generator, blocks, batched):
+    start = time.perf_counter()
+    artists = 0
+    buffer = io.BytesIO()
+    fig_time = save_time = 0.0
+    for page in generator.layout_pages(len(blocks), blocks, paginate=True):
+        fig, ax = generator._new_page()
+        generator.draw_page(ax, page, batched=batched)
+        artists += len(ax.patches) + len(ax.collections) + len(ax.texts)
+        fig_time += time.perf_counter() - start
+        start = time.perf_counter()
+        fig.savefig(buffer, format='pdf')
+        save_time += time.perf_counter() - start
+        start = time.perf_counter()
+    return artists, fig_time, save_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--font', help='Path to the label font file (default: DejaVu Sans).')
+    parser.add_argument('--blocks', type=int, default=500, help='Number of blocks to render.')
+    args = parser.parse_args()
+
+    generator = PatchBayLabelGenerator(args.font)
+    blocks = (labels_per_group * (args.blocks // len(labels_per_group) + 1))[:args.blocks]
+
+    print(f'{args.blocks} blocks')
+    print(f'{"path":<10}{"artists":>10}{"layout+draw s":>16}{"save s":>10}')
+    for name, batched in (('patches', False), ('batched', True)):
+        artists, draw_time, save_time = run(generator, blocks, batched)
+        print(f'{name:<10}{artists:>10}{draw_time:>16.3f}{save_time:>10.3f}')
+
+
+if __name__ == '__main__':
+    main()
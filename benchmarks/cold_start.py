@@ -0,0 +1,55 @@
+"""
+Measure cold-start time of the patchbay-labels command line.
+
+Each command runs in a fresh interpreter several times and the fastest run is
+reported next to a bare ``python -c pass`` baseline. --help, validate and layout
+are expected to stay well under 100 ms because they never import matplotlib.
+
+    python benchmarks/cold_start.py --runs 10
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, ROOT)
+from TT_labels_Color import labels_per_group  # noqa: E402
+
+
+def best_of(command, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=ROOT, check=True, stdout=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10, help='Runs per command; the fastest is kept.')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        spec = os.path.join(directory, 'spec.json')
+        with open(spec, 'w') as handle:
+            json.dump(labels_per_group, handle)
+
+        cli = [sys.executable, '-m', 'patchbay_labels']
+        commands = [
+            ('python -c pass', [sys.executable, '-c', 'pass']),
+            ('--help', cli + ['--help']),
+            ('validate', cli + ['validate', spec]),
+            ('layout', cli + ['layout', spec, '--paginate']),
+        ]
+        print(f'{"command":<16}{"best ms":>10}')
+        for name, command in commands:
+            print(f'{name:<16}{best_of(command, args.runs):>10.1f}')
+
+
+if __name__ == '__main__':
+    main()
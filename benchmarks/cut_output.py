@@ -0,0 +1,59 @@
+"""
+Compare the SVG and HPGL print-and-cut engines with the PDF engines of PatchBayLabelGenerator.
+
+Renders synthetic studios (see suite.py) as paginated sheets, streaming the blocks from
+an iterator, and reports the time, output size and peak traced heap of every engine at
+each size. Peak heap should stay flat as the block count grows.
+
+    python benchmarks/cut_output.py --sizes 100,1000,5000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import matplotlib
+matplotlib.use('Agg')
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from patchbay_labels import PatchBayLabelGenerator  # noqa: E402
+from suite import synthesize  # noqa: E402
+
+EXTENSIONS = {'matplotlib': 'pdf', 'native': 'pdf', 'svg': 'svg', 'hpgl': 'plt'}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--font', help='Path to the label font file (default: DejaVu Sans).')
+    parser.add_argument('--sizes', default='100,1000,5000', help='Comma-separated block counts.')
+    parser.add_argument('--engines', default='native,svg,hpgl',
+                        help='Comma-separated engines; matplotlib is slow on large sizes.')
+    args = parser.parse_args()
+
+    generator = PatchBayLabelGenerator(args.font)
+    generator.font_file  # parse the font up front so it is not billed to the first run
+
+    print(f'{"engine":<12}{"blocks":>8}{"seconds":>10}{"bytes":>12}{"peak KB":>10}')
+    with tempfile.TemporaryDirectory() as directory:
+        for num_blocks in [int(size) for size in args.sizes.split(',')]:
+            blocks = synthesize(num_blocks)
+            for engine in args.engines.split(','):
+                output = os.path.join(directory, 'sheet.' + EXTENSIONS[engine])
+                generator.generate_labels(None, iter(blocks[:1]), output_file=output, paginate=True, engine=engine)
+
+                start = time.perf_counter()
+                generator.generate_labels(None, iter(blocks), output_file=output, paginate=True, engine=engine)
+                elapsed = time.perf_counter() - start
+
+                # Traced separately, as tracemalloc slows the render down several times
+                tracemalloc.start()
+                generator.generate_labels(None, iter(blocks), output_file=output, paginate=True, engine=engine)
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                print(f'{engine:<12}{num_blocks:>8}{elapsed:>10.3f}{os.path.getsize(output):>12}{peak / 1024:>10.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+Time lookups and renders from a patchbay inventory (patchbay_labels.inventory) as it grows.
+
+Builds a studio of synthetic bays (see suite.py) in a temporary SQLite file and reports
+the import time, the average time of a label lookup by text prefix and by bay and jack,
+next to a scan of the same label lists in Python, and the time to render one bay and
+the whole studio straight from the inventory with the native engine.
+
+    python benchmarks/inventory.py --bays 10,100,400
+"""
+import argparse
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from patchbay_labels import PatchBayLabelGenerator  # noqa: E402
+from patchbay_labels.inventory import Inventory  # noqa: E402
+from suite import synthesize  # noqa: E402
+
+BLOCKS_PER_BAY = 6  # a 48-point bay as six 8-point blocks
+LOOKUPS = 200
+
+
+def scan(studio, text, bay=None, jack=None):
+    """
+    The same lookup without the inventory: every label of every bay.
+    """
+    text = (text or '').lower()
+    found = []
+    for name, blocks in studio.items():
+        if bay is not None and name != bay:
+            continue
+        for position, labels in enumerate(blocks, 1):
+            for label in labels:
+                if label['text'].lower().startswith(text) and (
+                        jack is None or label['start'] <= jack < label['start'] + label['span']):
+                    found.append((name, position, label['text']))
+    return found
+
+
+def average(function, queries):
+    start = time.perf_counter()
+    for query in queries:
+        function(*query)
+    return (time.perf_counter() - start) / len(queries) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--font', help='Path to the label font file (default: DejaVu Sans).')
+    parser.add_argument('--bays', default='10,100,400', help='Comma-separated bay counts.')
+    args = parser.parse_args()
+
+    generator = PatchBayLabelGenerator(args.font)
+    generator.font_file  # parse the font up front so it is not billed to the first run
+
+    print(f'{"bays":>6}{"jacks":>8}{"labels":>8}{"import s":>10}{"text us":>10}{"scan us":>10}'
+          f'{"jack us":>10}{"scan us":>10}{"bay s":>8}{"all s":>8}')
+    with tempfile.TemporaryDirectory() as directory:
+        for num_bays in [int(size) for size in args.bays.split(',')]:
+            blocks = synthesize(num_bays * BLOCKS_PER_BAY)
+            studio = {'PATCHBAY %d' % (bay + 1): blocks[bay * BLOCKS_PER_BAY:(bay + 1) * BLOCKS_PER_BAY]
+                      for bay in range(num_bays)}
+            labels = sum(len(labels) for labels in blocks)
+            rng = random.Random(1)
+            # A device's label, as asked about ('which bay is TEAC 1-4 on?'), and what is on a jack
+            texts = [(rng.choice(rng.choice(blocks))['text'].lower(),) for _ in range(LOOKUPS)]
+            jacks = [(None, rng.choice(list(studio)), rng.randint(1, 8)) for _ in range(LOOKUPS)]
+
+            path = os.path.join(directory, 'studio-%d.db' % num_bays)
+            with Inventory(path) as inventory:
+                start = time.perf_counter()
+                for name, bay_blocks in studio.items():
+                    inventory.add_bay(name, bay_blocks)
+                imported = time.perf_counter() - start
+
+                text_lookup = average(inventory.find, texts)
+                text_scan = average(lambda text: scan(studio, text), texts)
+                jack_lookup = average(inventory.find, jacks)
+                jack_scan = average(lambda text, bay, jack: scan(studio, text, bay, jack), jacks)
+
+                start = time.perf_counter()
+                generator.generate_labels(None, inventory.blocks(bay='PATCHBAY %d' % num_bays),
+                                          output_file=io.BytesIO(), paginate=True, engine='native')
+                one_bay = time.perf_counter() - start
+                start = time.perf_counter()
+                generator.generate_labels(None, inventory.blocks(), output_file=io.BytesIO(), paginate=True,
+                                          engine='native')
+                everything = time.perf_counter() - start
+            print(f'{num_bays:>6}{len(blocks) * 16:>8}{labels:>8}{imported:>10.3f}{text_lookup:>10.0f}'
+                  f'{text_scan:>10.0f}{jack_lookup:>10.0f}{jack_scan:>10.0f}{one_bay:>8.3f}{everything:>8.3f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""
+Compare the vectorized sheet layout against the per-label dictionary loop it replaced.
+
+Both paths share the text-fitting cache, which is warmed first, so the timings show the
+geometry work alone. Peak memory is measured with tracemalloc while every page is held.
+
+    python benchmarks/layout_geometry.py --labels 100000
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from patchbay_labels import PatchBayLabelGenerator  # noqa: E402
+from patchbay_labels.text_fit import fit_text  # noqa: E402
+from TT_labels_Color import labels_per_group  # noqa: E402
+
+
+def dict_loop_layout(generator, num_groups, blocks, paginate):
+    """
+    The layout as it was before vectorizing: one loop iteration and a handful of tuples
+    per label, appended to per-page lists.
+    """
+    pages = []
+    page = None
+    top_y = generator.paper_height - generator.top_margin
+    current_x, current_y = generator.left_margin, top_y
+    bh = generator.block_height
+    tt = generator.tt_width
+
+    for group_index in range(num_groups):
+        if current_x + generator.block_width > generator.paper_width:
+            current_x = generator.left_margin
+            current_y -= bh * 2 + generator.vertical_spacing
+        if paginate and current_y < top_y and current_y - bh * 2 < generator.bottom_margin:
+            page = None
+            current_y = top_y
+        if page is None:
+            page = {'block_outlines': [], 'dots': [], 'fills': [], 'label_outlines': [], 'texts': []}
+            pages.append(page)
+
+        page['block_outlines'].append((current_x, current_y - bh, generator.block_width, bh))
+        for row in range(2):
+            for col in range(8):
+                page['dots'].append((current_x + col * tt + tt / 2, current_y - row * (bh / 2) - bh / 4))
+        label_block_y = current_y - bh * 2
+        page['block_outlines'].append((current_x, label_block_y, generator.block_width, bh))
+
+        for label in blocks[group_index]:
+            start = label['start'] - 1
+            start_x = current_x + (start % 8) * tt
+            end_x = current_x + ((start + label['span'] - 1) % 8) * tt + tt
+            width = end_x - start_x
+            if label['row'] == 'top':
+                label_y, rect_y, height = label_block_y + 0.75 * bh, label_block_y + bh / 2, bh / 2
+            elif label['row'] == 'bottom':
+                label_y, rect_y, height = label_block_y + 0.25 * bh, label_block_y, bh / 2
+            else:
+                label_y, rect_y, height = label_block_y + bh / 2, label_block_y, bh
+            wrapped, size = fit_text(generator.font_file, label['text'], width, height,
+                                     generator.font_size, generator.wrap_width)
+            if generator.colored and label.get('color') is not None:
+                page['fills'].append((start_x, rect_y, width, height, label['color']))
+            page['label_outlines'].append((start_x, rect_y, width, height))
+            page['texts'].append(((start_x + end_x) / 2, label_y, wrapped, size))
+
+        current_x += generator.block_width + generator.block_spacing
+    return pages
+
+
+def measure(layout):
+    gc.collect()
+    start = time.perf_counter()
+    pages = len(list(layout()))
+    seconds = time.perf_counter() - start
+
+    # Separate pass: tracemalloc slows allocation-heavy code down too much to time it
+    gc.collect()
+    tracemalloc.start()
+    list(layout())
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return pages, seconds, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--labels', type=int, default=100000, help='approximate number of labels to lay out')
+    parser.add_argument('--font', help='label font file (default: $PATCHBAY_LABELS_FONT or DejaVu Sans)')
+    args = parser.parse_args()
+
+    per_cycle = sum(len(block) for block in labels_per_group)
+    num_groups = -(-args.labels // per_cycle) * len(labels_per_group)
+    blocks = [labels_per_group[index % len(labels_per_group)] for index in range(num_groups)]
+    generator = PatchBayLabelGenerator(args.font)
+    label_count = sum(len(block) for block in blocks)
+
+    # Warm the font and the fitting cache so both paths measure geometry only
+    dict_loop_layout(generator, len(labels_per_group), labels_per_group, True)
+
+    print('%d blocks, %d labels, paginated' % (num_groups, label_count))
+    for name, layout in (
+        ('dict loop', lambda: dict_loop_layout(generator, num_groups, blocks, True)),
+        ('vectorized', lambda: generator.layout_pages(num_groups, blocks, paginate=True)),
+    ):
+        pages, seconds, peak = measure(layout)
+        print('%-11s %5d pages  %7.3f s  %6.1f MB peak  %5.2f us/label'
+              % (name, pages, seconds, peak / 1e6, seconds / label_count * 1e6))
+
+
+if __name__ == '__main__':
+    main()
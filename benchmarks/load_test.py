@@ -0,0 +1,110 @@
+"""
+Load-test the HTTP render service and report latency percentiles.
+
+Starts a local service on a free port (or targets --url), then sends --requests render
+requests from --concurrency client threads. Each request is a sheet of --blocks blocks
+with one label changed, so the worker caches only help with the unchanged blocks.
+Reports p50/p99 latency of successful renders, throughput, and how many requests were
+turned away with 503 because the queue was full.
+
+    python benchmarks/load_test.py --requests 200 --concurrency 8 --workers 4
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from TT_labels_Color import labels_per_group  # noqa: E402
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', help='running service to test (default: start one locally)')
+    parser.add_argument('--requests', type=int, default=200, help='total render requests')
+    parser.add_argument('--concurrency', type=int, default=8, help='client threads')
+    parser.add_argument('--blocks', type=int, default=20, help='blocks per requested sheet')
+    parser.add_argument('--query', default='engine=native', help='query string for every request')
+    parser.add_argument('--workers', type=int, help='worker processes of the local service')
+    parser.add_argument('--queue', type=int, default=16, help='queue size of the local service')
+    parser.add_argument('--font', help='label font file for the local service')
+    args = parser.parse_args()
+
+    service = None
+    url = args.url
+    if url is None:
+        from patchbay_labels.server import RenderService
+        start = time.perf_counter()
+        service = RenderService(port=0, workers=args.workers, queue_size=args.queue, font=args.font)
+        threading.Thread(target=service.serve_forever, daemon=True).start()
+        url = service.address
+        print('started %s with %d workers, queue %d in %.2f s'
+              % (url, service.workers, args.queue, time.perf_counter() - start))
+
+    blocks = [labels_per_group[index % len(labels_per_group)] for index in range(args.blocks)]
+    bodies = []
+    for number in range(args.requests):
+        sheet = json.loads(json.dumps(blocks))
+        sheet[number % len(sheet)][0]['text'] = 'REQ %d' % number
+        bodies.append(json.dumps(sheet).encode('utf-8'))
+
+    latencies = []
+    statuses = {}
+    lock = threading.Lock()
+    next_request = iter(range(args.requests))
+
+    def client():
+        while True:
+            with lock:
+                number = next(next_request, None)
+            if number is None:
+                return
+            request = urllib.request.Request('%s/render?%s' % (url, args.query), data=bodies[number],
+                                             headers={'Content-Type': 'application/json'})
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request) as response:
+                    response.read()
+                    status = response.status
+            except urllib.error.HTTPError as error:
+                error.read()
+                status = error.code
+            elapsed = time.perf_counter() - start
+            with lock:
+                statuses[status] = statuses.get(status, 0) + 1
+                if status == 200:
+                    latencies.append(elapsed)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(args.concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    if service is not None:
+        service.shutdown()
+
+    print('%d requests, %d clients, %d blocks per sheet, %s'
+          % (args.requests, args.concurrency, args.blocks, args.query))
+    print('status counts: %s' % ', '.join('%d x%d' % item for item in sorted(statuses.items())))
+    if latencies:
+        print('p50 %.1f ms  p99 %.1f ms  mean %.1f ms  max %.1f ms'
+              % (percentile(latencies, 0.5) * 1000, percentile(latencies, 0.99) * 1000,
+                 statistics.mean(latencies) * 1000, max(latencies) * 1000))
+    print('throughput %.1f renders/s' % (len(latencies) / elapsed))
+
+
+if __name__ == '__main__':
+    main()
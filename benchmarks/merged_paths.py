@@ -0,0 +1,57 @@
+"""
+Compare sheets drawn with and without merged outline edges and fills (merge_paths).
+
+Renders a synthetic studio (see suite.py) with both engines and reports the best of
+three times, the PDF size, and how many outline edges and fills the pages stroke and fill.
+
+    python benchmarks/merged_paths.py --blocks 500
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from patchbay_labels import PatchBayLabelGenerator  # noqa: E402
+from suite import synthesize  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--font', help='Path to the label font file (default: DejaVu Sans).')
+    parser.add_argument('--blocks', type=int, default=500, help='Number of blocks to render.')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed for the synthetic studio.')
+    args = parser.parse_args()
+
+    generator = PatchBayLabelGenerator(args.font)
+    generator.font_file  # parse the font up front so it is not billed to the first run
+    blocks = synthesize(args.blocks, args.seed)
+
+    print(f'{args.blocks} blocks, paginated')
+    print(f'{"engine":<12}{"merged":>8}{"edges":>10}{"fills":>8}{"seconds":>10}{"bytes":>12}')
+    for engine in ('matplotlib', 'native'):
+        for merge in (False, True):
+            generator.merge_paths = merge
+            edges = fills = 0
+            for page in generator.layout_pages(len(blocks), blocks, paginate=True):
+                if merge:
+                    edges += len(page.block_edges) + len(page.label_edges)
+                else:
+                    edges += len(page.block_outlines) * 4 + len(page.label_outlines) * 4
+                fills += len(page.fills)
+
+            elapsed = float('inf')
+            for _ in range(3):  # best of three, so caching the font subset is left out
+                buffer = io.BytesIO()
+                start = time.perf_counter()
+                generator.generate_labels(len(blocks), blocks, output_file=buffer, paginate=True, engine=engine)
+                elapsed = min(elapsed, time.perf_counter() - start)
+            print(f'{engine:<12}{str(merge):>8}{edges:>10}{fills:>8}{elapsed:>10.3f}{buffer.tell():>12}')
+
+
+if __name__ == '__main__':
+    main()
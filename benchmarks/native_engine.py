@@ -0,0 +1,41 @@
+"""
+Compare generation time of the matplotlib and native PDF engines of PatchBayLabelGenerator.
+
+    python benchmarks/native_engine.py --blocks 500
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from patchbay_labels import PatchBayLabelGenerator  # noqa: E402
+from TT_labels_Color import labels_per_group  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--font', help='Path to the label font file (default: DejaVu Sans).')
+    parser.add_argument('--blocks', type=int, default=500, help='Number of blocks to render.')
+    args = parser.parse_args()
+
+    generator = PatchBayLabelGenerator(args.font)
+    generator.font_file  # parse the font up front so it is not billed to the first run
+    blocks = (labels_per_group * (args.blocks // len(labels_per_group) + 1))[:args.blocks]
+
+    print(f'{args.blocks} blocks, paginated')
+    print(f'{"engine":<12}{"seconds":>10}{"bytes":>12}')
+    for engine in ('matplotlib', 'native'):
+        buffer = io.BytesIO()
+        start = time.perf_counter()
+        generator.generate_labels(len(blocks), blocks, output_file=buffer, paginate=True, engine=engine)
+        elapsed = time.perf_counter() - start
+        print(f'{engine:<12}{elapsed:>10.3f}{buffer.tell():>12}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+Time native renders of one large document with its pages drawn on worker processes.
+
+Writes synthetic studios (see suite.py) to JSON specs and renders each as a paginated
+sheet with the command line, once serially and once with ``-j`` for each worker count,
+every run in its own process. Reports the wall time, the speedup over the serial run
+and whether the PDF came out byte for byte the same as the serial one.
+
+    python benchmarks/parallel_pages.py --sizes 5000,20000 --workers 2,4,8
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, ROOT)
+from suite import synthesize  # noqa: E402
+
+
+def render(spec, output, font=None, workers=None):
+    """
+    Render ``spec`` with ``patchbay-labels render`` in a fresh process.
+
+    :return: ``(seconds, PDF bytes)``.
+    """
+    command = [sys.executable, '-m', 'patchbay_labels', 'render', spec, '-o', output, '--paginate',
+               '--engine', 'native']
+    if font:
+        command += ['--font', font]
+    if workers:
+        command += ['-j', str(workers)]
+    environment = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, (ROOT, os.environ.get('PYTHONPATH')))))
+    start = time.perf_counter()
+    subprocess.run(command, check=True, stdout=subprocess.DEVNULL, env=environment)
+    elapsed = time.perf_counter() - start
+    with open(output, 'rb') as handle:
+        return elapsed, handle.read()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--font', help='Path to the label font file (default: DejaVu Sans).')
+    parser.add_argument('--sizes', default='5000,20000', help='Comma-separated block counts.')
+    parser.add_argument('--workers', default=','.join(str(count) for count in (2, 4, os.cpu_count() or 1)),
+                        help='Comma-separated worker counts (default: 2, 4 and the CPU count).')
+    args = parser.parse_args()
+    counts = sorted({int(count) for count in args.workers.split(',')})
+
+    print(f'{os.cpu_count()} CPUs')
+    print(f'{"blocks":>8}{"workers":>9}{"seconds":>10}{"speedup":>9}{"same":>6}')
+    with tempfile.TemporaryDirectory() as directory:
+        for num_blocks in [int(size) for size in args.sizes.split(',')]:
+            spec = os.path.join(directory, 'studio-%d.json' % num_blocks)
+            with open(spec, 'w', encoding='utf-8') as handle:
+                json.dump(synthesize(num_blocks), handle)
+
+            serial, expected = render(spec, os.path.join(directory, 'serial.pdf'), args.font)
+            print(f'{num_blocks:>8}{"-":>9}{serial:>10.3f}{1:>9.2f}{"":>6}')
+            for count in counts:
+                elapsed, data = render(spec, os.path.join(directory, 'parallel.pdf'), args.font, count)
+                print(f'{num_blocks:>8}{count:>9}{elapsed:>10.3f}{serial / elapsed:>9.2f}{str(data == expected):>6}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Time PNG previews of a studio layout against the print-quality PDF.
+
+Reports the paginated matplotlib PDF, then page and block previews at every preview
+resolution: rendered cold, and again from a warm preview cache as when scrolling back
+through the layout.
+
+    python benchmarks/preview.py --blocks 40
+"""
+import argparse
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from patchbay_labels import PatchBayLabelGenerator  # noqa: E402
+from patchbay_labels.cache import RenderCache  # noqa: E402
+from patchbay_labels.preview import PREVIEW_DPIS, Previewer  # noqa: E402
+from TT_labels_Color import labels_per_group  # noqa: E402
+
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--blocks', type=int, default=40, help='number of blocks in the layout')
+    parser.add_argument('--font', help='label font file (default: $PATCHBAY_LABELS_FONT or DejaVu Sans)')
+    args = parser.parse_args()
+
+    blocks = [labels_per_group[index % len(labels_per_group)] for index in range(args.blocks)]
+    generator = PatchBayLabelGenerator(args.font)
+    generator.generate_labels(1, blocks, output_file=io.BytesIO(), paginate=True)  # imports and font setup
+
+    seconds, _ = timed(generator.generate_labels, len(blocks), blocks, output_file=io.BytesIO(), paginate=True)
+    print('%d blocks' % args.blocks)
+    print('%-24s %8.3f s' % ('print PDF (matplotlib)', seconds))
+
+    for per in ('page', 'block'):
+        for dpi in PREVIEW_DPIS:
+            directory = tempfile.mkdtemp(prefix='patchbay-preview-')
+            try:
+                previewer = Previewer(generator, RenderCache(directory))
+                render = previewer.pages if per == 'page' else previewer.blocks
+                cold, images = timed(render, len(blocks), blocks, dpi)
+                warm, _ = timed(render, len(blocks), blocks, dpi)
+            finally:
+                shutil.rmtree(directory)
+            size = sum(len(image) for image in images)
+            print('%-24s %8.3f s cold %8.4f s cached  %4d PNGs %8d bytes'
+                  % ('%s previews @%d dpi' % (per, dpi), cold, warm, len(images), size))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Time a studio-wide sheet with and without the render cache, after a one-block edit.
+
+Every block gets distinct label text so nothing is shared between blocks, and the
+in-memory text-fitting caches are cleared before each run to stand in for a fresh
+process. Runs, per engine:
+
+- uncached: plain render
+- cold: render into an empty cache
+- unchanged: the same sheet again
+- one edit: one label of one block changed
+
+    python benchmarks/render_cache.py --blocks 300
+"""
+import argparse
+import copy
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from patchbay_labels import PatchBayLabelGenerator  # noqa: E402
+from patchbay_labels.cache import RenderCache  # noqa: E402
+from patchbay_labels.text_fit import fit_text, measure  # noqa: E402
+from TT_labels_Color import labels_per_group  # noqa: E402
+
+
+def timed(generator, blocks, engine, cache):
+    fit_text.cache_clear()
+    measure.cache_clear()
+    start = time.perf_counter()
+    generator.generate_labels(None, blocks, output_file=io.BytesIO(), paginate=True, engine=engine, cache=cache)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--blocks', type=int, default=300, help='number of blocks on the sheet')
+    parser.add_argument('--font', help='label font file (default: $PATCHBAY_LABELS_FONT or DejaVu Sans)')
+    args = parser.parse_args()
+
+    blocks = []
+    for index in range(args.blocks):
+        block = copy.deepcopy(labels_per_group[index % len(labels_per_group)])
+        for label in block:
+            label['text'] = '%s %d' % (label['text'], index)
+        blocks.append(block)
+    edited = copy.deepcopy(blocks)
+    edited[3][0]['text'] = 'NEW BOX'
+
+    generator = PatchBayLabelGenerator(args.font)
+    generator.font_file  # parse the font outside the timings
+
+    print('%d blocks, paginated' % args.blocks)
+    print('%-11s %9s %9s %9s %9s' % ('engine', 'uncached', 'cold', 'unchanged', 'one edit'))
+    for engine in ('native', 'matplotlib'):
+        directory = tempfile.mkdtemp(prefix='patchbay-cache-')
+        try:
+            cache = RenderCache(directory)
+            timed(generator, blocks[:1], engine, None)  # imports and first-use setup
+            times = [
+                timed(generator, blocks, engine, None),
+                timed(generator, blocks, engine, cache),
+                timed(generator, blocks, engine, cache),
+                timed(generator, edited, engine, cache),
+            ]
+        finally:
+            shutil.rmtree(directory)
+        print('%-11s %8.3fs %8.3fs %8.3fs %8.3fs' % ((engine,) + tuple(times)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+"""
+Compare grid and shelf packing of mixed bay sizes: pages of paper, share of the paper
+covered by blocks, and time to place every block.
+
+A studio of --blocks blocks is drawn at random from the --sizes mix (8, 12 and 24-point
+bays by default) and laid out on letter and tabloid paper.
+
+    python benchmarks/sheet_packing.py --blocks 2000 --sizes 8,8,12,24
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from patchbay_labels import PatchBayLabelGenerator  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--blocks', type=int, default=2000, help='number of blocks in the studio')
+    parser.add_argument('--sizes', default='8,8,12,24', help='comma-separated jack counts to draw blocks from')
+    parser.add_argument('--seed', type=int, default=1, help='random seed for the block mix')
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    rng = random.Random(args.seed)
+    jacks = [rng.choice(sizes) for _ in range(args.blocks)]
+    print('%d blocks drawn from %s-point bays' % (args.blocks, '/'.join(map(str, sorted(set(sizes))))))
+    print('%-16s %-8s %8s %8s %10s %10s' % ('paper', 'packing', 'pages', 'used', 'oversized', 'seconds'))
+
+    for paper, (width, height) in (('letter', (11, 8.5)), ('tabloid', (17, 11))):
+        for packing in ('grid', 'shelf'):
+            generator = PatchBayLabelGenerator(paper_width=width, paper_height=height, packing=packing)
+            start = time.perf_counter()
+            usage = generator.sheet_utilization(len(jacks), True, jacks)
+            seconds = time.perf_counter() - start
+            print('%-16s %-8s %8d %7.1f%% %10d %10.3f'
+                  % ('%s %gx%g' % (paper, width, height), packing, usage['pages'], usage['utilization'] * 100,
+                     usage['oversized'], seconds))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,236 @@
+"""
+End-to-end benchmark suite over synthetic studios of 1 to 10,000 blocks.
+
+Each studio is a seeded random mix of the block styles real bays use: a row of
+single-jack labels over another, 8-span top/bottom pairs, 'both' spans across the two
+rows and a few of each mixed into one block, with about half the labels colored.
+Three workloads are measured at every size:
+
+- ``color``: PatchBayLabelGenerator with the color theme, spec to paginated PDF
+- ``bw``: generate_patch_bay_labels, spec to paginated PDF
+- ``layout``: layout_pages of the color generator, every page, nothing drawn
+
+Every case runs in a fresh process, after one warm-up run of its own workload so
+imports and font parsing are left out. It reports the best of --repeat runs (so text
+fitting is warm) and the peak heap allocated during one more run, traced with
+tracemalloc. Results are written as JSON together with the thresholds they are held
+to. Pass an earlier results file as --baseline to compare: a case that got slower or
+bigger by more than its threshold is flagged and the exit status is 1.
+
+    python benchmarks/suite.py --output bench.json
+    python benchmarks/suite.py --sizes 1,100,1000 --baseline bench.json
+"""
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, ROOT)
+
+SIZES = (1, 10, 100, 1000, 10000)
+WORKLOADS = ('color', 'bw', 'layout')
+COLORS = ('#33787E', '#B5443A', '#D9A441', '#4F6D9A', '#6B8F47')
+THRESHOLDS = {
+    'seconds': 0.25,  # allowed slowdown, as a fraction of the baseline
+    'peak_mb': 0.15,  # allowed growth in peak heap use of a run
+}
+MIN_SECONDS_DELTA = 0.01  # ignore slowdowns below timer noise on tiny cases
+MIN_PEAK_MB_DELTA = 0.1  # and growth of a few allocations
+SECONDS_BUDGET = 10  # stop repeating a case once it has used this much time
+
+
+def synthesize(num_blocks, seed=1):
+    """
+    A reproducible studio of ``num_blocks`` blocks of 8-point bays.
+    """
+    rng = random.Random(seed)
+
+    def label(start, span, row):
+        text = rng.choice(('KICK', 'SNARE TOP', 'OH L', 'VOX 1', 'BASS DI', 'GTR AMP', 'TAPE 3',
+                           'SSL BUS OUT', 'LA-2A IN', 'AUX 4 SEND', 'NEVE 1073 PRE'))
+        entry = {'text': '%s %d' % (text, start), 'start': start, 'span': span, 'row': row}
+        if rng.random() < 0.5:
+            entry['color'] = rng.choice(COLORS)
+        return entry
+
+    def singles():
+        return [label(jack, 1, row) for row in ('top', 'bottom') for jack in range(1, 9)]
+
+    def pairs():
+        return [label(1, 8, 'top'), label(1, 8, 'bottom')]
+
+    def both_spans():
+        spans = rng.choice(((4, 4), (2, 2, 4), (2, 2, 2, 2), (8,)))
+        starts = [1 + sum(spans[:index]) for index in range(len(spans))]
+        return [label(start, span, 'both') for start, span in zip(starts, spans)]
+
+    def mixed():
+        return ([label(1, 4, 'top')] + [label(jack, 1, 'bottom') for jack in range(1, 5)]
+                + [label(5, 4, 'both')])
+
+    styles = (singles, pairs, both_spans, mixed)
+    return [rng.choice(styles)() for _ in range(num_blocks)]
+
+
+def run_case(workload, num_blocks, engine, seed, repeat):
+    """
+    Measure one case in this process and return its result dictionary.
+    """
+    import tracemalloc
+    from patchbay_labels import PatchBayLabelGenerator, generate_patch_bay_labels
+
+    blocks = synthesize(num_blocks, seed)
+    generator = PatchBayLabelGenerator()
+
+    with tempfile.TemporaryDirectory() as directory:
+        output = os.path.join(directory, 'sheet.pdf')
+        if workload == 'color':
+            def run(studio):
+                generator.generate_labels(None, studio, output_file=output, paginate=True, engine=engine)
+        elif workload == 'bw':
+            def run(studio):
+                generate_patch_bay_labels(None, studio, output_file=output, paginate=True, engine=engine)
+        else:
+            def run(studio):
+                for _ in generator.layout_pages(len(studio), studio, paginate=True):
+                    pass
+
+        # Warm up only what this workload uses, so a layout case does not carry a renderer
+        run(synthesize(1, seed))
+
+        times = []
+        while len(times) < repeat and sum(times) < SECONDS_BUDGET:
+            start = time.perf_counter()
+            run(blocks)
+            times.append(time.perf_counter() - start)
+
+        # Separate pass: tracemalloc slows allocation-heavy code down too much to time it
+        gc.collect()
+        tracemalloc.start()
+        run(blocks)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return {
+        'workload': workload,
+        'engine': engine if workload != 'layout' else None,
+        'blocks': num_blocks,
+        'labels': sum(len(block) for block in blocks),
+        'seconds': min(times),
+        'runs': len(times),
+        'peak_mb': peak / (1 << 20),
+    }
+
+
+def case_name(workload, num_blocks, engine):
+    return '%s/%d' % (workload, num_blocks) if workload == 'layout' else '%s/%s/%d' % (workload, engine, num_blocks)
+
+
+def compare(results, baseline, thresholds):
+    """
+    Lines describing every case against the baseline, and whether any regressed.
+    """
+    lines = ['%-28s %10s %10s %8s %9s %9s %8s' % ('case', 'seconds', 'baseline', 'change',
+                                                  'peak MB', 'baseline', 'change')]
+    regressed = False
+    for name, result in results.items():
+        old = baseline.get(name)
+        if old is None:
+            continue
+        time_change = result['seconds'] / old['seconds'] - 1 if old['seconds'] else 0
+        memory_change = result['peak_mb'] / old['peak_mb'] - 1 if old['peak_mb'] else 0
+        flags = []
+        if time_change > thresholds['seconds'] and result['seconds'] - old['seconds'] > MIN_SECONDS_DELTA:
+            flags.append('SLOWER')
+        if memory_change > thresholds['peak_mb'] and result['peak_mb'] - old['peak_mb'] > MIN_PEAK_MB_DELTA:
+            flags.append('BIGGER')
+        regressed = regressed or bool(flags)
+        lines.append(('%-28s %10.3f %10.3f %+7.0f%% %9.1f %9.1f %+7.0f%%  %s'
+                      % (name, result['seconds'], old['seconds'], time_change * 100, result['peak_mb'],
+                         old['peak_mb'], memory_change * 100, ' '.join(flags))).rstrip())
+    return lines, regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default=','.join(map(str, SIZES)), help='comma-separated block counts')
+    parser.add_argument('--workloads', default=','.join(WORKLOADS), help='comma-separated workloads to run')
+    parser.add_argument('--engine', choices=('matplotlib', 'native'), default='matplotlib',
+                        help='render engine of the color and bw workloads (default: %(default)s)')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per case; the best is kept')
+    parser.add_argument('--seed', type=int, default=1, help='random seed for the synthetic studios')
+    parser.add_argument('--output', help='write results as JSON to this file')
+    parser.add_argument('--baseline', help='results file to compare against')
+    parser.add_argument('--time-threshold', type=float,
+                        help='allowed slowdown as a fraction (default: the baseline\'s, or %g)' % THRESHOLDS['seconds'])
+    parser.add_argument('--memory-threshold', type=float,
+                        help='allowed peak memory growth as a fraction (default: the baseline\'s, or %g)'
+                        % THRESHOLDS['peak_mb'])
+    parser.add_argument('--case', help=argparse.SUPPRESS)  # workload:blocks, run by the suite in a child process
+    args = parser.parse_args()
+
+    if args.case:
+        workload, num_blocks = args.case.split(':')
+        print(json.dumps(run_case(workload, int(num_blocks), args.engine, args.seed, args.repeat)))
+        return 0
+
+    baseline = {}
+    thresholds = dict(THRESHOLDS)
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as handle:
+            saved = json.load(handle)
+        baseline = saved['results']
+        thresholds.update(saved.get('thresholds', {}))
+    if args.time_threshold is not None:
+        thresholds['seconds'] = args.time_threshold
+    if args.memory_threshold is not None:
+        thresholds['peak_mb'] = args.memory_threshold
+
+    results = {}
+    print('%-28s %8s %10s %10s %9s' % ('case', 'labels', 'seconds', 'ms/block', 'peak MB'))
+    for num_blocks in [int(size) for size in args.sizes.split(',')]:
+        for workload in args.workloads.split(','):
+            command = [sys.executable, os.path.abspath(__file__), '--case', '%s:%d' % (workload, num_blocks),
+                       '--engine', args.engine, '--seed', str(args.seed), '--repeat', str(args.repeat)]
+            result = json.loads(subprocess.run(command, check=True, stdout=subprocess.PIPE).stdout)
+            name = case_name(workload, num_blocks, args.engine)
+            results[name] = result
+            print('%-28s %8d %10.3f %10.3f %9.1f' % (name, result['labels'], result['seconds'],
+                                                     result['seconds'] / num_blocks * 1000, result['peak_mb']))
+
+    if args.output:
+        from patchbay_labels import __version__
+
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            json.dump({
+                'version': __version__,
+                'created': datetime.datetime.now().isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'seed': args.seed,
+                'thresholds': thresholds,
+                'results': results,
+            }, handle, indent=2)
+            handle.write('\n')
+
+    if not baseline:
+        return 0
+    lines, regressed = compare(results, baseline, thresholds)
+    print()
+    print('\n'.join(lines))
+    if regressed:
+        print('\nregressions past %.0f%% time / %.0f%% memory' % (thresholds['seconds'] * 100,
+                                                                   thresholds['peak_mb'] * 100))
+    return 1 if regressed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
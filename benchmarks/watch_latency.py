@@ -0,0 +1,73 @@
+"""
+Measure edit-to-output latency of watch mode.
+
+A spec is written to a temporary directory and rendered once to warm the watcher up.
+Then one label is edited at a time, the file is saved, and the time from the save until
+the updated PDF is in place is recorded. The polling interval is left out: with the
+default 0.1 s interval it adds up to 100 ms on top.
+
+    python benchmarks/watch_latency.py --blocks 40 --edits 20
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from patchbay_labels import PatchBayLabelGenerator  # noqa: E402
+from patchbay_labels.watch import SheetWatcher  # noqa: E402
+from TT_labels_Color import labels_per_group  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--blocks', type=int, default=40, help='number of blocks on the sheet')
+    parser.add_argument('--edits', type=int, default=20, help='number of edits to time')
+    parser.add_argument('--font', help='label font file (default: $PATCHBAY_LABELS_FONT or DejaVu Sans)')
+    args = parser.parse_args()
+
+    blocks = [[dict(label) for label in labels_per_group[index % len(labels_per_group)]]
+              for index in range(args.blocks)]
+    print('%d blocks, one label edited per save' % args.blocks)
+    print('%-28s %8s %8s %8s' % ('engine', 'first', 'p50', 'max'))
+
+    for engine, paginate in (('native', False), ('native', True), ('matplotlib', False), ('matplotlib', True)):
+        directory = tempfile.mkdtemp(prefix='patchbay-watch-')
+        try:
+            spec = os.path.join(directory, 'studio.json')
+            with open(spec, 'w') as handle:
+                json.dump(blocks, handle)
+            watcher = SheetWatcher(PatchBayLabelGenerator(args.font), spec, os.path.join(directory, 'studio.pdf'),
+                                   paginate=paginate, engine=engine, log=lambda line: None)
+            start = time.perf_counter()
+            watcher.check()
+            first = time.perf_counter() - start
+
+            latencies = []
+            for edit in range(args.edits):
+                edited = json.loads(json.dumps(blocks))
+                edited[edit * 7 % len(edited)][0]['text'] = 'EDIT %d' % edit
+                with open(spec, 'w') as handle:
+                    json.dump(edited, handle)
+                os.utime(spec, ns=(time.time_ns(), time.time_ns() + edit))  # never the same stamp twice
+                start = time.perf_counter()
+                watcher.check()
+                latencies.append(time.perf_counter() - start)
+            watcher.close()
+        finally:
+            shutil.rmtree(directory)
+
+        name = '%s%s' % (engine, ', paginated' if paginate else '')
+        print('%-28s %7.0fms %7.0fms %7.0fms'
+              % (name, first * 1000, statistics.median(latencies) * 1000, max(latencies) * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+"""
+Printable TT patchbay label sheets.
+
+The heavy pieces (matplotlib, fontTools) are only imported when a sheet is actually
+rendered, so importing the package and laying sheets out stays fast.
+"""
+
+__version__ = '0.2.0'
+
+__all__ = [
+    'PageLayout',
+    'PatchBayLabelGenerator',
+    'SpecError',
+    'generate_patch_bay_labels',
+    'generate_patch_bay_labels_async',
+    'load_spec',
+]
+
+_EXPORTS = {
+    'PageLayout': 'layout',
+    'PatchBayLabelGenerator': 'generator',
+    'generate_patch_bay_labels': 'generator',
+    'generate_patch_bay_labels_async': 'generator',
+    'SpecError': 'spec',
+    'load_spec': 'spec',
+}
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError('module %r has no attribute %r' % (__name__, name))
+    from importlib import import_module
+    value = getattr(import_module('.' + module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,206 @@
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from .cli import OUTPUT_EXTENSIONS
+from .spec import READERS, load_spec, spec_format
+
+# Generators kept alive in each worker process, keyed by font path, theme and bay
+# geometry, so the parsed font and the text-fitting caches carry over from one job to the next.
+_GENERATORS = {}
+
+
+class BatchJob:
+    """
+    One sheet to render: a spec file, where to write it and how.
+    """
+
+    def __init__(self, spec, output, theme='color', engine='matplotlib', paginate=False, font=None, cache=None,
+                 jacks=8, packing='grid'):
+        self.spec = spec
+        self.output = output
+        self.theme = theme
+        self.engine = engine
+        self.paginate = paginate
+        self.font = font
+        self.cache = cache
+        self.jacks = jacks
+        self.packing = packing
+
+    @property
+    def name(self):
+        return os.path.splitext(os.path.basename(self.spec))[0]
+
+
+class JobResult:
+    """
+    Outcome of one BatchJob.
+    """
+
+    def __init__(self, job, seconds, blocks=0, error=None, worker=None, pages=0, utilization=0.0):
+        self.job = job
+        self.seconds = seconds
+        self.blocks = blocks
+        self.error = error
+        self.worker = worker
+        self.pages = pages
+        self.utilization = utilization  # share of the paper area covered by blocks
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def jobs_from_path(path, output_dir=None, **defaults):
+    """
+    Build jobs from a directory of specs or from a manifest file.
+
+    A directory renders every spec file in it that iter_spec reads (``.json``,
+    ``.jsonl``, ``.csv``, ``.yaml`` or ``.py``) to ``<name>.pdf``, or the extension of
+    its engine. A manifest is a JSON object with a "jobs" list; each job names a "spec"
+    and may set "output", "theme", "engine", "paginate", "font", "cache", "jacks" and
+    "packing". Relative paths in a manifest are resolved against the manifest's
+    directory, and an optional "defaults" object applies to every job.
+
+    :param path: Spec directory or manifest file.
+    :param output_dir: Where to write sheets that do not name their own output.
+                       Defaults to the spec directory or the manifest's directory.
+    :param defaults: Job options used when neither the manifest nor the job sets them.
+    :return: List of BatchJob.
+    :raises ValueError: If two jobs would write the same file, such as ``bay1.json``
+                        and ``bay1.csv`` in one directory.
+    """
+    if os.path.isdir(path):
+        output_dir = output_dir or path
+        engine = defaults.get('engine', 'matplotlib')
+        jobs = [
+            BatchJob(os.path.join(path, name), _default_output(output_dir, name, engine), **defaults)
+            for name in sorted(os.listdir(path))
+            if spec_format(name) in READERS and os.path.isfile(os.path.join(path, name))
+        ]
+        _check_outputs(jobs)
+        return jobs
+
+    with open(path, encoding='utf-8') as handle:
+        manifest = json.load(handle)
+    base = os.path.dirname(os.path.abspath(path))
+    output_dir = output_dir or base
+    options = dict(defaults, **manifest.get('defaults', {}))
+
+    jobs = []
+    for entry in manifest.get('jobs', []):
+        entry = dict(options, **entry)
+        spec = os.path.join(base, entry.pop('spec'))
+        output = entry.pop('output', None)
+        if output is None:
+            output = _default_output(output_dir, spec, entry.get('engine', 'matplotlib'))
+        else:
+            output = os.path.join(base, output)
+        if entry.get('cache'):
+            entry['cache'] = os.path.join(base, entry['cache'])
+        jobs.append(BatchJob(spec, output, **entry))
+    _check_outputs(jobs)
+    return jobs
+
+
+def _default_output(output_dir, spec, engine):
+    name = os.path.splitext(os.path.basename(spec))[0]
+    return os.path.join(output_dir, '%s.%s' % (name, OUTPUT_EXTENSIONS.get(engine, 'pdf')))
+
+
+def _check_outputs(jobs):
+    # Parallel workers writing one file would overwrite each other's sheets without a word
+    seen = {}
+    for job in jobs:
+        key = os.path.normcase(os.path.abspath(job.output))
+        if key in seen:
+            raise ValueError('%s and %s would both be written to %s' % (seen[key].spec, job.spec, job.output))
+        seen[key] = job
+
+
+def run_batch(jobs, workers=None):
+    """
+    Render jobs across a process pool.
+
+    Each worker keeps its fonts and render backends loaded between jobs. A job that fails
+    is reported in its result rather than stopping the batch.
+
+    :param jobs: Iterable of BatchJob.
+    :param workers: Number of worker processes; defaults to the CPU count. 1 renders
+                    in this process.
+    :return: List of JobResult in job order.
+    """
+    jobs = list(jobs)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(jobs) <= 1:
+        return [_run_job(job) for job in jobs]
+
+    fonts = sorted({job.font or '' for job in jobs})
+    engines = sorted({job.engine for job in jobs})
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs)), initializer=_warm_worker,
+                             initargs=(fonts, engines)) as executor:
+        return list(executor.map(_run_job, jobs))
+
+
+def format_summary(results, wall_seconds):
+    """
+    Table of per-sheet timings followed by totals and any failures.
+
+    :param results: JobResult list from run_batch.
+    :param wall_seconds: Elapsed time of the whole batch.
+    """
+    lines = ['%-28s %8s %6s %6s %8s  %s' % ('sheet', 'blocks', 'pages', 'used', 'seconds', 'status')]
+    for result in results:
+        status = 'ok' if result.ok else 'FAILED'
+        lines.append('%-28s %8d %6d %5.0f%% %8.3f  %s' % (result.job.name[:28], result.blocks, result.pages,
+                                                          result.utilization * 100, result.seconds, status))
+
+    failures = [result for result in results if not result.ok]
+    busy = sum(result.seconds for result in results)
+    pages = sum(result.pages for result in results)
+    used = sum(result.pages * result.utilization for result in results)
+    lines.append('')
+    lines.append('%d sheets, %d failed, %.3f s wall, %.3f s rendering (%.1fx parallel speedup)'
+                 % (len(results), len(failures), wall_seconds, busy, busy / wall_seconds if wall_seconds else 0))
+    lines.append('%d pages of paper, %.0f%% covered by blocks' % (pages, used / pages * 100 if pages else 0))
+    for result in failures:
+        lines.append('%s: %s' % (result.job.spec, result.error))
+    return '\n'.join(lines)
+
+
+def _warm_worker(fonts, engines):
+    for theme in ('color', 'bw'):
+        for font in fonts:
+            _generator(font or None, theme).font_file
+    if 'matplotlib' in engines:
+        import matplotlib.figure  # noqa: F401
+        from matplotlib.backends import backend_pdf  # noqa: F401
+
+
+def _generator(font, theme, jacks=8, packing='grid'):
+    from .generator import PatchBayLabelGenerator
+
+    key = (font, theme, jacks, packing)
+    if key not in _GENERATORS:
+        _GENERATORS[key] = PatchBayLabelGenerator(font, theme=theme, jacks=jacks, packing=packing)
+    return _GENERATORS[key]
+
+
+def _run_job(job):
+    start = time.perf_counter()
+    blocks = 0
+    try:
+        labels_per_group = load_spec(job.spec, jacks=job.jacks)
+        blocks = len(labels_per_group)
+        generator = _generator(job.font, job.theme, job.jacks, job.packing)
+        output_dir = os.path.dirname(job.output)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        generator.generate_labels(blocks, labels_per_group, output_file=job.output,
+                                  paginate=job.paginate, engine=job.engine, cache=job.cache)
+        usage = generator.sheet_utilization(blocks, job.paginate, generator.block_jacks(labels_per_group, blocks))
+    except Exception as error:  # one broken sheet must not take the whole batch down
+        return JobResult(job, time.perf_counter() - start, blocks, '%s: %s' % (type(error).__name__, error), os.getpid())
+    return JobResult(job, time.perf_counter() - start, blocks, worker=os.getpid(), pages=usage['pages'],
+                     utilization=usage['utilization'])
@@ -0,0 +1,214 @@
+import hashlib
+import json
+import os
+import tempfile
+from collections import OrderedDict
+from functools import lru_cache
+
+# Bump whenever rendered output changes for the same inputs, so stale entries are never reused
+CACHE_VERSION = 4
+CACHE_ENV_VAR = 'PATCHBAY_LABELS_CACHE'
+
+
+def default_cache_dir():
+    """
+    ``$PATCHBAY_LABELS_CACHE`` if set, otherwise ``patchbay-labels`` in the user cache directory.
+    """
+    directory = os.environ.get(CACHE_ENV_VAR)
+    if directory:
+        return directory
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'patchbay-labels')
+
+
+def cache_key(*parts):
+    """
+    Hash JSON-serializable parts into a cache key.
+    """
+    data = json.dumps([CACHE_VERSION] + list(parts), sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+def open_cache(cache):
+    """
+    A cache object for a ``cache=`` argument: directories become a RenderCache and
+    anything else, such as a RenderCache or MemoryCache, is used as it is.
+    """
+    if isinstance(cache, (str, bytes, os.PathLike)):
+        return RenderCache(cache)
+    return cache
+
+
+def file_digest(path):
+    """
+    SHA-256 of a file's contents, remembered for as long as its size and mtime stay the same.
+    """
+    stat = os.stat(path)
+    return _file_digest(path, stat.st_size, stat.st_mtime_ns)
+
+
+@lru_cache(maxsize=64)
+def _file_digest(path, size, mtime):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for chunk in iter(lambda: handle.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class RenderCache:
+    """
+    Content-addressed store of rendered output on disk.
+
+    Entries are keyed by a hash of everything that went into them, so an entry is
+    never stale: changing a label, the geometry, the theme or the font simply produces
+    a different key. Reading an entry marks it as recently used, and once the cache
+    grows past ``max_bytes`` the least recently used entries are evicted.
+
+    Writes go through a temporary file and an atomic rename, so several processes
+    can share one cache directory.
+    """
+
+    def __init__(self, directory=None, max_bytes=256 << 20):
+        """
+        :param directory: Where to keep entries. Defaults to default_cache_dir().
+        :param max_bytes: Size the cache is trimmed back under after a write.
+        """
+        self.directory = directory or default_cache_dir()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._size = None
+
+    key = staticmethod(cache_key)
+
+    def get(self, key):
+        """
+        Cached bytes for a key, or None.
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as handle:
+                data = handle.read()
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        try:
+            os.utime(path)  # the modification time doubles as the last-use time
+        except OSError:
+            pass
+        self.hits += 1
+        return data
+
+    def put(self, key, data):
+        """
+        Store bytes under a key, evicting old entries if the cache is over its limit.
+        """
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            replaced = os.path.getsize(path)  # an entry written over no longer counts
+        except OSError:
+            replaced = 0
+        handle, temp_path = tempfile.mkstemp(prefix='.tmp-', dir=os.path.dirname(path))
+        with os.fdopen(handle, 'wb') as temp:
+            temp.write(data)
+        os.replace(temp_path, path)
+
+        if self._size is None:
+            self._size = self.size()
+        else:
+            self._size += len(data) - replaced
+        if self._size > self.max_bytes:
+            # Trim a little further than needed so the next few writes do not rescan
+            self.prune(self.max_bytes * 9 // 10)
+
+    def size(self):
+        """
+        Total size of all entries in bytes.
+        """
+        return sum(size for _, size, _ in self._entries())
+
+    def prune(self, max_bytes=None):
+        """
+        Evict least recently used entries until the cache fits.
+
+        :param max_bytes: Size to trim down to. Defaults to the cache's limit; 0 clears it.
+        :return: Size of the cache afterwards.
+        """
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= limit:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._size = total
+        return total
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key)
+
+    def _entries(self):
+        """
+        ``(last use, size, path)`` of every entry.
+        """
+        try:
+            buckets = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        entries = []
+        for bucket in buckets:
+            bucket_path = os.path.join(self.directory, bucket)
+            if not os.path.isdir(bucket_path):
+                continue
+            for name in os.listdir(bucket_path):
+                if name.startswith('.tmp-'):
+                    continue
+                path = os.path.join(bucket_path, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+
+class MemoryCache:
+    """
+    In-process cache with the same interface as RenderCache, for long-running processes
+    such as watch mode. Least recently used entries are dropped past ``max_bytes``.
+    """
+
+    key = staticmethod(cache_key)
+
+    def __init__(self, max_bytes=64 << 20):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._size = 0
+
+    def get(self, key):
+        data = self._entries.get(key)
+        if data is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return data
+
+    def put(self, key, data):
+        if key in self._entries:
+            self._size -= len(self._entries.pop(key))
+        self._entries[key] = data
+        self._size += len(data)
+        while self._size > self.max_bytes and len(self._entries) > 1:
+            self._size -= len(self._entries.popitem(last=False)[1])
+
+    def size(self):
+        return self._size
@@ -0,0 +1,328 @@
+import argparse
+import json
+import sys
+
+from . import __version__
+from .spec import SpecError, _jack_range, check_spans, iter_spec, load_spec
+
+# File extension of each render engine's output, for the default output file name
+OUTPUT_EXTENSIONS = {'matplotlib': 'pdf', 'native': 'pdf', 'svg': 'svg', 'hpgl': 'plt'}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='patchbay-labels',
+        description='Generate printable TT patchbay label sheets.',
+    )
+    parser.add_argument('--version', action='version', version='%(prog)s ' + __version__)
+    commands = parser.add_subparsers(dest='command', metavar='COMMAND')
+    commands.required = True
+
+    render = commands.add_parser('render', help='render a spec to PDF')
+    render.add_argument('spec', help='spec file (.json, .jsonl, .csv, .yaml or .py)')
+    render.add_argument('-o', '--output',
+                        help='output file (default: output_labels.pdf, or .svg or .plt for those engines)')
+    _add_layout_options(render)
+    render.add_argument('--engine', choices=('matplotlib', 'native', 'svg', 'hpgl'), default='matplotlib',
+                        help='render engine; svg and hpgl write print-and-cut output instead of PDF '
+                             '(default: %(default)s)')
+    render.add_argument('--font', help='label font file (default: $PATCHBAY_LABELS_FONT or DejaVu Sans)')
+    render.add_argument('-j', '--jobs', type=int,
+                        help='with --engine native, draw the pages on this many worker processes')
+    render.add_argument('--cache', metavar='DIR', help='reuse unchanged sheets and blocks from this render cache')
+    render.add_argument('--profile', metavar='FILE',
+                        help="write per-phase timings, counters and peak memory as JSON ('-' for stdout)")
+    render.add_argument('--trace-memory', action='store_true',
+                        help='with --profile, track peak heap use per phase (slower)')
+    render.set_defaults(handler=_render)
+
+    validate = commands.add_parser('validate', help='check spec files without rendering')
+    validate.add_argument('specs', nargs='+', metavar='spec', help='spec file (.json, .jsonl, .csv, .yaml or .py)')
+    validate.add_argument('--jacks', type=int, default=8,
+                          help='jacks per row of blocks that do not set their own (default: %(default)s)')
+    validate.add_argument('--gaps', action='store_true', help='also list runs of jacks that no label covers')
+    validate.set_defaults(handler=_validate)
+
+    batch = commands.add_parser('batch', help='render a directory or manifest of specs in parallel')
+    batch.add_argument('source', help='directory of spec files, or a JSON manifest of jobs')
+    batch.add_argument('-o', '--output-dir', help='where to write the PDFs (default: next to the specs)')
+    batch.add_argument('-j', '--jobs', type=int, help='worker processes (default: CPU count)')
+    batch.add_argument('--theme', choices=('color', 'bw'), default='color', help='default sheet style')
+    batch.add_argument('--paginate', action='store_true', help='break onto new pages instead of cropping')
+    batch.add_argument('--engine', choices=('matplotlib', 'native'), default='matplotlib', help='default render engine')
+    batch.add_argument('--font', help='default label font file')
+    _add_bay_options(batch)
+    batch.add_argument('--cache', metavar='DIR', help='render cache shared by all workers')
+    batch.set_defaults(handler=_batch)
+
+    preview = commands.add_parser('preview', help='write low-resolution PNG previews of a spec')
+    preview.add_argument('spec', help='spec file (.json, .jsonl, .csv, .yaml or .py)')
+    preview.add_argument('-o', '--output-dir', default='previews', help='directory for the PNGs (default: %(default)s)')
+    preview.add_argument('--dpi', type=int, choices=(36, 72, 144), default=72, help='resolution (default: %(default)s)')
+    preview.add_argument('--per', choices=('page', 'block'), default='page', help='one PNG per page or per block')
+    preview.add_argument('--theme', choices=('color', 'bw'), default='color', help='sheet style (default: %(default)s)')
+    preview.add_argument('--sheet', action='store_true', help='preview the single cropped sheet instead of pages')
+    preview.add_argument('--blocks', type=int, help='number of blocks to draw (default: one per spec block)')
+    preview.add_argument('--font', help='label font file (default: $PATCHBAY_LABELS_FONT or DejaVu Sans)')
+    _add_bay_options(preview)
+    preview.add_argument('--cache', metavar='DIR',
+                         help='preview cache (default: $PATCHBAY_LABELS_CACHE or ~/.cache/patchbay-labels)')
+    preview.add_argument('--no-cache', action='store_true', help='render every preview from scratch')
+    preview.set_defaults(handler=_preview)
+
+    watch = commands.add_parser('watch', help='re-render a spec every time it is saved')
+    watch.add_argument('spec', help='spec file (.json, .jsonl, .csv, .yaml or a script with labels_per_group)')
+    watch.add_argument('-o', '--output', default='output_labels.pdf', help='output PDF (default: %(default)s)')
+    watch.add_argument('--theme', choices=('color', 'bw'), default='color', help='sheet style (default: %(default)s)')
+    watch.add_argument('--paginate', action='store_true', help='break onto new pages instead of cropping')
+    watch.add_argument('--engine', choices=('matplotlib', 'native'), default='native',
+                       help='render engine (default: %(default)s)')
+    watch.add_argument('--font', help='label font file (default: $PATCHBAY_LABELS_FONT or DejaVu Sans)')
+    _add_bay_options(watch)
+    watch.add_argument('--interval', type=float, default=0.1, help='seconds between checks (default: %(default)s)')
+    watch.set_defaults(handler=_watch)
+
+    serve = commands.add_parser('serve', help='run an HTTP render service on a pool of warm workers')
+    serve.add_argument('--host', default='127.0.0.1', help='interface to listen on (default: %(default)s)')
+    serve.add_argument('--port', type=int, default=8765, help='port to listen on (default: %(default)s)')
+    serve.add_argument('-j', '--jobs', type=int, help='worker processes (default: CPU count)')
+    serve.add_argument('--queue', type=int, default=16,
+                       help='requests allowed to wait for a worker before answering 503 (default: %(default)s)')
+    serve.add_argument('--font', help='label font file (default: $PATCHBAY_LABELS_FONT or DejaVu Sans)')
+    serve.set_defaults(handler=_serve)
+
+    inventory = commands.add_parser('inventory', help='import, look up and render bays in a SQLite inventory')
+    inventory.add_argument('database', help='inventory database file, created if missing')
+    actions = inventory.add_subparsers(dest='action', metavar='ACTION')
+    actions.required = True
+
+    add = actions.add_parser('import', help='add the bays of spec files; scripts add one bay per PATCHBAY heading')
+    add.add_argument('specs', nargs='+', metavar='spec', help='spec file (.json, .jsonl, .csv, .yaml or .py)')
+    add.add_argument('--bay', help='bay name (default: the PATCHBAY headings of a script, else the file name)')
+    add.add_argument('--jacks', type=int, default=8,
+                     help='jacks per row of blocks that do not set their own (default: %(default)s)')
+    add.add_argument('--replace', action='store_true', help='replace bays that are already in the inventory')
+    add.set_defaults(handler=_inventory_import)
+
+    bays = actions.add_parser('bays', help='list the bays with their block and label counts')
+    bays.set_defaults(handler=_inventory_bays)
+
+    find = actions.add_parser('find', help='find labels by text, bay and jack')
+    find.add_argument('text', nargs='?', help='start of the label text, ignoring case')
+    find.add_argument('--bay', help='only this bay')
+    find.add_argument('--jack', type=int, help='only labels covering this jack')
+    find.add_argument('--row', choices=('top', 'bottom', 'both'), help="only this row ('both' labels are on either)")
+    find.set_defaults(handler=_inventory_find)
+
+    draw = actions.add_parser('render', help='render bays straight from the inventory')
+    draw.add_argument('-o', '--output',
+                      help='output file (default: output_labels.pdf, or .svg or .plt for those engines)')
+    draw.add_argument('--bay', help='only this bay (default: every bay, in the order imported)')
+    draw.add_argument('--text', help='only blocks with a label starting with this, ignoring case')
+    _add_layout_options(draw)
+    draw.add_argument('--engine', choices=('matplotlib', 'native', 'svg', 'hpgl'), default='matplotlib',
+                      help='render engine (default: %(default)s)')
+    draw.add_argument('--font', help='label font file (default: $PATCHBAY_LABELS_FONT or DejaVu Sans)')
+    draw.set_defaults(handler=_inventory_render)
+
+    layout = commands.add_parser('layout', help='print block positions as JSON without rendering')
+    layout.add_argument('spec', help='spec file (.json, .jsonl, .csv, .yaml or .py)')
+    _add_layout_options(layout)
+    layout.set_defaults(handler=_layout)
+
+    return parser
+
+
+def _add_layout_options(parser):
+    parser.add_argument('--theme', choices=('color', 'bw'), default='color', help='sheet style (default: %(default)s)')
+    parser.add_argument('--paginate', action='store_true', help='break onto new pages instead of cropping')
+    parser.add_argument('--blocks', type=int, help='number of blocks to draw (default: one per spec block)')
+    _add_bay_options(parser)
+
+
+def _add_bay_options(parser):
+    parser.add_argument('--jacks', type=int, default=8,
+                        help='jacks per row of blocks that do not set their own, such as 12, 24 or 48 '
+                             '(default: %(default)s)')
+    parser.add_argument('--pack', action='store_true',
+                        help='place blocks widest first to fit mixed bay sizes onto fewer pages')
+
+
+def _generator(args, font=None):
+    from .generator import PatchBayLabelGenerator
+
+    return PatchBayLabelGenerator(font, theme=args.theme, jacks=args.jacks, packing='shelf' if args.pack else 'grid')
+
+
+def _render(args):
+    from .profiling import Profiler
+
+    profiler = Profiler(args.trace_memory) if args.profile else None
+    args.output = _output_file(args)
+    generator = _generator(args, args.font)
+    generator.generate_labels(args.blocks, iter_spec(args.spec, jacks=args.jacks), output_file=args.output,
+                              paginate=args.paginate, engine=args.engine, cache=args.cache, profile=profiler,
+                              workers=args.jobs)
+    if args.profile == '-':
+        profiler.write_report(sys.stdout)
+        return
+    if profiler is not None:
+        profiler.write_report(args.profile)
+    print(args.output)
+
+
+def _output_file(args):
+    return args.output or 'output_labels.' + OUTPUT_EXTENSIONS[args.engine]
+
+
+def _validate(args):
+    for path in args.specs:
+        blocks = labels = 0
+        for block in iter_spec(path, jacks=args.jacks):
+            blocks += 1
+            labels += len(block)
+            if args.gaps:
+                for row, first, last in check_spans(block, blocks, path, jacks=getattr(block, 'jacks', args.jacks)):
+                    print('%s: block %d: %s row, %s unlabeled' % (path, blocks, row, _jack_range(first, last)))
+        print('%s: %d blocks, %d labels OK' % (path, blocks, labels))
+
+
+def _batch(args):
+    import os
+    import time
+    from .batch import format_summary, jobs_from_path, run_batch
+
+    cache = os.path.abspath(args.cache) if args.cache else None
+    jobs = jobs_from_path(args.source, args.output_dir, theme=args.theme, engine=args.engine,
+                          paginate=args.paginate, font=args.font, cache=cache, jacks=args.jacks,
+                          packing='shelf' if args.pack else 'grid')
+    start = time.perf_counter()
+    results = run_batch(jobs, workers=args.jobs)
+    print(format_summary(results, time.perf_counter() - start))
+    return 0 if all(result.ok for result in results) else 1
+
+
+def _preview(args):
+    from .cache import RenderCache
+
+    generator = _generator(args, args.font)
+    cache = None if args.no_cache else RenderCache(args.cache)
+    paths = generator.generate_previews(args.blocks, iter_spec(args.spec, jacks=args.jacks), output_dir=args.output_dir,
+                                        dpi=args.dpi, per=args.per, paginate=not args.sheet, cache=cache)
+    print('%d previews in %s' % (len(paths), args.output_dir))
+
+
+def _watch(args):
+    from .watch import SheetWatcher
+
+    generator = _generator(args, args.font)
+    watcher = SheetWatcher(generator, args.spec, args.output, paginate=args.paginate, engine=args.engine,
+                           log=lambda line: print(line, flush=True))
+    print('watching %s (Ctrl-C to stop)' % args.spec, flush=True)
+    watcher.run(args.interval)
+
+
+def _serve(args):
+    from .server import RenderService
+
+    service = RenderService(args.host, args.port, workers=args.jobs, queue_size=args.queue, font=args.font)
+    print('serving on %s with %d workers (Ctrl-C to stop)' % (service.address, service.workers), flush=True)
+    try:
+        service.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+def _inventory_import(args):
+    from .inventory import Inventory
+
+    with Inventory(args.database) as inventory:
+        for path in args.specs:
+            for name, blocks, labels in inventory.import_spec(path, args.bay, jacks=args.jacks, replace=args.replace):
+                print('%s: %s, %d blocks, %d labels' % (path, name, blocks, labels))
+
+
+def _inventory_bays(args):
+    from .inventory import Inventory
+
+    with Inventory(args.database) as inventory:
+        for name, blocks, labels in inventory.bays():
+            print('%s: %d blocks, %d labels' % (name, blocks, labels))
+
+
+def _inventory_find(args):
+    from .inventory import Inventory
+
+    with Inventory(args.database) as inventory:
+        found = inventory.find(args.text, args.bay, args.jack, args.row)
+    for location in found:
+        row = 'both rows' if location.row == 'both' else location.row + ' row'
+        print('%s, block %d, %s, %s: %s' % (location.bay, location.block, row,
+                                                  _jack_range(location.start, location.start + location.span - 1),
+                                                  location.text))
+    return 0 if found else 1
+
+
+def _inventory_render(args):
+    import itertools
+    from .inventory import Inventory
+
+    with Inventory(args.database) as inventory:
+        blocks = inventory.blocks(args.bay, args.text)
+        first = next(blocks, None)
+        if first is None:
+            raise ValueError('no blocks in %s match' % args.database)
+        args.output = _output_file(args)
+        generator = _generator(args, args.font)
+        generator.generate_labels(args.blocks, itertools.chain([first], blocks), output_file=args.output,
+                                  paginate=args.paginate, engine=args.engine)
+    print(args.output)
+
+
+def _layout(args):
+    blocks = load_spec(args.spec, jacks=args.jacks)
+    generator = _generator(args)
+    num_groups = _block_count(args, blocks)
+    jacks = generator.block_jacks(blocks, num_groups)
+    pages = {}
+    for block, (page, x, y) in enumerate(generator.block_origins(num_groups, args.paginate, jacks), 1):
+        origin = {'block': block, 'x': round(x, 4), 'y': round(y, 4)}
+        if jacks is not None:
+            origin['jacks'] = jacks[block - 1]
+        pages.setdefault(page, []).append(origin)
+
+    report = {
+        'theme': args.theme,
+        'paper': [generator.paper_width, generator.paper_height],
+        'pages': [{'page': page + 1, 'blocks': origins} for page, origins in sorted(pages.items())],
+    }
+    if args.paginate:
+        # Share of the paper covered by blocks, which is what a print run pays for
+        usage = generator.sheet_utilization(num_groups, True, jacks)
+        report['utilization'] = round(usage['utilization'], 4)
+        for page, value in zip(report['pages'], usage['page_utilization']):
+            page['utilization'] = round(value, 4)
+        if usage['oversized']:
+            report['oversized'] = usage['oversized']
+    else:
+        report['bbox'] = [round(value, 4) for value in generator.content_bbox(num_groups, jacks=jacks)]
+    json.dump(report, sys.stdout, indent=2)
+    sys.stdout.write('\n')
+
+
+def _block_count(args, blocks):
+    return args.blocks if args.blocks is not None else len(blocks)
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        return args.handler(args) or 0
+    except (SpecError, OSError, ValueError) as error:
+        print('%s: error: %s' % (parser.prog, error), file=sys.stderr)
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
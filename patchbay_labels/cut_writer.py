@@ -0,0 +1,227 @@
+"""
+Streaming SVG and HPGL writers for labels that are printed and then cut out.
+
+Both draw a PageLayout directly, one page at a time, without building a document tree.
+What a cutter needs is the label strips: each block's strip is cut out along its
+border, and split into label pieces along the edges between labels. The jack blocks
+and their dots are not drawn. When the page has merged edges (see optimize.py) every
+line is cut once; otherwise each label rectangle is cut on its own.
+"""
+import tempfile
+from xml.sax.saxutils import escape, quoteattr
+
+from .pdf_writer import POINTS_PER_INCH, _color_channels, _num, _rows
+
+HPGL_UNITS_PER_INCH = 1016  # 40 plotter units per millimetre
+CUT_COLOR = '#ff0000'  # cutter software takes red hairlines as cut lines
+CUT_WIDTH = 0.25  # points
+SPOOL_BYTES = 1 << 20  # keep up to this much of each SVG layer in memory before spilling to disk
+
+
+class SvgWriter:
+    """
+    SVG with a print layer (label fills and text) and a cut layer (label strip borders
+    and the edges between labels), as Inkscape layers that cutter software can tell apart.
+
+    Elements are written as pages are added. Each layer is spooled to a temporary file
+    and the two are joined on close, once the size of the canvas is known, so memory
+    use does not grow with the job. Pages are stacked top to bottom on one canvas.
+    """
+
+    def __init__(self, output_file, font):
+        """
+        Start a new SVG document.
+
+        :param output_file: Path or binary file object to write to.
+        :param font: FontFile used to place the text. Text is written as text in the
+                     font's family, so the font should be installed where it is printed.
+        """
+        self._output_file = output_file
+        self._font = font
+        self._print = tempfile.SpooledTemporaryFile(SPOOL_BYTES, mode='w+', encoding='utf-8')
+        self._cut = tempfile.SpooledTemporaryFile(SPOOL_BYTES, mode='w+', encoding='utf-8')
+        self._width = 0
+        self._height = 0
+
+    def add_page(self, page, width, height, x=0, y=0):
+        """
+        Append a page below the previous ones.
+
+        :param page: PageLayout to draw, in inches.
+        :param width: Page width in inches.
+        :param height: Page height in inches.
+        :param x: Left edge of the visible region in layout coordinates, in inches.
+        :param y: Bottom edge of the visible region in layout coordinates, in inches.
+        """
+        left = -x * POINTS_PER_INCH
+        top = self._height + (y + height) * POINTS_PER_INCH  # layout y runs up, SVG y down
+        self._width = max(self._width, width * POINTS_PER_INCH)
+        self._height += height * POINTS_PER_INCH
+
+        def point(px, py):
+            return _num(left + px * POINTS_PER_INCH), _num(top - py * POINTS_PER_INCH)
+
+        write = self._print.write
+        for (fx, fy, fw, fh), color in zip(_rows(page.fills), page.fill_colors):
+            px, py = point(fx, fy + fh)
+            write('<rect x="%s" y="%s" width="%s" height="%s" fill="%s"/>\n'
+                  % (px, py, _num(fw * POINTS_PER_INCH), _num(fh * POINTS_PER_INCH), _svg_color(color)))
+
+        font = self._font
+        ascent = font.lp_ascent / font.units_per_em
+        for tx, ty, wrapped_text, size in page.texts:
+            lines = wrapped_text.split('\n')
+            line_height = font.line_pitch(size) / POINTS_PER_INCH
+            baseline = ty + (font.text_height(len(lines), size) / 2 - ascent * size) / POINTS_PER_INCH
+            for line in lines:
+                px, py = point(tx, baseline)
+                write('<text x="%s" y="%s" font-size="%s" text-anchor="middle">%s</text>\n'
+                      % (px, py, _num(size), escape(line)))
+                baseline -= line_height
+
+        strips, segments = cut_shapes(page)
+        write = self._cut.write
+        for sx, sy, sw, sh in _rows(strips):
+            px, py = point(sx, sy + sh)
+            write('<rect x="%s" y="%s" width="%s" height="%s"/>\n'
+                  % (px, py, _num(sw * POINTS_PER_INCH), _num(sh * POINTS_PER_INCH)))
+        if len(segments):
+            write('<path d="')
+            for x0, y0, x1, y1 in _rows(segments):
+                (sx, sy), (ex, ey) = point(x0, y0), point(x1, y1)
+                write('M%s %sV%s' % (sx, sy, ey) if x0 == x1 else 'M%s %sH%s' % (sx, sy, ex))
+            write('"/>\n')
+
+    def close(self):
+        """
+        Write the document, joining the two layers, and close the file.
+        """
+        if hasattr(self._output_file, 'write'):
+            self._write_document(self._output_file)
+        else:
+            with open(self._output_file, 'wb') as handle:
+                self._write_document(handle)
+        self._print.close()
+        self._cut.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self._print.close()
+            self._cut.close()
+
+    def _write_document(self, handle):
+        width, height = _num(self._width), _num(self._height)
+        handle.write((
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<svg xmlns="http://www.w3.org/2000/svg" '
+            'xmlns:inkscape="http://www.inkscape.org/namespaces/inkscape" '
+            'width="%spt" height="%spt" viewBox="0 0 %s %s">\n'
+            '<g id="print" inkscape:groupmode="layer" inkscape:label="print" '
+            'font-family=%s>\n'
+            % (width, height, width, height, quoteattr('%s, sans-serif' % self._font.family_name))
+        ).encode('utf-8'))
+        _copy_spool(self._print, handle)
+        handle.write((
+            '</g>\n'
+            '<g id="cut" inkscape:groupmode="layer" inkscape:label="cut" '
+            'fill="none" stroke="%s" stroke-width="%s">\n' % (CUT_COLOR, _num(CUT_WIDTH))
+        ).encode('utf-8'))
+        _copy_spool(self._cut, handle)
+        handle.write(b'</g>\n</svg>\n')
+
+
+class HpglWriter:
+    """
+    HPGL cut paths for a vinyl or paper cutter: the cut layer of SvgWriter, written
+    straight to the file as pages are added. Pages are laid side by side along x, the
+    direction most cutters feed the medium.
+    """
+
+    def __init__(self, output_file):
+        """
+        Start a new HPGL program.
+
+        :param output_file: Path or binary file object to write to.
+        """
+        if hasattr(output_file, 'write'):
+            self._file = output_file
+            self._owns_file = False
+        else:
+            self._file = open(output_file, 'wb')
+            self._owns_file = True
+        self._left = 0
+        self._file.write(b'IN;SP1;\n')
+
+    def add_page(self, page, width, height, x=0, y=0):
+        """
+        Append a page to the right of the previous ones.
+
+        :param page: PageLayout to draw, in inches.
+        :param width: Page width in inches.
+        :param height: Page height in inches.
+        :param x: Left edge of the visible region in layout coordinates, in inches.
+        :param y: Bottom edge of the visible region in layout coordinates, in inches.
+        """
+        left = self._left - x
+        self._left += width
+
+        def point(px, py):
+            return round((left + px) * HPGL_UNITS_PER_INCH), round((py - y) * HPGL_UNITS_PER_INCH)
+
+        strips, segments = cut_shapes(page)
+        commands = []
+        for sx, sy, sw, sh in _rows(strips):
+            x0, y0 = point(sx, sy)
+            x1, y1 = point(sx + sw, sy + sh)
+            commands.append('PU%d,%d;PD%d,%d,%d,%d,%d,%d,%d,%d;' % (x0, y0, x1, y0, x1, y1, x0, y1, x0, y0))
+        for x0, y0, x1, y1 in _rows(segments):
+            commands.append('PU%d,%d;PD%d,%d;' % (point(x0, y0) + point(x1, y1)))
+        if commands:
+            self._file.write(('\n'.join(commands) + '\n').encode('ascii'))
+
+    def close(self):
+        """
+        Lift the tool, park it at the origin and close the file.
+        """
+        self._file.write(b'PU0,0;SP0;\n')
+        if self._owns_file:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.close()
+        elif self._owns_file:
+            self._file.close()
+
+
+def cut_shapes(page):
+    """
+    What to cut on a page: closed rectangles and open ``(x0, y0, x1, y1)`` segments.
+
+    With merged edges these are the label strip of every block and the edges between
+    its labels, so no line is cut twice; otherwise every label rectangle.
+    """
+    if page.label_edges is None:
+        return page.label_outlines, ()
+    return page.block_outlines[1::2], page.label_edges
+
+
+def _copy_spool(spool, handle):
+    spool.seek(0)
+    while True:
+        chunk = spool.read(1 << 16)
+        if not chunk:
+            break
+        handle.write(chunk.encode('utf-8'))
+
+
+def _svg_color(color):
+    return '#%02x%02x%02x' % tuple(round(channel * 255) for channel in _color_channels(color))
@@ -0,0 +1,214 @@
+import hashlib
+import io
+import os
+import threading
+
+from fontTools.pens.boundsPen import BoundsPen
+from fontTools.ttLib import TTFont
+
+LINE_SPACING = 1.2  # matplotlib's default Text linespacing
+MAX_SUBSETS = 32  # glyph subsets kept per font; a studio's sheets mostly share a few character sets
+
+
+class FontRegistry:
+    """
+    Fonts shared by every generator, page and job in the process.
+
+    Each font file is parsed once, however many generators use it, so the color and
+    black-and-white sheets of a batch share one FontFile and its text-fitting cache.
+    Entries are keyed by path, size and modification time, so a font that is replaced
+    on disk is parsed again. Safe to use from several threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._fonts = {}  # real path -> (size, mtime, FontFile)
+        self._properties = {}  # real path -> (size, mtime, matplotlib FontProperties)
+
+    def font_file(self, path):
+        """
+        Parsed FontFile for a font path.
+        """
+        return self._get(self._fonts, path, FontFile)
+
+    def properties(self, path):
+        """
+        matplotlib FontProperties for a font path. Imports matplotlib.
+        """
+        def load(real_path):
+            import matplotlib.font_manager as fm
+            return fm.FontProperties(fname=real_path)
+
+        return self._get(self._properties, path, load)
+
+    def clear(self):
+        with self._lock:
+            self._fonts.clear()
+            self._properties.clear()
+
+    def _get(self, entries, path, load):
+        real_path = os.path.realpath(path)
+        stat = os.stat(real_path)
+        with self._lock:
+            entry = entries.get(real_path)
+            if entry is not None and entry[:2] == (stat.st_size, stat.st_mtime_ns):
+                return entry[2]
+        value = load(real_path)
+        with self._lock:
+            entries[real_path] = (stat.st_size, stat.st_mtime_ns, value)
+        return value
+
+
+# The process-wide registry
+REGISTRY = FontRegistry()
+
+
+class FontFile:
+    """
+    Metrics and raw data of one TrueType or OpenType font file.
+
+    Only what the label renderers need is kept: advance widths for measuring and
+    centering text, the vertical metrics matplotlib uses to center a text box, and
+    the font program for embedding, whole or cut down to the glyphs a document uses.
+    Get instances from REGISTRY rather than parsing the same file again.
+    """
+
+    def __init__(self, path):
+        """
+        Parse a font file.
+
+        :param path: Path to a .ttf or .otf font.
+        """
+        self.path = path
+        with open(path, 'rb') as handle:
+            self.data = handle.read()
+
+        font = TTFont(path, lazy=True)
+        self.is_cff = 'CFF ' in font
+        self.cff_data = font.reader['CFF '] if self.is_cff else None
+        self.units_per_em = font['head'].unitsPerEm
+        self.bbox = (font['head'].xMin, font['head'].yMin, font['head'].xMax, font['head'].yMax)
+        self.ascender = font['hhea'].ascent
+        self.descender = font['hhea'].descent
+        os2 = font['OS/2'] if 'OS/2' in font else None
+        self.cap_height = getattr(os2, 'sCapHeight', 0) or self.ascender
+        self.postscript_name = _postscript_name(font, path)
+        self.family_name = _family_name(font) or self.postscript_name
+
+        cmap = font.getBestCmap() or {}
+        metrics = font['hmtx'].metrics
+        self._advances = {chr(code): metrics[glyph][0] for code, glyph in cmap.items()}
+        self._missing_advance = metrics[font.getGlyphOrder()[0]][0]
+
+        # matplotlib sizes a line of text by the extents of "lp", so the native
+        # renderers use the same reference glyphs to place baselines.
+        glyph_set = font.getGlyphSet()
+        self.lp_ascent = _glyph_bounds(glyph_set, cmap.get(ord('l')))[3] or self.ascender
+        self.lp_descent = -(_glyph_bounds(glyph_set, cmap.get(ord('p')))[1] or self.descender)
+        font.close()
+        self._subsets = {}
+        self._subsets_lock = threading.Lock()
+
+    def advance(self, char):
+        """
+        Advance width of a character in font units.
+        """
+        return self._advances.get(char, self._missing_advance)
+
+    def text_width(self, text, size):
+        """
+        Width of a single line of text in points.
+
+        :param text: Text to measure.
+        :param size: Font size in points.
+        """
+        return sum(self.advance(char) for char in text) * size / self.units_per_em
+
+    def line_pitch(self, size):
+        """
+        Distance between baselines of wrapped lines in points, as matplotlib spaces them.
+
+        :param size: Font size in points.
+        """
+        return (self.lp_ascent * LINE_SPACING + self.lp_descent) * size / self.units_per_em
+
+    def text_height(self, line_count, size):
+        """
+        Height of a block of wrapped text in points, from the top of the first line
+        to the bottom of the last.
+
+        :param line_count: Number of lines.
+        :param size: Font size in points.
+        """
+        extent = (self.lp_ascent + self.lp_descent) * size / self.units_per_em
+        return extent + self.line_pitch(size) * max(line_count - 1, 0)
+
+
+    def subset(self, chars):
+        """
+        The font program cut down to the glyphs of ``chars``, for embedding.
+
+        Glyph widths, vertical metrics and the character map of the kept glyphs stay as
+        they were, so text set with this font's metrics lines up exactly. Layout tables
+        and hinting are dropped. Subsetting takes a few tens of milliseconds, so the
+        last few subsets are cached; sheets with the same characters share one.
+
+        :param chars: Characters the document draws.
+        :return: ``(tag, program)``: a six-letter subset tag for the PostScript name, and
+                 the raw CFF data for CFF fonts or a complete TrueType file otherwise.
+        """
+        from fontTools import subset
+
+        chars = frozenset(chars) | {' '}
+        with self._subsets_lock:
+            if chars in self._subsets:
+                return self._subsets[chars]
+
+        options = subset.Options()
+        options.layout_features = []
+        # Text is placed glyph by glyph and never shaped, and hinting does nothing for
+        # print, so the tables for both go; FFTM is a FontForge timestamp
+        options.drop_tables += ['GSUB', 'GPOS', 'GDEF', 'kern', 'MATH', 'FFTM']
+        options.hinting = False
+        options.notdef_outline = True
+        options.recommended_glyphs = True
+        # Keep head.modified as it is, so the same glyphs give the same bytes in every process
+        font = TTFont(io.BytesIO(self.data), lazy=True, recalcTimestamp=False)
+        subsetter = subset.Subsetter(options)
+        subsetter.populate(unicodes=sorted({ord(char) for char in chars}))
+        subsetter.subset(font)
+        buffer = io.BytesIO()
+        font.save(buffer)
+        font.close()
+        program = buffer.getvalue()
+        if self.is_cff:
+            program = TTFont(io.BytesIO(program), lazy=True).reader['CFF ']
+
+        digest = hashlib.sha256(''.join(sorted(chars)).encode('utf-8')).digest()
+        tag = ''.join(chr(ord('A') + byte % 26) for byte in digest[:6])
+        with self._subsets_lock:
+            if len(self._subsets) >= MAX_SUBSETS:
+                self._subsets.pop(next(iter(self._subsets)))
+            self._subsets[chars] = (tag, program)
+        return tag, program
+
+
+def _glyph_bounds(glyph_set, glyph_name):
+    if glyph_name is None:
+        return (0, 0, 0, 0)
+    pen = BoundsPen(glyph_set)
+    glyph_set[glyph_name].draw(pen)
+    return pen.bounds or (0, 0, 0, 0)
+
+
+def _family_name(font):
+    if 'name' not in font:
+        return None
+    return font['name'].getDebugName(16) or font['name'].getDebugName(1)
+
+
+def _postscript_name(font, path):
+    name = font['name'].getDebugName(6) if 'name' in font else None
+    if not name:
+        name = path.rsplit('/', 1)[-1].rsplit('.', 1)[0]
+    return ''.join(char for char in name if char.isalnum() or char in '-_') or 'LabelFont'
@@ -0,0 +1,1183 @@
+import os
+
+from . import profiling
+from .layout import LabelTable, PageLayout
+from .spec import JACKS_PER_ROW, Block
+from .text_fit import fit_text
+
+FONT_ENV_VAR = 'PATCHBAY_LABELS_FONT'
+
+# Geometry and styling that differ between the two original sheets; block widths are
+# for the original 8-jack blocks and set the jack pitch of every bay size
+THEMES = {
+    'color': {'block_width': 2.85, 'block_spacing': 0.55, 'colored': True},
+    'bw': {'block_width': 2.75, 'block_spacing': 0.375, 'colored': False},
+}
+
+# How blocks are placed on the paper: 'grid' keeps spec order, left to right and top to
+# bottom; 'shelf' reorders them widest first to fill rows of mixed-size blocks tightly.
+PACKINGS = ('grid', 'shelf')
+STREAM_PAGES = 4  # pages of blocks read ahead at a time when laying out a stream
+TASKS_PER_WORKER = 4  # runs of pages per worker process in a parallel render, to even out their load
+
+# Render engines: matplotlib figures, PDF operators written directly, and the
+# print-and-cut outputs of cut_writer.py
+ENGINES = ('matplotlib', 'native', 'svg', 'hpgl')
+CUT_ENGINES = ('svg', 'hpgl')
+
+
+def default_font_path():
+    """
+    Font used when a generator is not given one.
+
+    ``$PATCHBAY_LABELS_FONT`` wins if it is set; otherwise the DejaVu Sans that ships with
+    matplotlib is located on disk without importing matplotlib.
+    """
+    font_path = os.environ.get(FONT_ENV_VAR)
+    if font_path:
+        return font_path
+
+    import importlib.util
+    spec = importlib.util.find_spec('matplotlib')
+    if spec is None or not spec.submodule_search_locations:
+        raise RuntimeError('No label font given: pass font_path or set $%s.' % FONT_ENV_VAR)
+    return os.path.join(list(spec.submodule_search_locations)[0], 'mpl-data', 'fonts', 'ttf', 'DejaVuSans.ttf')
+
+
+class PatchBayLabelGenerator:
+    def __init__(self, font_path=None, paper_width=11, paper_height=8.5, theme='color', jacks=JACKS_PER_ROW,
+                 packing='grid'):
+        """
+        Initialize the PatchBayLabelGenerator.
+
+        :param font_path: Path to the custom font file. Defaults to ``$PATCHBAY_LABELS_FONT``,
+                          or matplotlib's bundled DejaVu Sans when that is unset.
+        :param paper_width: Width of the paper in inches.
+        :param paper_height: Height of the paper in inches.
+        :param theme: 'color' for filled, colored labels or 'bw' for the black-and-white sheet.
+        :param jacks: Jacks per row of a block, such as 8, 12, 24 or 48. The jack pitch
+                      stays the same, so wider bays get wider blocks. Blocks read from a
+                      spec with their own "jacks" keep their own size.
+        :param packing: One of PACKINGS.
+        """
+        if theme not in THEMES:
+            raise ValueError("Theme must be one of: %s." % ', '.join(sorted(THEMES)))
+        if packing not in PACKINGS:
+            raise ValueError("Packing must be one of: %s." % ', '.join(PACKINGS))
+        if jacks < 1:
+            raise ValueError('A block needs at least one jack per row.')
+
+        self._font_path = font_path
+        self.theme = theme
+        self._custom_font = None
+        self._font_file = None
+        self.paper_width = paper_width
+        self.paper_height = paper_height
+        self.top_margin = 1
+        self.bottom_margin = 0.5
+        self.jacks = jacks
+        self.packing = packing
+        self.tt_width = THEMES[theme]['block_width'] / JACKS_PER_ROW
+        self.block_width = self.tt_width * jacks
+        self.block_height = 0.5
+        self.left_margin = 0.625
+        self.block_spacing = THEMES[theme]['block_spacing']
+        self.vertical_spacing = 0.75
+        self.colored = THEMES[theme]['colored']
+        self.label_cell_height = self.block_height / 2
+        self.jack_radius = 0.05
+        self.wrap_width = None  # None picks the best wrap per label; an int forces that many characters per line
+        self.font_size = 8  # Largest font size; labels are shrunk from here until they fit their span
+        self.merge_paths = True  # Merge shared outline edges and same-colored fills before drawing
+
+    def __getstate__(self):
+        # Parsed fonts hold locks and are shared per process; a copy in another
+        # process, such as a ProcessPoolExecutor worker, loads its own from REGISTRY
+        state = dict(self.__dict__)
+        state['_custom_font'] = state['_font_file'] = None
+        return state
+
+    def generate_labels(self, num_groups, labels_per_group, output_file='output_labels.pdf', paginate=False,
+                        batched=True, engine='matplotlib', cache=None, profile=None, workers=None):
+        """
+        Generate a printable patch bay labeling sheet.
+
+        :param num_groups: Number of TT groupings, or None for one per block of label data.
+        :param labels_per_group: List of label data for each group, or any iterable of
+                                 blocks, such as ``spec.iter_spec(path)`` or a database
+                                 cursor. Paginated 'grid' sheets rendered without a cache
+                                 read an iterator lazily, a few pages of blocks at a
+                                 time, so memory stays flat however long it is; a bad
+                                 block then stops the render when it is reached. Anything
+                                 else reads the whole iterator first.
+        :param output_file: Path to save the generated PDF.
+        :param paginate: Start a new page whenever the next row of blocks would run past
+                         the bottom margin, and write every page into one multi-page PDF.
+        :param batched: Draw all outlines, jack dots and fills of a page as a few collections
+                        instead of one artist per shape. The output looks the same.
+        :param engine: 'matplotlib' to render through a matplotlib figure, or 'native' to
+                       write PDF drawing operators directly with the font embedded. The
+                       native engine draws at physical scale on full paper-sized pages.
+                       'svg' writes an SVG for print-and-cut, with the fills and text on
+                       a print layer and the label outlines on a cut layer, and 'hpgl'
+                       the cut paths alone for a cutting plotter; see cut_writer.py.
+        :param cache: RenderCache or MemoryCache, or a directory for a RenderCache, holding
+                      earlier output. A sheet
+                      rendered before with the same labels, geometry, font and theme is
+                      copied from it; with the native engine only changed blocks are redrawn.
+        :param profile: profiling.Profiler to collect per-phase timings, counters and
+                        peak memory of this render into.
+        :param workers: Number of worker processes, or a concurrent.futures.Executor, to
+                        draw the pages of a native render on. The sheet is laid out and
+                        checked here; each worker draws a run of pages, and they are
+                        written into one document in order, with the font embedded
+                        once. Iterators are read whole first. Ignored with a cache,
+                        which only redraws changed blocks anyway.
+        :raises SpecError: If a label is malformed, runs off its block or overlaps another.
+                           Labels are checked before anything is written.
+        """
+        if engine not in ENGINES:
+            raise ValueError("Engine must be one of %s." % ', '.join(repr(name) for name in ENGINES))
+        if workers and engine != 'native':
+            raise ValueError("Drawing pages on workers needs engine='native'.")
+
+        with profiling.profiling(profile):
+            streaming = not isinstance(labels_per_group, (list, tuple))
+            if streaming and paginate and self.packing == 'grid' and cache is None and not workers:
+                pages = self.stream_pages(labels_per_group, num_groups)
+                if engine == 'native':
+                    self._write_native(pages, output_file)
+                elif engine in CUT_ENGINES:
+                    self._write_cut(pages, output_file, engine)
+                else:
+                    self._write_pages(pages, output_file, batched)
+                return
+
+            if streaming:
+                with profiling.phase('load'):
+                    labels_per_group = list(labels_per_group)
+            if num_groups is None:
+                num_groups = len(labels_per_group)
+            profiling.count('blocks', num_groups)
+
+            if cache is not None:
+                self._render_cached(cache, num_groups, labels_per_group, output_file, paginate, batched, engine)
+            elif workers:
+                self._write_native_parallel(num_groups, labels_per_group, output_file, paginate, workers)
+            else:
+                self._render(num_groups, labels_per_group, output_file, paginate, batched, engine)
+
+    async def generate_labels_async(self, num_groups, labels_per_group, output_file='output_labels.pdf',
+                                    executor=None, **options):
+        """
+        generate_labels for asyncio code: the render runs in ``executor`` while the event
+        loop carries on, so many sheets can be rendered concurrently.
+
+        Renders share no matplotlib state, so a thread pool renders several sheets at
+        once; matplotlib holds the GIL for most of a render, though, so a
+        ProcessPoolExecutor is the faster choice for CPU-bound batches. With a process
+        pool, pass a list of blocks and an output path rather than an iterator or an
+        open file, since the arguments are pickled.
+
+        :param executor: concurrent.futures.Executor to render in, or None for the event
+                         loop's default thread pool.
+        :param options: Any other argument of generate_labels.
+        """
+        import asyncio
+        import functools
+
+        render = functools.partial(self.generate_labels, num_groups, labels_per_group, output_file, **options)
+        await asyncio.get_running_loop().run_in_executor(executor, render)
+
+    def _render(self, num_groups, labels_per_group, output_file, paginate, batched, engine, format=None):
+        pages = self.layout_pages(num_groups, labels_per_group, paginate=paginate)
+
+        # A single sheet is cropped to its content the way bbox_inches='tight' used to,
+        # but the box is computed from the grid geometry so the page renders only once.
+        bbox = None
+        if not paginate:
+            with profiling.phase('bbox'):
+                bbox = self.content_bbox(num_groups, jacks=self.block_jacks(labels_per_group, num_groups))
+
+        if engine == 'native':
+            self._write_native(pages, output_file, bbox)
+            return
+        if engine in CUT_ENGINES:
+            self._write_cut(pages, output_file, engine, bbox)
+            return
+
+        if paginate:
+            self._write_pages(pages, output_file, batched)
+            return
+
+        fig, ax = self._new_page(bbox)
+        for page in pages:
+            self.draw_page(ax, page, batched=batched)
+        profiling.count('pages')
+
+        with profiling.phase('save'):
+            fig.savefig(output_file, format=format)
+
+    def _render_cached(self, cache, num_groups, labels_per_group, output_file, paginate, batched, engine):
+        """
+        Render through a RenderCache: whole documents for either engine, and for the
+        native engine also each block's drawing, so an edit only redraws its own block.
+        """
+        import io
+        from .cache import open_cache
+
+        cache = open_cache(cache)
+
+        blocks = [labels_per_group[index] if index < len(labels_per_group) else [] for index in range(num_groups)]
+        with profiling.phase('cache'):
+            signature = self.cache_signature()
+            block_keys = [cache.key('block', signature, self._label_key_data(labels)) for labels in blocks]
+
+        if hasattr(output_file, 'write'):
+            format = 'pdf'
+        else:
+            format = os.path.splitext(output_file)[1].lstrip('.').lower() or 'pdf'
+        if engine in CUT_ENGINES:
+            format = engine
+        elif engine == 'native' or paginate:
+            format = 'pdf'
+        with profiling.phase('cache'):
+            document_key = cache.key('document', signature, engine, bool(batched), bool(paginate), format, block_keys)
+            data = cache.get(document_key)
+        profiling.count('cache_hits' if data is not None else 'cache_misses')
+        if data is None:
+            buffer = io.BytesIO()
+            if engine == 'native':
+                self._write_native_blocks(blocks, block_keys, buffer, paginate, cache)
+            else:
+                self._render(num_groups, blocks, buffer, paginate, batched, engine, format)
+            data = buffer.getvalue()
+            with profiling.phase('cache'):
+                cache.put(document_key, data)
+
+        with profiling.phase('write'):
+            if hasattr(output_file, 'write'):
+                output_file.write(data)
+            else:
+                with open(output_file, 'wb') as handle:
+                    handle.write(data)
+
+    def cache_signature(self):
+        """
+        Everything besides the labels that changes how a sheet renders, as cache key data.
+        """
+        from .cache import file_digest
+
+        return {
+            'theme': self.theme,
+            'font': file_digest(self.font_path),
+            'paper': [self.paper_width, self.paper_height],
+            'margins': [self.top_margin, self.bottom_margin, self.left_margin],
+            'bay': [self.jacks, self.packing],
+            'block': [self.block_width, self.block_height, self.block_spacing, self.vertical_spacing],
+            'cells': [self.tt_width, self.label_cell_height, self.jack_radius],
+            'colored': self.colored,
+            'text': [self.font_size, self.wrap_width],
+            'merge_paths': self.merge_paths,
+        }
+
+    def _label_key_data(self, labels):
+        data = [
+            [label['text'], label['start'], label['span'], label['row'],
+             label.get('color') if self.colored else None]
+            for label in labels
+        ]
+        jacks = getattr(labels, 'jacks', None)
+        return [jacks] + data if jacks and jacks != self.jacks else data
+
+    def generate_previews(self, num_groups, labels_per_group, output_dir='previews', dpi=72, per='page',
+                          paginate=True, cache=None):
+        """
+        Write low-resolution PNG previews of a sheet, one per page or one per block.
+
+        Previews are rasterized directly with matplotlib's Agg backend, which is much
+        quicker than saving the print PDF. See preview.Previewer.
+
+        :param num_groups: Number of TT groupings, or None for one per block of label data.
+        :param labels_per_group: Label data for each group.
+        :param output_dir: Directory to write ``page-001.png``... or ``block-001.png``... into.
+        :param dpi: Preview resolution, one of preview.PREVIEW_DPIS.
+        :param per: 'page' or 'block'.
+        :param paginate: Preview paper-sized pages rather than one cropped sheet. Block
+                         previews are always cut from paper-sized pages.
+        :param cache: RenderCache, or a directory for one, to keep previews between runs.
+        :return: List of the PNG paths written.
+        """
+        from .preview import Previewer
+
+        if per not in ('page', 'block'):
+            raise ValueError("Previews must be per 'page' or per 'block'.")
+        previewer = Previewer(self, cache, paginate)
+        previews = (previewer.pages if per == 'page' else previewer.blocks)(num_groups, labels_per_group, dpi)
+
+        os.makedirs(output_dir, exist_ok=True)
+        paths = []
+        for number, data in enumerate(previews, 1):
+            path = os.path.join(output_dir, '%s-%03d.png' % (per, number))
+            with open(path, 'wb') as handle:
+                handle.write(data)
+            paths.append(path)
+        return paths
+
+    def _write_pages(self, pages, output_file, batched):
+        """
+        Stream the sheet into a multi-page PDF, one page at a time.
+
+        Each page's figure is dropped as soon as it has been written, so only one page
+        is ever held in memory regardless of how many blocks the job has.
+        """
+        with profiling.phase('setup'):
+            from matplotlib.backends.backend_pdf import PdfPages
+            _ = self.custom_font  # load the font now, so its cost is billed to setup rather than the first page
+
+        # Drawing phases nest inside 'save', which keeps what is left: serializing pages
+        with profiling.phase('save'), PdfPages(output_file) as pdf:
+            for page in pages:
+                fig, ax = self._new_page()
+                self.draw_page(ax, page, batched=batched)
+                profiling.count('pages')
+                pdf.savefig(fig)
+
+    def _write_native(self, pages, output_file, bbox=None):
+        """
+        Write pages straight to PDF operators, without building any matplotlib figure.
+        """
+        from .pdf_writer import BLOCK_FORM, PdfWriter, page_content
+
+        x0, y0, x1, y1 = bbox or (0, 0, self.paper_width, self.paper_height)
+        with profiling.phase('setup'):
+            font = self.font_file
+        forms = set()
+        with profiling.phase('write'), PdfWriter(output_file, font) as pdf:
+            for page in pages:
+                self._add_block_forms(pdf, page.block_jacks, forms)
+                with profiling.phase('content'):
+                    content = page_content(page, font, self.jack_radius, BLOCK_FORM)
+                pdf.use_text(text for _, _, text, _ in page.texts)
+                pdf.add_page(x1 - x0, y1 - y0, content, x=x0, y=y0)
+                profiling.count('pages')
+
+    def _write_native_parallel(self, num_groups, labels_per_group, output_file, paginate, workers):
+        """
+        Native render with the pages drawn and compressed on worker processes.
+
+        Blocks are placed and every label is checked here first, so a bad label fails
+        the same way as in a serial render. The pages are then split into runs, each
+        sent to a worker with just its own labels and block positions. Runs come back in
+        order and are written as they arrive, adding the block forms and font glyphs
+        they use, so the document is the same as _write_native would write.
+        """
+        import math
+        from concurrent.futures import Executor, ProcessPoolExecutor
+
+        import numpy as np
+        from .pdf_writer import PdfWriter
+
+        with profiling.phase('layout'):
+            table, block_pages, xs, ys = self._arrange(num_groups, labels_per_group, paginate)
+        profiling.count('labels', len(table))
+        bbox = (0, 0, self.paper_width, self.paper_height)
+        if not paginate:
+            with profiling.phase('bbox'):
+                bbox = self.content_bbox(num_groups, jacks=self.block_jacks(labels_per_group, num_groups))
+        x0, y0, x1, y1 = bbox
+
+        page_count = int(block_pages[-1]) + 1 if len(block_pages) else 0
+        count = workers if isinstance(workers, int) else os.cpu_count() or 1
+        per_task = max(1, math.ceil(page_count / (count * TASKS_PER_WORKER)))
+        first_pages = list(range(0, page_count, per_task)) + [page_count]
+        block_bounds = np.searchsorted(block_pages, first_pages).tolist()
+        label_bounds = np.searchsorted(table.records['block'], block_bounds).tolist()
+        tasks = []
+        for index in range(len(first_pages) - 1):
+            blocks = slice(block_bounds[index], block_bounds[index + 1])
+            records = table.records[label_bounds[index]:label_bounds[index + 1]].copy()
+            records['block'] -= blocks.start
+            tasks.append((self, records, table.jacks[blocks], xs[blocks], ys[blocks],
+                          block_pages[blocks] - first_pages[index]))
+
+        with profiling.phase('setup'):
+            font = self.font_file
+        executor = workers if isinstance(workers, Executor) else ProcessPoolExecutor(min(workers, len(tasks) or 1))
+        forms = set()
+        try:
+            with profiling.phase('write'), PdfWriter(output_file, font) as pdf:
+                for pages in executor.map(_draw_pages, tasks):
+                    for content, sizes, chars in pages:
+                        self._add_block_forms(pdf, sizes, forms)
+                        pdf.use_text(chars)
+                        pdf.add_page(x1 - x0, y1 - y0, content, x=x0, y=y0, compressed=True)
+                        profiling.count('pages')
+        finally:
+            if executor is not workers:
+                executor.shutdown()
+
+    def _write_cut(self, pages, output_file, engine, bbox=None):
+        """
+        Write pages as an SVG with print and cut layers, or as HPGL cut paths.
+        """
+        from .cut_writer import HpglWriter, SvgWriter
+
+        x0, y0, x1, y1 = bbox or (0, 0, self.paper_width, self.paper_height)
+        with profiling.phase('setup'):
+            font = self.font_file
+        writer = SvgWriter(output_file, font) if engine == 'svg' else HpglWriter(output_file)
+        with profiling.phase('write'), writer:
+            for page in pages:
+                writer.add_page(page, x1 - x0, y1 - y0, x=x0, y=y0)
+                profiling.count('pages')
+
+    def _add_block_forms(self, pdf, sizes, added):
+        """
+        Write the outlines and jack dots that every block of one size shares as a single
+        PDF form, for each of ``sizes`` not yet in the set ``added``.
+        """
+        from .pdf_writer import BLOCK_FORM
+
+        margin = 1 / 72  # room for the 1 pt outline stroke
+        for size in sorted({int(size) for size in sizes} - added):
+            chrome = next(self.block_contents([Block(jacks=size)], inline_chrome=True))
+            pdf.add_form('%s%d' % (BLOCK_FORM, size), chrome,
+                         (-margin, -self.block_height * 2 - margin, size * self.tt_width + margin, margin))
+            added.add(size)
+
+    def _write_native_blocks(self, blocks, block_keys, output_file, paginate, cache):
+        """
+        Native render assembled from per-block drawings, taking each from the cache when
+        it is there and drawing only the blocks that are not.
+        """
+        from .pdf_writer import PdfWriter, place_content
+
+        fragments = {}
+        missing = {}
+        with profiling.phase('cache'):
+            for key, labels in zip(block_keys, blocks):
+                if key not in fragments:
+                    fragments[key] = cache.get(key)
+                    if fragments[key] is None:
+                        missing[key] = labels
+        profiling.count('block_cache_hits', len(fragments) - len(missing))
+        profiling.count('block_cache_misses', len(missing))
+        for key, fragment in zip(missing, self.block_contents(list(missing.values()))):
+            fragments[key] = fragment
+            with profiling.phase('cache'):
+                cache.put(key, fragment)
+
+        jacks = self.block_jacks(blocks, len(blocks))
+        bbox = (0, 0, self.paper_width, self.paper_height) if paginate else self.content_bbox(len(blocks), jacks=jacks)
+        x0, y0, x1, y1 = bbox
+        # Shelf packing can move blocks out of spec order, so place them page by page
+        placed = sorted(zip(self.block_origins(len(blocks), paginate, jacks), block_keys), key=lambda item: item[0][0])
+        with profiling.phase('write'), PdfWriter(output_file, self.font_file) as pdf:
+            pdf.use_text(label['text'] for labels in blocks for label in labels)
+            self._add_block_forms(pdf, jacks or [self.jacks], set())
+            current_page, parts = 0, []
+            for (page_index, x, y), key in placed:
+                if page_index != current_page:
+                    pdf.add_page(x1 - x0, y1 - y0, b'\n'.join(parts), x=x0, y=y0)
+                    current_page, parts = page_index, []
+                parts.append(place_content(fragments[key], x, y))
+            if parts:
+                pdf.add_page(x1 - x0, y1 - y0, b'\n'.join(parts), x=x0, y=y0)
+            profiling.count('pages', current_page + 1 if parts else 0)
+
+    def block_contents(self, blocks, inline_chrome=False):
+        """
+        PDF content stream of each block on its own, with its top-left corner at the origin.
+
+        :param blocks: List of label lists.
+        :param inline_chrome: Draw the block outlines and jack dots out in full instead of
+                              stamping them from the shared block form.
+        :return: Iterator of content stream bytes, one per block.
+        """
+        import numpy as np
+        from .pdf_writer import BLOCK_FORM, page_content
+
+        with profiling.phase('layout'):
+            table = LabelTable.from_blocks(blocks, len(blocks), self.jacks)
+            table.check_spans()
+            origin = np.zeros(len(blocks))
+            geometry = self._layout_arrays(table, origin, origin)
+            label_bounds = np.searchsorted(table.records['block'], np.arange(len(blocks) + 1)).tolist()
+        if not inline_chrome:
+            profiling.count('labels', len(table))
+        for index in range(len(blocks)):
+            labels = slice(label_bounds[index], label_bounds[index + 1])
+            page = self._cut_page(0, geometry, table.records[labels], slice(index, index + 1), labels)
+            with profiling.phase('content'):
+                content = page_content(page, self.font_file, self.jack_radius, None if inline_chrome else BLOCK_FORM)
+            yield content
+
+    @property
+    def font_path(self):
+        """
+        Path of the label font, resolved to the default font on first use.
+        """
+        if not self._font_path:
+            self._font_path = default_font_path()
+        return self._font_path
+
+    @property
+    def font_file(self):
+        """
+        Parsed metrics and data of the label font, from the process-wide font registry.
+        """
+        if self._font_file is None:
+            from .fonts import REGISTRY
+            self._font_file = REGISTRY.font_file(self.font_path)
+        return self._font_file
+
+    @property
+    def custom_font(self):
+        """
+        matplotlib FontProperties for the label font, created on first render.
+        """
+        if self._custom_font is None:
+            from .fonts import REGISTRY
+            self._custom_font = REGISTRY.properties(self.font_path)
+        return self._custom_font
+
+    def _new_page(self, bbox=None):
+        """
+        Create a full-bleed page where one data unit is one inch of paper.
+
+        The figure is owned by the caller alone: it is never registered with pyplot,
+        so renders in several threads do not share any figure state, and it is freed
+        once it is no longer referenced.
+
+        :param bbox: ``(x0, y0, x1, y1)`` region of the paper to show, in inches.
+                     Defaults to the whole sheet.
+        """
+        with profiling.phase('figure'):
+            from matplotlib.figure import Figure
+
+            x0, y0, x1, y1 = bbox or (0, 0, self.paper_width, self.paper_height)
+            fig = Figure(figsize=(x1 - x0, y1 - y0))
+            ax = fig.add_axes([0, 0, 1, 1])
+            ax.set_xlim(x0, x1)
+            ax.set_ylim(y0, y1)
+            ax.axis('off')
+        return fig, ax
+
+    def blocks_per_row(self):
+        """
+        Number of blocks that fit side by side between the left margin and the paper edge.
+        """
+        count = 1
+        current_x = self.left_margin + self.block_width + self.block_spacing
+        while current_x + self.block_width <= self.paper_width:
+            count += 1
+            current_x += self.block_width + self.block_spacing
+        return count
+
+    def content_bbox(self, num_groups, pad=0.1, jacks=None):
+        """
+        Bounding box of a single-sheet layout, computed from the grid geometry alone.
+
+        Matches what ``bbox_inches='tight'`` measured by rendering: the block outlines
+        (including half of their 1 pt stroke) plus ``pad`` inches, limited to the paper.
+
+        :param num_groups: Number of TT groupings.
+        :param pad: Padding around the content in inches.
+        :param jacks: Jacks per row of every block, from block_jacks. None when they all
+                      have the generator's size.
+        :return: ``(x0, y0, x1, y1)`` in inches from the bottom-left corner of the paper.
+        """
+        if num_groups <= 0:
+            return (0, 0, self.paper_width, self.paper_height)
+
+        top_y = self.paper_height - self.top_margin
+        margin = pad + 0.5 / 72
+        if jacks is None and self.packing == 'grid':
+            per_row = self.blocks_per_row()
+            rows = -(-num_groups // per_row)
+            columns = min(num_groups, per_row)
+            right = self.left_margin + (columns - 1) * (self.block_width + self.block_spacing) + self.block_width
+            bottom = top_y - (rows - 1) * (self.block_height * 2 + self.vertical_spacing) - self.block_height * 2
+        else:
+            sizes = jacks or [self.jacks] * num_groups
+            origins = self._place(sizes, paginate=False)
+            right = max(x + size * self.tt_width for (_, x, _), size in zip(origins, sizes))
+            bottom = min(y for _, _, y in origins) - self.block_height * 2
+
+        x0 = self.left_margin - margin
+        x1 = right + margin
+        y1 = top_y + margin
+        y0 = bottom - margin
+        return (max(x0, 0), max(y0, 0), min(x1, self.paper_width), min(y1, self.paper_height))
+
+    def layout_pages(self, num_groups, labels_per_group, paginate=False, pages=None):
+        """
+        Lay the sheet out into drawing primitives without touching matplotlib.
+
+        The labels are packed into a LabelTable and checked, and the geometry of every
+        block and label is computed in one vectorized pass, all before this returns, so
+        bad label data fails before any page is drawn. Pages are then cut out of the
+        arrays one at a time as the iterator is consumed; only text fitting runs per
+        label, and it is cached. Blocks that 'shelf' packing moved out of spec order are
+        drawn in page order.
+
+        :param num_groups: Number of TT groupings.
+        :param labels_per_group: List of label data for each group.
+        :param paginate: Break onto a new page instead of running off the bottom of the sheet.
+        :param pages: Indices of the pages to lay out, skipping the text fitting of all
+                      others. Defaults to every page.
+        :return: Iterator of PageLayout objects.
+        :raises SpecError: If a label is malformed, runs off its block or overlaps another.
+        """
+        with profiling.phase('layout'):
+            table, block_pages, xs, ys = self._arrange(num_groups, labels_per_group, paginate)
+            geometry = self._layout_arrays(table, xs, ys)
+        profiling.count('labels', len(table))
+        return self._cut_pages(table, block_pages, geometry, pages)
+
+    def _arrange(self, num_groups, labels_per_group, paginate):
+        """
+        Place every block and pack and check the labels, in page order.
+
+        :return: ``(table, pages, xs, ys)``: the LabelTable and the page and top-left
+                 corner of every block.
+        """
+        import numpy as np
+
+        jacks = self.block_jacks(labels_per_group, num_groups)
+        block_pages, xs, ys = self.block_origin_arrays(num_groups, paginate, jacks)
+        if len(block_pages) > 1 and (np.diff(block_pages) < 0).any():
+            order = np.argsort(block_pages, kind='stable')
+            labels_per_group = [labels_per_group[index] if index < len(labels_per_group) else []
+                                for index in order.tolist()]
+            block_pages, xs, ys = block_pages[order], xs[order], ys[order]
+        table = LabelTable.from_blocks(labels_per_group, num_groups, self.jacks)
+        table.check_spans()
+        return table, block_pages, xs, ys
+
+    def _cut_pages(self, table, block_pages, geometry, pages=None):
+        """
+        Iterator of the pages of a laid-out sheet, or of just the indices in ``pages``.
+        """
+        import numpy as np
+
+        # First block and first label of every page, plus one past the end
+        page_count = int(block_pages[-1]) + 1 if len(block_pages) else 0
+        block_bounds = np.searchsorted(block_pages, np.arange(page_count + 1)).tolist()
+        label_bounds = np.searchsorted(table.records['block'], block_bounds).tolist()
+        wanted = range(page_count) if pages is None else sorted(set(pages) & set(range(page_count)))
+        return (
+            self._cut_page(index, geometry, table.records[label_bounds[index]:label_bounds[index + 1]],
+                           slice(block_bounds[index], block_bounds[index + 1]),
+                           slice(label_bounds[index], label_bounds[index + 1]))
+            for index in wanted
+        )
+
+    def stream_pages(self, labels_per_group, num_groups=None):
+        """
+        Lay out a stream of blocks into paginated 'grid' pages, reading only as far ahead
+        as the next few pages need.
+
+        Grid packing starts every page afresh at its top-left corner, so the blocks of
+        finished pages can be laid out and let go while the rest of the stream is still
+        unread. Pages are the same as layout_pages would give for the whole list.
+
+        :param labels_per_group: Iterable of label lists, one per block.
+        :param num_groups: Number of blocks, padding a short stream with empty blocks,
+                           or None for every block in the stream.
+        :return: Iterator of PageLayout objects.
+        :raises SpecError: When a block is reached that breaks the label rules.
+        """
+        import itertools
+
+        if self.packing != 'grid':
+            raise ValueError("Only 'grid' packing can be laid out from a stream.")
+        blocks = iter(labels_per_group)
+        if num_groups is not None:
+            blocks = itertools.islice(itertools.chain(blocks, itertools.repeat([])), num_groups)
+        chunk_size = self.blocks_per_row() * self.rows_per_page() * STREAM_PAGES
+
+        pending = []  # blocks read but not yet on a finished page
+        first_page = 0
+        while True:
+            with profiling.phase('load'):
+                chunk = list(itertools.islice(blocks, chunk_size))
+            profiling.count('blocks', len(chunk))
+            pending += chunk
+            final = len(chunk) < chunk_size
+            if not pending:
+                return
+            jacks = self.block_jacks(pending, len(pending))
+            block_pages = self.block_origin_arrays(len(pending), True, jacks)[0]
+            # Keep the last page's blocks back unless the stream has ended: more may join it
+            last_page = int(block_pages[-1])
+            done = len(pending) if final else int((block_pages < last_page).sum())
+            if done:
+                for page in self.layout_pages(done, pending[:done], paginate=True):
+                    page.index += first_page
+                    yield page
+                first_page += last_page
+                pending = pending[done:]
+            if final:
+                return
+
+    def rows_per_page(self):
+        """
+        Number of block rows that fit between the top and bottom margins of one page.
+        """
+        pitch = self.block_height * 2 + self.vertical_spacing
+        top_y = self.paper_height - self.top_margin
+        rows = 1
+        while top_y - rows * pitch - self.block_height * 2 >= self.bottom_margin:
+            rows += 1
+        return rows
+
+    def block_jacks(self, labels_per_group, num_groups):
+        """
+        Jacks per row of every block, or None when they all have the generator's ``jacks``.
+
+        :param labels_per_group: Sequence of label lists. spec.Block entries carry their own size.
+        :param num_groups: Number of TT groupings.
+        """
+        sizes = [getattr(labels, 'jacks', None) for labels in labels_per_group[:num_groups]]
+        if not any(size and size != self.jacks for size in sizes):
+            return None
+        return [size or self.jacks for size in sizes] + [self.jacks] * (num_groups - len(sizes))
+
+    def block_origins(self, num_groups, paginate=False, jacks=None):
+        """
+        Yield ``(page, x, y)`` for the top-left corner of each block, left to right
+        and top to bottom.
+
+        Pure Python, so callers that only need positions do not have to import NumPy.
+
+        :param num_groups: Number of TT groupings.
+        :param paginate: Move to the top of a new page when a row of blocks would
+                         cross the bottom margin. Without it every block stays on page 0.
+        :param jacks: Jacks per row of every block, from block_jacks. None when they all
+                      have the generator's size.
+        """
+        if jacks is not None or self.packing != 'grid':
+            yield from self._place(jacks or [self.jacks] * num_groups, paginate)
+            return
+
+        per_row = self.blocks_per_row()
+        per_page = self.rows_per_page()
+        top_y = self.paper_height - self.top_margin
+        for index in range(num_groups):
+            row, column = divmod(index, per_row)
+            page, row = divmod(row, per_page) if paginate else (0, row)
+            yield (page, self.left_margin + column * (self.block_width + self.block_spacing),
+                   top_y - row * (self.block_height * 2 + self.vertical_spacing))
+
+    def block_origin_arrays(self, num_groups, paginate=False, jacks=None):
+        """
+        Vectorized block_origins.
+
+        :return: ``(pages, xs, ys)`` arrays with one entry per block.
+        """
+        import numpy as np
+
+        if jacks is not None or self.packing != 'grid':
+            origins = np.array(self._place(jacks or [self.jacks] * num_groups, paginate), dtype=float).reshape(-1, 3)
+            return origins[:, 0].astype(int), origins[:, 1], origins[:, 2]
+
+        row, column = np.divmod(np.arange(num_groups), self.blocks_per_row())
+        if paginate:
+            pages, row = np.divmod(row, self.rows_per_page())
+        else:
+            pages = np.zeros(num_groups, dtype=int)
+        xs = self.left_margin + column * (self.block_width + self.block_spacing)
+        ys = self.paper_height - self.top_margin - row * (self.block_height * 2 + self.vertical_spacing)
+        return pages, xs, ys
+
+    def _place(self, jacks, paginate):
+        """
+        Place blocks of mixed sizes row by row.
+
+        Every block is as tall as any other, so each row is a shelf and packing is one
+        dimensional. 'grid' packing fills one row at a time in spec order (next fit).
+        'shelf' packing takes blocks widest first and puts each on the first row with
+        room left (first-fit decreasing), which needs the fewest rows, and so sheets,
+        for mixed sizes. Each row only ever fills up, so the first row that could take a
+        size is remembered per size and the whole pass stays linear. Neighbours keep
+        ``block_spacing`` between them as a cutting gutter. A block wider than the paper
+        gets a row of its own.
+
+        :param jacks: Jacks per row of every block.
+        :return: List of ``(page, x, y)`` in block order.
+        """
+        widths = [size * self.tt_width for size in jacks]
+        shelf = self.packing == 'shelf'
+        order = sorted(range(len(widths)), key=widths.__getitem__, reverse=True) if shelf else range(len(widths))
+
+        rows = []  # next free x on each row
+        first_open = {}
+        placed = [None] * len(widths)
+        for index in order:
+            width = widths[index]
+            if shelf:
+                row = first_open.get(jacks[index], 0)
+                while row < len(rows) and rows[row] + width > self.paper_width:
+                    row += 1
+                first_open[jacks[index]] = row
+            else:
+                row = len(rows) - 1
+                if row < 0 or rows[row] + width > self.paper_width:
+                    row = len(rows)
+            if row == len(rows):
+                rows.append(self.left_margin)
+            placed[index] = (row, rows[row])
+            rows[row] += width + self.block_spacing
+
+        per_page = self.rows_per_page()
+        top_y = self.paper_height - self.top_margin
+        pitch = self.block_height * 2 + self.vertical_spacing
+        origins = []
+        for row, x in placed:
+            page, row = divmod(row, per_page) if paginate else (0, row)
+            origins.append((page, x, top_y - row * pitch))
+        return origins
+
+    def sheet_utilization(self, num_groups, paginate=True, jacks=None):
+        """
+        How much of the paper a layout covers with blocks.
+
+        Paper and printing time are what a large job really costs, so this is the number
+        to watch when choosing a bay size, paper size or packing.
+
+        :param num_groups: Number of TT groupings.
+        :param paginate: Measure paper-sized pages rather than one long sheet.
+        :param jacks: Jacks per row of every block, from block_jacks.
+        :return: Dictionary with the number of ``pages`` and ``blocks``, the overall
+                 ``utilization`` and per-page ``page_utilization`` as fractions of the
+                 paper area, and the number of ``oversized`` blocks that run off the paper.
+        """
+        sizes = jacks or [self.jacks] * num_groups
+        covered = []
+        oversized = 0
+        for (page, x, _), size in zip(self.block_origins(num_groups, paginate, jacks), sizes):
+            width = size * self.tt_width
+            if x + width > self.paper_width:
+                oversized += 1
+                width = max(self.paper_width - x, 0)  # only what lands on the paper counts
+            covered.extend([0.0] * (page + 1 - len(covered)))
+            covered[page] += width * self.block_height * 2
+
+        area = self.paper_width * self.paper_height
+        return {
+            'pages': len(covered),
+            'blocks': num_groups,
+            'utilization': sum(covered) / (area * len(covered)) if covered else 0.0,
+            'page_utilization': [value / area for value in covered],
+            'oversized': oversized,
+        }
+
+    def _layout_arrays(self, table, xs, ys):
+        """
+        Geometry of every block and label of a sheet at once.
+
+        Block shapes are stored block-major (two outlines and two rows of jack dots per
+        block) so a run of blocks maps onto a contiguous slice of each array;
+        ``dot_bounds`` holds where each block's dots start. Fills, and the merged edges
+        when ``merge_paths`` is on, are block-major too, with ``*_bounds`` alike.
+        """
+        import numpy as np
+
+        count = len(xs)
+        bh = self.block_height
+        label_ys = ys - bh * 2
+        jacks = table.jacks
+
+        outlines = np.empty((count, 2, 4))
+        outlines[:, 0, 0] = outlines[:, 1, 0] = xs
+        outlines[:, 0, 1] = ys - bh
+        outlines[:, 1, 1] = label_ys
+        outlines[:, :, 2] = (jacks * self.tt_width)[:, None]
+        outlines[:, :, 3] = bh
+
+        # Jack centres: two rows per block
+        dot_y = -(np.arange(2) * (bh / 2) + bh / 4)
+        dot_bounds = np.concatenate(([0], np.cumsum(jacks * 2, dtype=np.int64)))
+        if count and jacks.min() == jacks.max():
+            size = int(jacks[0])
+            dot_x = (np.arange(size) + 0.5) * self.tt_width
+            dots = np.empty((count, 2, size, 2))
+            dots[..., 0] = xs[:, None, None] + dot_x
+            dots[..., 1] = ys[:, None, None] + dot_y[:, None]
+            dots = dots.reshape(-1, 2)
+        else:
+            block = np.repeat(np.arange(count), jacks * 2)
+            row, jack = np.divmod(np.arange(dot_bounds[-1]) - dot_bounds[block], jacks[block])
+            dots = np.column_stack((xs[block] + (jack + 0.5) * self.tt_width, ys[block] + dot_y[row]))
+
+        records = table.records
+        start = records['start'].astype(float)
+        widths = records['span'] * self.tt_width
+        row = records['row']
+        # top, bottom and both rows, indexed by ROW_CODES
+        text_offset = np.array([0.75, 0.25, 0.5]) * bh
+        rect_offset = np.array([self.label_cell_height, 0, 0])
+        rect_height = np.array([self.label_cell_height, self.label_cell_height, bh])
+
+        block_x = xs[records['block']]
+        block_y = label_ys[records['block']]
+        rects = np.empty((len(records), 4))
+        rects[:, 0] = block_x + start * self.tt_width
+        rects[:, 1] = block_y + rect_offset[row]
+        rects[:, 2] = widths
+        rects[:, 3] = rect_height[row]
+        anchors = np.column_stack((rects[:, 0] + widths / 2, block_y + text_offset[row]))
+
+        colored = records['color'] != None  # noqa: E711 - elementwise comparison
+        if not self.colored:
+            colored[:] = False
+        fills, fill_colors, fill_blocks = rects[colored], records['color'][colored], records['block'][colored]
+        outlines = outlines.reshape(-1, 4)
+        geometry = {
+            'origins': np.column_stack((xs, ys)),
+            'jacks': jacks,
+            'outlines': outlines,
+            'dots': dots,
+            'dot_bounds': dot_bounds,
+            'rects': rects,
+            'anchors': anchors,
+        }
+        if self.merge_paths:
+            from .optimize import label_edges, merge_fills, outline_edges
+
+            fills, fill_colors, fill_blocks = merge_fills(fills, fill_colors, fill_blocks)
+            block_edges, edge_blocks = outline_edges(outlines, np.arange(count).repeat(2))
+            edges, label_edge_blocks = label_edges(rects, outlines[1::2], records['block'])
+            geometry.update({
+                'block_edges': block_edges,
+                'block_edge_bounds': np.searchsorted(edge_blocks, np.arange(count + 1)),
+                'label_edges': edges,
+                'label_edge_bounds': np.searchsorted(label_edge_blocks, np.arange(count + 1)),
+            })
+        geometry.update({
+            'fills': fills,
+            'fill_colors': fill_colors,
+            'fill_bounds': np.searchsorted(fill_blocks, np.arange(count + 1)),
+        })
+        return geometry
+
+    def _cut_page(self, page_index, geometry, records, blocks, labels):
+        """
+        Slice one page out of the sheet geometry and fit its label text.
+        """
+        page = PageLayout(page_index)
+        page.block_origins = geometry['origins'][blocks]
+        page.block_jacks = geometry['jacks'][blocks]
+        page.block_outlines = geometry['outlines'][blocks.start * 2:blocks.stop * 2]
+        page.dots = geometry['dots'][geometry['dot_bounds'][blocks.start]:geometry['dot_bounds'][blocks.stop]]
+        rects = geometry['rects'][labels]
+        page.label_outlines = rects
+        fills = slice(geometry['fill_bounds'][blocks.start], geometry['fill_bounds'][blocks.stop])
+        page.fills = geometry['fills'][fills]
+        page.fill_colors = geometry['fill_colors'][fills].tolist()
+        if 'block_edges' in geometry:
+            bounds = geometry['block_edge_bounds']
+            page.block_edges = geometry['block_edges'][bounds[blocks.start]:bounds[blocks.stop]]
+            bounds = geometry['label_edge_bounds']
+            page.label_edges = geometry['label_edges'][bounds[blocks.start]:bounds[blocks.stop]]
+
+        with profiling.phase('text'):
+            page.texts = [
+                (x, y) + fit_text(self.font_file, text, width, height, self.font_size, self.wrap_width)
+                for (x, y), (width, height), text in zip(
+                    geometry['anchors'][labels].tolist(), rects[:, 2:].tolist(), records['text']
+                )
+            ]
+        if profiling.active():
+            profiling.count('glyphs', sum(len(text) - text.count(' ') - text.count('\n')
+                                          for _, _, text, _ in page.texts))
+        return page
+
+    def draw_page(self, ax, page, batched=True):
+        """
+        Draw a laid-out page onto a matplotlib axes.
+
+        :param ax: Axes whose data coordinates are inches of paper.
+        :param page: PageLayout to draw.
+        :param batched: Emit outlines, dots and fills as collections rather than one patch each.
+                        Only collections draw the merged edges of ``merge_paths``.
+        """
+        with profiling.phase('draw'):
+            if batched:
+                self._draw_collections(ax, page)
+            else:
+                self._draw_patches(ax, page)
+
+            for x, y, wrapped_text, font_size in page.texts:
+                ax.text(
+                    x, y,
+                    wrapped_text,
+                    ha='center',
+                    va='center',
+                    fontsize=font_size,
+                    fontproperties=self.custom_font,
+                    clip_on=True,
+                    zorder=3
+                )
+        profiling.count('artists', page.artist_count(batched))
+
+    def _draw_patches(self, ax, page):
+        import matplotlib.patches as patches
+
+        for x, y, width, height in page.block_outlines:
+            ax.add_patch(patches.Rectangle((x, y), width, height, fill=False, edgecolor='black'))
+
+        for x, y in page.dots:
+            ax.add_patch(patches.Circle((x, y), self.jack_radius, color='black'))
+
+        for (x, y, width, height), label_color in zip(page.fills, page.fill_colors):
+            ax.add_patch(patches.Rectangle(
+                (x, y),
+                width,
+                height,
+                fill=True,
+                facecolor=label_color,
+                # alpha=0.5,
+                alpha=1.0,
+                edgecolor=None,
+                zorder=1
+            ))
+
+        for x, y, width, height in page.label_outlines:
+            ax.add_patch(patches.Rectangle((x, y), width, height, fill=False, edgecolor='black', zorder=2))
+
+    def _draw_collections(self, ax, page):
+        from matplotlib.collections import EllipseCollection, PolyCollection
+
+        # Same zorder and insertion order as the per-patch path, so overlaps resolve identically.
+        # Merged block edges go above the fills instead, as optimize.py describes.
+        if page.block_edges is not None:
+            ax.add_collection(_segment_collection(page.block_edges, zorder=2), autolim=False)
+        elif len(page.block_outlines):
+            ax.add_collection(PolyCollection(
+                _rectangle_vertices(page.block_outlines),
+                facecolors='none',
+                edgecolors='black',
+                zorder=1
+            ), autolim=False)
+
+        if len(page.dots):
+            diameter = self.jack_radius * 2
+            ax.add_collection(EllipseCollection(
+                diameter,
+                diameter,
+                0,
+                units='xy',
+                offsets=page.dots,
+                offset_transform=ax.transData,
+                facecolors='black',
+                edgecolors='black',
+                zorder=1
+            ), autolim=False)
+
+        if len(page.fills):
+            ax.add_collection(PolyCollection(
+                _rectangle_vertices(page.fills),
+                facecolors=page.fill_colors,
+                edgecolors='none',
+                zorder=1
+            ), autolim=False)
+
+        if page.label_edges is not None:
+            if len(page.label_edges):
+                ax.add_collection(_segment_collection(page.label_edges, zorder=2), autolim=False)
+        elif len(page.label_outlines):
+            ax.add_collection(PolyCollection(
+                _rectangle_vertices(page.label_outlines),
+                facecolors='none',
+                edgecolors='black',
+                zorder=2
+            ), autolim=False)
+
+
+def _draw_pages(task):
+    """
+    Lay out, draw and compress a run of pages on a worker, for _write_native_parallel.
+
+    :return: ``(content, block sizes, characters)`` of each page.
+    """
+    import zlib
+    from .pdf_writer import BLOCK_FORM, page_content
+
+    generator, records, jacks, xs, ys, block_pages = task
+    table = LabelTable(records, len(jacks), jacks)
+    geometry = generator._layout_arrays(table, xs, ys)
+    drawn = []
+    for page in generator._cut_pages(table, block_pages, geometry):
+        content = page_content(page, generator.font_file, generator.jack_radius, BLOCK_FORM)
+        chars = set().union(*(text for _, _, text, _ in page.texts))
+        drawn.append((zlib.compress(content), sorted(set(page.block_jacks.tolist())), ''.join(chars)))
+    return drawn
+
+
+def _segment_collection(segments, zorder):
+    """
+    Black line segments stroked like the outline patches they replace. Projecting caps
+    close the corners where two segments meet, as a rectangle's joins would.
+    """
+    import matplotlib
+    from matplotlib.collections import LineCollection
+
+    return LineCollection(
+        segments.reshape(-1, 2, 2),
+        colors='black',
+        linewidths=matplotlib.rcParams['patch.linewidth'],
+        capstyle='projecting',
+        zorder=zorder
+    )
+
+
+def _rectangle_vertices(rects):
+    """
+    Corner vertices, shape ``(n, 4, 2)``, of an ``(n, 4)`` array of rectangles.
+    """
+    import numpy as np
+
+    x, y, width, height = np.asarray(rects, dtype=float).T
+    return np.stack([
+        np.column_stack((x, y)),
+        np.column_stack((x + width, y)),
+        np.column_stack((x + width, y + height)),
+        np.column_stack((x, y + height)),
+    ], axis=1)
+
+
+def generate_patch_bay_labels(num_groups, labels_per_group, output_file='test_TT_labels.pdf', paginate=False,
+                              font_path=None, **options):
+    """
+    Generate a printable black-and-white patch bay labeling sheet.
+
+    Colors in the label data are ignored. Any other keyword argument is passed on to
+    PatchBayLabelGenerator.generate_labels.
+
+    :param num_groups: Number of 16 TT groupings.
+    :param labels_per_group: List of lists, where each sublist contains dictionaries with:
+                             'text' (str): The label text,
+                             'start' (int): Starting TT position (1-indexed, 1–16 per group),
+                             'span' (int): How many TT points the label spans,
+                             'row' (str): 'top', 'bottom', or 'both' for spanning rows.
+    :param output_file: Output filename for the PDF.
+    :param paginate: Start a new page whenever the next row of blocks would run past the
+                     bottom margin, writing all pages into one multi-page PDF.
+    :param font_path: Path to the custom font file.
+    """
+    generator = PatchBayLabelGenerator(font_path, theme='bw')
+    generator.generate_labels(num_groups, labels_per_group, output_file=output_file, paginate=paginate, **options)
+
+
+async def generate_patch_bay_labels_async(num_groups, labels_per_group, output_file='test_TT_labels.pdf',
+                                          paginate=False, font_path=None, executor=None, **options):
+    """
+    generate_patch_bay_labels for asyncio code; see
+    PatchBayLabelGenerator.generate_labels_async for ``executor``.
+    """
+    generator = PatchBayLabelGenerator(font_path, theme='bw')
+    await generator.generate_labels_async(num_groups, labels_per_group, output_file=output_file, paginate=paginate,
+                                          executor=executor, **options)
@@ -0,0 +1,325 @@
+"""
+A studio's patchbay routing as a local SQLite database of bays, blocks and labels.
+
+Spec files describe one sheet each, so a question such as "which bay and jack is TEAC
+1-4 on?" otherwise means searching every spec. Here every label is a row, indexed by
+its text (case-insensitively, for prefix lookups), by its bay and block position, and
+by its first jack, so lookups stay fast however many bays the studio has. Blocks come
+back out as the label lists generate_labels takes, read straight from a cursor:
+
+    with Inventory('studio.db') as inventory:
+        inventory.import_spec('TT_labels_Color.py')
+        print(inventory.find('teac', jack=4))
+        generator.generate_labels(None, inventory.blocks(bay='PATCHBAY 2'), paginate=True)
+"""
+import ast
+import itertools
+import os
+import re
+import sqlite3
+from collections import namedtuple
+
+from .spec import JACKS_PER_ROW, ROWS, Block, SpecError, _python_list, check_block, iter_spec, spec_format
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS bays (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS blocks (
+    id INTEGER PRIMARY KEY,
+    bay INTEGER NOT NULL REFERENCES bays (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    jacks INTEGER NOT NULL,
+    UNIQUE (bay, position)
+);
+CREATE TABLE IF NOT EXISTS labels (
+    id INTEGER PRIMARY KEY,
+    block INTEGER NOT NULL REFERENCES blocks (id) ON DELETE CASCADE,
+    text TEXT NOT NULL COLLATE NOCASE,
+    start INTEGER NOT NULL,
+    span INTEGER NOT NULL,
+    row TEXT NOT NULL,
+    color TEXT
+);
+CREATE INDEX IF NOT EXISTS labels_text ON labels (text);
+CREATE INDEX IF NOT EXISTS labels_jack ON labels (block, start);
+'''
+
+# Where a label is: its bay, the 1-indexed block within the bay and that block's jacks
+# per row, then the label's own fields as in a spec
+Location = namedtuple('Location', 'bay block jacks text start span row color')
+
+_BAY_HEADER = re.compile(r'^[\s#]*(PATCHBAY\s+\S+)\s*$', re.IGNORECASE)
+_COMMENT = re.compile(r'^\s*#')
+_STRING = re.compile(r"'(?:[^'\\\n]|\\.)*'|\"(?:[^\"\\\n]|\\.)*\"")
+
+
+class Inventory:
+    """
+    Bays of label blocks in a SQLite database.
+
+    Bays keep the order they were added in, and blocks and labels the order of their
+    spec. Labels are checked with the spec rules on the way in, so anything read back
+    out renders without further checks. The connection may be handed to another thread,
+    as generate_labels_async does with a stream of blocks, but not used from two at once.
+    """
+
+    def __init__(self, path=':memory:'):
+        """
+        Open or create an inventory.
+
+        :param path: Database file, or ':memory:' for one that lasts as long as this object.
+        """
+        self.path = path
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute('PRAGMA foreign_keys = ON')
+        # A write-ahead log makes each bay's import one append instead of two syncs
+        self._connection.execute('PRAGMA journal_mode = WAL')
+        self._connection.execute('PRAGMA synchronous = NORMAL')
+        self._connection.executescript(SCHEMA)
+
+    def close(self):
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+    def add_bay(self, name, blocks, jacks=JACKS_PER_ROW, replace=False, source=None):
+        """
+        Add a bay and its blocks in one transaction.
+
+        :param name: Bay name, unique within the inventory, such as 'PATCHBAY 2'.
+        :param blocks: Iterable of blocks in the ``labels_per_group`` format, including
+                       ``{"jacks": 24, "labels": [...]}`` mappings.
+        :param jacks: Jacks per row of blocks that do not set their own.
+        :param replace: Replace a bay of the same name instead of failing.
+        :param source: Where the blocks came from, for error messages (default: the bay name).
+        :return: ``(blocks, labels)`` counts of the bay.
+        :raises SpecError: If a block or label is malformed; nothing is added then.
+        :raises ValueError: If the bay exists and ``replace`` is false.
+        """
+        with self._connection as connection:
+            found = connection.execute('SELECT id FROM bays WHERE name = ?', (name,)).fetchone()
+            if found is None:
+                bay = connection.execute('INSERT INTO bays (name) VALUES (?)', (name,)).lastrowid
+            elif replace:
+                bay = found[0]  # keeps its place among the bays
+                connection.execute('DELETE FROM blocks WHERE bay = ?', (bay,))
+            else:
+                raise ValueError('bay %r is already in the inventory; replace it to re-import' % name)
+
+            rows = []
+            position = 0
+            for position, labels in enumerate(blocks, 1):
+                labels = check_block(labels, position, source or name, jacks=jacks)
+                block = connection.execute('INSERT INTO blocks (bay, position, jacks) VALUES (?, ?, ?)',
+                                           (bay, position, getattr(labels, 'jacks', jacks))).lastrowid
+                rows.extend((block, label['text'], label['start'], label['span'], label['row'], label.get('color'))
+                            for label in labels)
+            connection.executemany('INSERT INTO labels (block, text, start, span, row, color) '
+                                   'VALUES (?, ?, ?, ?, ?, ?)', rows)
+        return position, len(rows)
+
+    def import_spec(self, path, bay=None, format=None, jacks=JACKS_PER_ROW, replace=False):
+        """
+        Add the blocks of a spec file.
+
+        A Python script such as TT_labels_Color.py is read one bay per ``PATCHBAY``
+        heading of its ``labels_per_group`` list, including the bays commented out; see
+        iter_script_bays. Any other spec, or a script given ``bay``, becomes one bay.
+
+        :param path: Path to a JSON, JSON Lines, CSV, YAML or Python spec.
+        :param bay: Bay name (default: the file name without its extension).
+        :param format: Override the format picked from the file extension.
+        :param jacks: Jacks per row of blocks that do not set their own.
+        :param replace: Replace bays of the same names instead of failing.
+        :return: ``(name, blocks, labels)`` for every bay added.
+        :raises SpecError: If the file does not describe valid blocks.
+        """
+        format = spec_format(path, format)
+        if format == 'py' and bay is None:
+            return [(name,) + self.add_bay(name, blocks, jacks, replace, path)
+                    for name, blocks in iter_script_bays(path, jacks)]
+        name = bay or os.path.splitext(os.path.basename(path))[0]
+        return [(name,) + self.add_bay(name, iter_spec(path, format, jacks), jacks, replace, path)]
+
+    def remove_bay(self, name):
+        """
+        Remove a bay with its blocks and labels.
+
+        :return: Whether the bay was there.
+        """
+        with self._connection as connection:
+            return connection.execute('DELETE FROM bays WHERE name = ?', (name,)).rowcount > 0
+
+    def bays(self):
+        """
+        Every bay in the order added, as ``(name, blocks, labels)``.
+        """
+        return self._connection.execute(
+            'SELECT bays.name, COUNT(DISTINCT blocks.id), COUNT(labels.id) FROM bays '
+            'LEFT JOIN blocks ON blocks.bay = bays.id LEFT JOIN labels ON labels.block = blocks.id '
+            'GROUP BY bays.id ORDER BY bays.id').fetchall()
+
+    def find(self, text=None, bay=None, jack=None, row=None):
+        """
+        Labels matching every criterion given, in bay, block and label order.
+
+        :param text: Label text prefix, ignoring case: 'teac' finds 'TEAC 1-4' and
+                     'TEAC IN 1-8'.
+        :param bay: Bay name.
+        :param jack: 1-indexed jack the label covers.
+        :param row: 'top' or 'bottom' for labels on that row, 'both' labels included,
+                    or 'both' for those alone.
+        :return: List of Location tuples.
+        """
+        where, params = self._filter(text, bay)
+        if jack is not None:
+            where.append('labels.start <= ? AND labels.start + labels.span > ?')
+            params += [jack, jack]
+        if row is not None:
+            if row not in ROWS:
+                raise ValueError("row must be 'top', 'bottom' or 'both', got %r" % (row,))
+            where.append("labels.row IN (?, 'both')")
+            params.append(row)
+        return [Location(*found) for found in self._connection.execute(
+            'SELECT bays.name, blocks.position, blocks.jacks, labels.text, labels.start, labels.span, labels.row, '
+            'labels.color FROM labels JOIN blocks ON blocks.id = labels.block JOIN bays ON bays.id = blocks.bay '
+            + _where(where) + ' ORDER BY bays.id, blocks.position, labels.id', params)]
+
+    def blocks(self, bay=None, text=None):
+        """
+        Stream blocks out of the inventory, ready for ``generate_labels(None, ...)``.
+
+        Rows are read from the cursor as the blocks are consumed, so a paginated render
+        of the whole studio starts writing pages before the query has finished.
+
+        :param bay: Only the blocks of this bay.
+        :param text: Only blocks with a label whose text starts with this, ignoring case.
+                     The whole block is returned, as its label strip is printed whole.
+        :return: Iterator of Blocks of label dictionaries, in bay and block order.
+        """
+        where, params = self._filter(None, bay)
+        if text is not None:
+            where.append("blocks.id IN (SELECT block FROM labels WHERE text LIKE ? ESCAPE '\\')")
+            params.append(_like_prefix(text))
+        cursor = self._connection.execute(
+            'SELECT blocks.id, blocks.jacks, labels.text, labels.start, labels.span, labels.row, labels.color '
+            'FROM blocks JOIN bays ON bays.id = blocks.bay LEFT JOIN labels ON labels.block = blocks.id '
+            + _where(where) + ' ORDER BY bays.id, blocks.position, labels.id', params)
+        return _group_blocks(cursor)
+
+    def _filter(self, text, bay):
+        where, params = [], []
+        if text is not None:
+            where.append("labels.text LIKE ? ESCAPE '\\'")
+            params.append(_like_prefix(text))
+        if bay is not None:
+            where.append('bays.name = ?')
+            params.append(bay)
+        return where, params
+
+
+def iter_script_bays(path, jacks=JACKS_PER_ROW, name='labels_per_group'):
+    """
+    Read the bays of a script such as TT_labels_Color.py, commented out or not.
+
+    The scripts keep one studio's bays in their ``labels_per_group`` list, each under a
+    ``# PATCHBAY n`` heading, with every bay but the one being printed commented out.
+    Within a section that has live blocks only those are read; a section that is all
+    comments is read as if it were uncommented. Blocks before the first heading form a
+    bay named after the file. The file is parsed, never run.
+
+    :param path: Path to the script.
+    :param jacks: Jacks per row of blocks that do not set their own.
+    :param name: Name of the list variable.
+    :return: Iterator of ``(bay name, list of blocks)``.
+    :raises SpecError: If the list or a block in it is malformed.
+    """
+    source, value = _python_list(path, name)
+
+    # The list's body, between its brackets, one (line number, text) pair per line
+    lines = source.splitlines()[value.lineno - 1:value.end_lineno]
+    lines[-1] = lines[-1][:value.end_col_offset - 1]
+    lines[0] = lines[0][value.col_offset + 1:]
+    sections = [[os.path.splitext(os.path.basename(path))[0], value.lineno, []]]
+    for number, line in enumerate(lines, value.lineno):
+        header = _BAY_HEADER.match(line)
+        if header:
+            sections.append([' '.join(header.group(1).upper().split()), number, []])
+        else:
+            sections[-1][2].append((number, line))
+
+    for index, (bay, line, body) in enumerate(sections):
+        live = [(number, text) for number, text in body if text.strip() and not _COMMENT.match(text)]
+        if not live:
+            # One level of comment off: a label commented out within a commented-out
+            # bay stays out, and so do notes such as '# Block 1'
+            live = [(number, _COMMENT.sub('', text, 1)) for number, text in body]
+            live = _balanced([(number, text) for number, text in live
+                              if text.lstrip()[:1] in ('[', ']', '{', '}', "'", '"')])
+        if index == 0 and not any(text.strip() for number, text in live):
+            continue
+        yield bay, list(_script_blocks(live, bay, path, line, jacks))
+
+
+def _script_blocks(lines, bay, path, line, jacks):
+    text = '[\n%s\n]' % '\n'.join(text for number, text in lines)
+    try:
+        tree = ast.parse(text, path, mode='eval')
+    except SyntaxError:
+        # Commented-out bays are not checked by Python and often miss a comma between blocks
+        try:
+            tree = ast.parse(re.sub(r'([\]}])(\s*)([\[{])', r'\1,\2\3', text), path, mode='eval')
+        except SyntaxError as error:
+            number = lines[min(max(error.lineno - 2, 0), len(lines) - 1)][0] if lines else line
+            raise SpecError('%s: invalid Python: %s' % (bay, error.msg), source=path, line=number)
+    for block_number, node in enumerate(tree.body.elts, 1):
+        number = lines[node.lineno - 2][0]
+        try:
+            labels = ast.literal_eval(node)
+        except ValueError:
+            raise SpecError('%s: block is not a plain literal' % bay, block_number, source=path, line=number)
+        yield check_block(labels, block_number, path, number, jacks)
+
+
+def _balanced(lines):
+    """
+    Drop closing brackets with nothing open, such as the ``# ]`` left behind when a
+    whole list of blocks was commented out and a new one started.
+    """
+    kept = []
+    depth = 0
+    for number, text in lines:
+        code = _STRING.sub('', text)
+        change = code.count('[') + code.count('{') - code.count(']') - code.count('}')
+        if depth + change < 0:
+            continue
+        depth += change
+        kept.append((number, text))
+    return kept
+
+
+def _group_blocks(cursor):
+    for (block, size), rows in itertools.groupby(cursor, lambda row: row[:2]):
+        labels = Block(jacks=size)
+        for _, _, text, start, span, row, color in rows:
+            if text is None:
+                continue  # an empty block, from the outer join
+            label = {'text': text, 'start': start, 'span': span, 'row': row}
+            if color is not None:
+                label['color'] = color
+            labels.append(label)
+        yield labels
+
+
+def _like_prefix(text):
+    return re.sub(r'([\\%_])', r'\\\1', text) + '%'
+
+
+def _where(clauses):
+    return ' WHERE ' + ' AND '.join(clauses) if clauses else ''
@@ -0,0 +1,193 @@
+from .spec import ROWS, SpecError, _is_color, _jack_range, check_block, check_label
+
+ROW_CODES = {'top': 0, 'bottom': 1, 'both': 2}
+
+
+class PageLayout:
+    """
+    Drawing primitives for one sheet, in inches from the bottom-left corner of the paper.
+
+    Laying a sheet out into plain arrays first lets the renderers decide how to emit them,
+    either as one matplotlib artist per shape or as a handful of batched collections.
+    Each rectangle array has one ``(x, y, width, height)`` row per shape.
+    """
+
+    def __init__(self, index):
+        self.index = index
+        self.block_origins = ()  # (x, y) top-left corner of every block
+        self.block_jacks = ()  # jacks per row of every block
+        self.block_outlines = ()  # (x, y, width, height) of jack blocks and label strips
+        self.dots = ()  # (x, y) centre of every TT jack
+        self.fills = ()  # (x, y, width, height) of colored label backgrounds
+        self.fill_colors = []  # color of each fill
+        self.label_outlines = ()  # (x, y, width, height) of every label span
+        self.texts = []  # (x, y, wrapped text, font size)
+        # Merged (x0, y0, x1, y1) segments replacing the outline rectangles when set.
+        # Label edges leave out the label strip border, so the block outlines are then
+        # drawn after the fills; see optimize.py.
+        self.block_edges = None
+        self.label_edges = None
+
+    def artist_count(self, batched=False):
+        """
+        Number of matplotlib artists needed to draw this page.
+        """
+        if batched:
+            outlines = len(self.block_outlines) + len(self.label_outlines)
+            collections = sum(1 for count in (outlines, len(self.dots), len(self.fills)) if count)
+            return collections + len(self.texts)
+        return (len(self.block_outlines) + len(self.dots) + len(self.fills)
+                + len(self.label_outlines) + len(self.texts))
+
+
+class LabelTable:
+    """
+    Every label of a sheet in columnar form: one NumPy record per label.
+
+    Numeric fields are packed into small integer columns, so a record is 25 bytes: about
+    2.5 MB for a 100k-label export, plus its text and color strings, instead of a
+    dictionary of about 200 bytes per label. The geometry of all labels can be
+    computed in one vectorized pass. Records are in block order.
+
+    Fields: ``block`` (0-indexed), ``start`` (0-indexed jack), ``span``, ``row``
+    (a ROW_CODES value), ``text`` and ``color`` (None for no fill). ``jacks`` holds
+    the jacks per row of every block.
+    """
+
+    def __init__(self, records, num_blocks, jacks):
+        self.records = records
+        self.num_blocks = num_blocks
+        self.jacks = jacks
+
+    def __len__(self):
+        return len(self.records)
+
+    @classmethod
+    def from_blocks(cls, labels_per_group, num_groups, jacks=8):
+        """
+        Pack label dictionaries into a table.
+
+        Labels are checked against the types check_label asks for, and against their
+        block's jacks, before they are packed, so nothing that would fail the spec checks
+        is narrowed into the integer columns; overlaps are left to check_spans.
+
+        :param labels_per_group: Iterable of label lists, one per block.
+        :param num_groups: Number of blocks to keep; labels of later blocks are dropped.
+        :param jacks: Jacks per row of blocks that do not carry their own ``jacks``.
+        :raises SpecError: If a label is malformed, naming the block and label, or, first,
+                           if an earlier block has overlapping labels.
+        """
+        import numpy as np
+
+        entries = []
+        block_jacks = np.full(num_groups, jacks, dtype=np.int16)
+        for block, labels in enumerate(labels_per_group):
+            if block >= num_groups:
+                break
+            size = getattr(labels, 'jacks', None)
+            if size:
+                block_jacks[block] = size
+            else:
+                size = jacks
+            first = len(entries)
+            try:
+                for label in labels:
+                    start, span, text, color = label['start'], label['span'], label['text'], label.get('color')
+                    if not (0 < start <= size and 0 < span <= size and type(start) is type(span) is int
+                            and type(text) is str and (color is None or type(color) is str)):
+                        raise TypeError('malformed label')
+                    entries.append((block, start - 1, span, ROW_CODES[label['row']], text, color))
+            except (KeyError, TypeError, AttributeError):
+                # Only unusual data gets here; let the spec rules say what is wrong and where,
+                # after any overlap in an earlier block, as a stream of spec checks would
+                del entries[first:]
+                cls._pack(entries, block, block_jacks[:block]).check_spans()
+                check_block(labels, block + 1, jacks=size)
+                # The block passed, so it holds int or str subclasses; pack them as plain values
+                entries.extend((block, int(label['start']) - 1, int(label['span']), ROW_CODES[label['row']],
+                                str(label['text']), label.get('color')) for label in labels)
+
+        return cls._pack(entries, num_groups, block_jacks)
+
+    @classmethod
+    def _pack(cls, entries, num_blocks, block_jacks):
+        import numpy as np
+
+        records = np.array(entries, dtype=[
+            ('block', np.int32), ('start', np.int16), ('span', np.int16), ('row', np.int8),
+            ('text', object), ('color', object),
+        ])
+        return cls(records, num_blocks, block_jacks)
+
+    def check_spans(self):
+        """
+        Check that every label fits its block, that no two labels share a jack and that
+        every color can be drawn.
+
+        These are the jack and color rules of spec.check_label and spec.check_spans,
+        applied to the whole sheet in a few array passes so that label data which never
+        went through a spec file fails before anything is drawn. Each row of each block is a run of
+        ``(start, end)`` intervals, with 'both' labels entered in both rows. Once they are
+        sorted by block, row and start, two labels overlap exactly when an interval starts
+        before the one ahead of it ends: O(n log n) in the number of labels.
+
+        :raises SpecError: For the first bad label in block order, with the message the
+                           spec checks give.
+        """
+        import numpy as np
+
+        records = self.records
+        if not len(records):
+            return
+        blocks = records['block']
+        rows = records['row']
+        start = records['start'].astype(np.int64)
+        end = start + records['span']  # one past the last jack, 0-indexed
+        size = self.jacks[blocks]
+
+        bad = (start < 0) | (start >= size) | (records['span'] < 1) | (end > size)
+        # A sheet uses a handful of colors, so each is checked once rather than per label
+        colors = records['color']
+        unknown = {color for color in set(colors.tolist()) if color is not None and not _is_color(color)}
+        if unknown:
+            bad |= np.fromiter((color in unknown for color in colors), dtype=bool, count=len(colors))
+        first_bad = int(np.argmax(bad)) if bad.any() else None
+
+        # Lane 0 is the top row (top and both labels), lane 1 the bottom row
+        top, bottom = np.flatnonzero(rows != 1), np.flatnonzero(rows != 0)
+        index = np.concatenate((top, bottom))
+        lane = np.repeat(np.arange(2), (len(top), len(bottom)))
+        order = np.lexsort((index, end[index], start[index], lane, blocks[index]))
+        index, lane = index[order], lane[order]
+        later, earlier = index[1:], index[:-1]
+        clash = (blocks[later] == blocks[earlier]) & (lane[1:] == lane[:-1]) & (start[later] < end[earlier])
+        first_clash = int(np.argmax(clash)) if clash.any() else None
+
+        # Within a block the spec checks look at every label before any overlap
+        if first_bad is not None and (first_clash is None or blocks[first_bad] <= blocks[later[first_clash]]):
+            check_label(self._label(first_bad), *self._where(first_bad), jacks=int(size[first_bad]))
+        if first_clash is not None:
+            label, holder = int(later[first_clash]), int(earlier[first_clash])
+            shared = _jack_range(start[label] + 1, min(end[label], end[holder]))
+            kinds = ROWS[rows[label]], ROWS[rows[holder]]
+            holder_number = self._where(holder)[1]
+            if kinds[0] != kinds[1] and 'both' in kinds:
+                message = "'%s' label conflicts with '%s' label %d on %s" % (kinds + (holder_number, shared))
+            else:
+                message = 'overlaps label %d on the %s row, %s' % (holder_number, ROWS[lane[first_clash + 1]], shared)
+            raise SpecError(message, *self._where(label))
+
+    def _where(self, index):
+        """
+        1-indexed block and label number of the record at ``index``.
+        """
+        import numpy as np
+
+        blocks = self.records['block']
+        block = int(blocks[index])
+        return block + 1, index - int(np.searchsorted(blocks, block)) + 1
+
+    def _label(self, index):
+        record = self.records[index]
+        return {'text': record['text'], 'start': int(record['start']) + 1, 'span': int(record['span']),
+                'row': ROWS[record['row']], 'color': record['color']}
@@ -0,0 +1,158 @@
+"""
+Path optimizer run on the laid-out geometry of a sheet before it is drawn.
+
+Every label is laid out as a filled rectangle plus an outline rectangle, and each block
+as two outline rectangles. Drawn as they are, neighbouring labels stroke their shared
+edges twice, the label strip's border is stroked again by every label along it, and a
+run of same-colored labels is filled one rectangle at a time. That costs file size and
+viewing time, and a plotter or cutter goes over the same line two or three times.
+
+Here outlines become the union of their edges as horizontal and vertical segments,
+with collinear pieces that overlap or touch merged into one. Label edges on the border
+of their block's label strip are left to the block outline, which is drawn after the
+fills instead of before them: a fill only meets the block outline along a label's own
+border, which was stroked over it anyway, so nothing visible changes. Same-colored
+fills that share a full edge become one rectangle.
+
+Shapes are merged only with others of the same group, normally their block, and every
+result comes back sorted by group so a run of blocks maps onto a contiguous slice. One
+call covers a whole sheet. All coordinates are inches.
+"""
+import numpy as np
+
+EPSILON = 1e-9  # inches; layout coordinates that agree this closely are the same point
+
+
+def outline_edges(rects, groups):
+    """
+    The edges of outline rectangles, merged into as few segments as possible.
+
+    :param rects: ``(n, 4)`` array of ``(x, y, width, height)``.
+    :param groups: Group of each rectangle, as non-negative integers.
+    :return: ``(segments, groups)``: a ``(k, 4)`` array of ``(x0, y0, x1, y1)`` segments
+             and the group of each.
+    """
+    rects = np.asarray(rects, dtype=float).reshape(-1, 4)
+    return _edges(rects, np.asarray(groups), np.ones((len(rects), 4), dtype=bool))
+
+
+def label_edges(rects, strips, owners):
+    """
+    The edges of label outlines that are not on their block's label strip border,
+    merged into as few segments as possible.
+
+    Labels never reach past their strip, so an edge on the strip's border is covered by
+    the block outline entirely.
+
+    :param rects: ``(n, 4)`` label rectangles.
+    :param strips: ``(m, 4)`` label strip rectangle of every block.
+    :param owners: Index into ``strips`` of each label's block, which is also its group.
+    :return: ``(segments, groups)`` as for outline_edges.
+    """
+    rects = np.asarray(rects, dtype=float).reshape(-1, 4)
+    owners = np.asarray(owners)
+    strip = np.asarray(strips, dtype=float).reshape(-1, 4)[owners]
+    x0, y0 = rects[:, 0], rects[:, 1]
+    x1, y1 = x0 + rects[:, 2], y0 + rects[:, 3]
+    keep = np.column_stack((
+        np.abs(y0 - strip[:, 1]) > EPSILON,  # bottom
+        np.abs(y1 - strip[:, 1] - strip[:, 3]) > EPSILON,  # top
+        np.abs(x0 - strip[:, 0]) > EPSILON,  # left
+        np.abs(x1 - strip[:, 0] - strip[:, 2]) > EPSILON,  # right
+    ))
+    return _edges(rects, owners, keep)
+
+
+def merge_fills(rects, colors, groups):
+    """
+    Merge same-colored fill rectangles of a group that share a whole edge.
+
+    Runs along a row are joined first, then runs of the resulting rectangles down a
+    column, so a colored top and bottom label of the same span become one rectangle.
+
+    :param rects: ``(n, 4)`` array of ``(x, y, width, height)``.
+    :param colors: Color of each rectangle.
+    :param groups: Group of each rectangle, as non-negative integers.
+    :return: ``(rects, colors, groups)`` with fewer or as many rectangles, colors as an
+             object array.
+    """
+    rects = np.asarray(rects, dtype=float).reshape(-1, 4)
+    colors = np.asarray(colors, dtype=object)
+    groups = np.asarray(groups)
+    if len(rects) < 2:
+        return rects, colors, groups
+    # A code per color name; much faster than np.unique on an object array
+    names = {}
+    codes = np.array([names.setdefault(color, len(names)) for color in colors.tolist()])
+    rects, codes, groups = _merge_runs(rects, codes, groups, 0)
+    rects, codes, groups = _merge_runs(rects, codes, groups, 1)
+    order = _reading_order(rects[:, 0], rects[:, 1] + rects[:, 3], groups)
+    return rects[order], np.array(list(names), dtype=object)[codes[order]], groups[order]
+
+
+def _edges(rects, groups, keep):
+    x0, y0 = rects[:, 0], rects[:, 1]
+    x1, y1 = x0 + rects[:, 2], y0 + rects[:, 3]
+    bottom, top, left, right = keep.T
+    horizontal = _merge_segments(np.concatenate((groups[bottom], groups[top])),
+                                 np.concatenate((y0[bottom], y1[top])),
+                                 np.concatenate((x0[bottom], x0[top])), np.concatenate((x1[bottom], x1[top])))
+    vertical = _merge_segments(np.concatenate((groups[left], groups[right])),
+                               np.concatenate((x0[left], x1[right])),
+                               np.concatenate((y0[left], y0[right])), np.concatenate((y1[left], y1[right])))
+    segments = np.concatenate((
+        np.column_stack((horizontal[2], horizontal[1], horizontal[3], horizontal[1])),
+        np.column_stack((vertical[1], vertical[2], vertical[1], vertical[3])),
+    ))
+    groups = np.concatenate((horizontal[0], vertical[0]))
+    order = _reading_order(segments[:, 0], segments[:, 3], groups)
+    return segments[order], groups[order]
+
+
+def _reading_order(lefts, tops, groups):
+    """
+    Order shapes by group, then top to bottom and left to right: a pen or cutter
+    travels less, and the repeated coordinates of a row compress well in a PDF.
+    """
+    return np.lexsort((lefts, -np.round(tops, 9), groups))
+
+
+def _merge_segments(groups, lines, starts, ends):
+    """
+    Union of collinear segments of a group: ``lines`` is the shared coordinate of each
+    segment and ``starts``/``ends`` its extent along it. Returns the merged
+    ``(groups, lines, starts, ends)``.
+    """
+    if not len(lines):
+        return groups, lines, starts, ends
+    order = np.lexsort((starts, np.round(lines, 9), groups))
+    groups, lines, starts, ends = groups[order], lines[order], starts[order], ends[order]
+    # Shift every line's extents past the previous line's, so one running maximum
+    # finds where each merged run ends without spilling from one line into the next
+    new_line = (np.diff(groups) != 0) | (np.abs(np.diff(lines)) > EPSILON)
+    offset = np.concatenate(([0], np.cumsum(new_line))) * (ends.max() - starts.min() + 1)
+    reach = np.maximum.accumulate(ends + offset)
+    first = np.flatnonzero(np.concatenate(([True], starts[1:] + offset[1:] > reach[:-1] + EPSILON)))
+    return groups[first], lines[first], starts[first], np.maximum.reduceat(ends, first)
+
+
+def _merge_runs(rects, codes, groups, along):
+    """
+    Join rectangles of one color and group that follow each other without a gap along
+    x (``along=0``) or y (``along=1``) and line up across it.
+    """
+    across = 1 - along
+    order = np.lexsort((rects[:, along], np.round(rects[:, across + 2], 9), np.round(rects[:, across], 9),
+                        codes, groups))
+    rects, codes, groups = rects[order], codes[order], groups[order]
+    start = rects[:, along]
+    end = start + rects[:, along + 2]
+    joined = ((groups[1:] == groups[:-1])
+              & (codes[1:] == codes[:-1])
+              & (np.abs(rects[1:, across] - rects[:-1, across]) <= EPSILON)
+              & (np.abs(rects[1:, across + 2] - rects[:-1, across + 2]) <= EPSILON)
+              & (np.abs(start[1:] - end[:-1]) <= EPSILON))
+    first = np.flatnonzero(np.concatenate(([True], ~joined)))
+    merged = rects[first]
+    merged[:, along + 2] = np.maximum.reduceat(end, first) - merged[:, along]
+    return merged, codes[first], groups[first]
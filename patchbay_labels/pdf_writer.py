@@ -0,0 +1,353 @@
+import os
+import zlib
+from functools import lru_cache
+
+POINTS_PER_INCH = 72
+CIRCLE_KAPPA = 0.5522847498  # Bezier control distance for a quarter circle
+BLOCK_FORM = 'Blk'  # resource name prefix of the shared block outlines and jack dots, per block size
+
+
+class PdfWriter:
+    """
+    Minimal streaming PDF writer for the shapes a label sheet is made of.
+
+    Pages are written to the file as soon as they are added, so only the object
+    offsets are kept in memory. One font is embedded and shared by every page
+    under the resource name ``/F1``, along with any forms added with add_form.
+    Once the text of the pages has been passed to use_text, the embedded font is a
+    subset holding only the glyphs the document draws.
+    """
+
+    def __init__(self, output_file, font, subset=True):
+        """
+        Start a new PDF document.
+
+        :param output_file: Path or binary file object to write to.
+        :param font: FontFile to embed.
+        :param subset: Embed only the glyphs of the text given to use_text. Documents
+                       whose text was never given embed the whole font either way.
+        """
+        if hasattr(output_file, 'write'):
+            self._file = output_file
+            self._path = None
+        else:
+            # Written beside the output and moved over it on close, so a failed render
+            # leaves the last good document in place instead of a truncated one
+            self._path = output_file
+            self._temp_path = '%s.tmp%d' % (output_file, os.getpid())
+            self._file = open(self._temp_path, 'wb')
+        self._font = font
+        self._subset = subset
+        self._chars = None  # every character drawn, once use_text has been called
+        self._position = 0
+        self._offsets = {}
+        self._next_id = 1
+        self._page_ids = []
+        self._forms = {}
+
+        self._write(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+        self._catalog_id = self._reserve()
+        self._pages_id = self._reserve()
+        self._font_id = self._reserve()
+
+    def add_form(self, name, content, bbox):
+        """
+        Add a Form XObject that pages added afterwards can draw with ``/<name> Do``.
+
+        A form is written once and referenced by every page that uses it, so shapes that
+        repeat across a sheet cost one ``Do`` each instead of their full drawing.
+
+        :param name: Resource name, without the slash.
+        :param content: Uncompressed content stream, drawing in points.
+        :param bbox: ``(x0, y0, x1, y1)`` of the form in inches, in its own coordinates.
+        """
+        box = ' '.join(_num(value * POINTS_PER_INCH) for value in bbox)
+        self._forms[name] = self._write_stream(
+            content, '/Type /XObject /Subtype /Form /BBox [%s] /Resources << >>' % box
+        )
+
+    def use_text(self, texts):
+        """
+        Note text that the document draws, so the font subset keeps its glyphs.
+
+        :param texts: Iterable of strings.
+        """
+        if self._chars is None:
+            self._chars = set()
+        for text in texts:
+            self._chars.update(text)
+
+    def add_page(self, width, height, content, x=0, y=0, compressed=False):
+        """
+        Append a page.
+
+        :param width: Page width in inches.
+        :param height: Page height in inches.
+        :param content: Uncompressed content stream, drawing in points.
+        :param x: Left edge of the visible region in content coordinates, in inches.
+        :param y: Bottom edge of the visible region in content coordinates, in inches.
+        :param compressed: The content is already zlib-compressed, as when pages are
+                           drawn in worker processes.
+        """
+        content_id = self._write_stream(content, compressed=content if compressed else None)
+        page_id = self._reserve()
+        box = ' '.join(_num(value * POINTS_PER_INCH) for value in (x, y, x + width, y + height))
+        forms = ''
+        if self._forms:
+            forms = '/XObject << %s >> ' % ' '.join('/%s %d 0 R' % item for item in sorted(self._forms.items()))
+        self._write_object(page_id, (
+            '<< /Type /Page /Parent %d 0 R /MediaBox [%s] '
+            '/Resources << /Font << /F1 %d 0 R >> %s>> /Contents %d 0 R >>'
+            % (self._pages_id, box, self._font_id, forms, content_id)
+        ).encode('ascii'))
+        self._page_ids.append(page_id)
+
+    def close(self):
+        """
+        Write the shared font, page tree and cross-reference table, then close the file.
+        """
+        self._write_font()
+        kids = ' '.join('%d 0 R' % page_id for page_id in self._page_ids)
+        self._write_object(self._pages_id, (
+            '<< /Type /Pages /Kids [%s] /Count %d >>' % (kids, len(self._page_ids))
+        ).encode('ascii'))
+        self._write_object(self._catalog_id, (
+            '<< /Type /Catalog /Pages %d 0 R >>' % self._pages_id
+        ).encode('ascii'))
+
+        xref_position = self._position
+        lines = ['xref', '0 %d' % self._next_id, '0000000000 65535 f ']
+        for object_id in range(1, self._next_id):
+            lines.append('%010d 00000 n ' % self._offsets[object_id])
+        lines += ['trailer', '<< /Size %d /Root %d 0 R >>' % (self._next_id, self._catalog_id),
+                  'startxref', str(xref_position), '%%EOF', '']
+        self._write('\n'.join(lines).encode('ascii'))
+
+        if self._path is not None:
+            self._file.close()
+            os.replace(self._temp_path, self._path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.close()
+        elif self._path is not None:
+            self._file.close()
+            os.remove(self._temp_path)
+
+    def _write_font(self):
+        font = self._font
+        scale = 1000 / font.units_per_em
+        widths = ' '.join(str(round(font.advance(char) * scale)) for char in _WIN_ANSI_CHARS)
+
+        name = font.postscript_name
+        program = font.cff_data if font.is_cff else font.data
+        if self._subset and self._chars is not None:
+            # Text is written in cp1252, so characters outside it are drawn as '?'
+            chars = {char if char.encode('cp1252', errors='ignore') else '?' for char in self._chars if char >= ' '}
+            tag, program = font.subset(chars)
+            name = '%s+%s' % (tag, name)
+
+        if font.is_cff:
+            subtype, file_key = 'Type1', '/FontFile3'
+            file_id = self._write_stream(program, '/Subtype /Type1C', _compress_font(program))
+        else:
+            subtype, file_key = 'TrueType', '/FontFile2'
+            file_id = self._write_stream(program, '/Length1 %d' % len(program), _compress_font(program))
+
+        descriptor_id = self._reserve()
+        self._write_object(descriptor_id, (
+            '<< /Type /FontDescriptor /FontName /%s /Flags 32 /FontBBox [%s] /ItalicAngle 0 '
+            '/Ascent %d /Descent %d /CapHeight %d /StemV 80 %s %d 0 R >>'
+            % (name, ' '.join(str(round(v * scale)) for v in font.bbox),
+               round(font.ascender * scale), round(font.descender * scale),
+               round(font.cap_height * scale), file_key, file_id)
+        ).encode('ascii'))
+        self._write_object(self._font_id, (
+            '<< /Type /Font /Subtype /%s /BaseFont /%s /FirstChar 32 /LastChar 255 '
+            '/Widths [%s] /Encoding /WinAnsiEncoding /FontDescriptor %d 0 R >>'
+            % (subtype, name, widths, descriptor_id)
+        ).encode('ascii'))
+
+    def _reserve(self):
+        object_id = self._next_id
+        self._next_id += 1
+        return object_id
+
+    def _write(self, data):
+        self._file.write(data)
+        self._position += len(data)
+
+    def _write_object(self, object_id, body):
+        self._offsets[object_id] = self._position
+        self._write(b'%d 0 obj\n' % object_id + body + b'\nendobj\n')
+
+    def _write_stream(self, data, extra='', compressed=None):
+        object_id = self._reserve()
+        if compressed is None:
+            compressed = zlib.compress(data)
+        header = '<< /Length %d /Filter /FlateDecode %s>>\nstream\n' % (len(compressed), extra + ' ' if extra else '')
+        self._write_object(object_id, header.encode('ascii') + compressed + b'\nendstream')
+        return object_id
+
+
+def page_content(page, font, jack_radius=0.05, block_form=None):
+    """
+    Build the PDF content stream for a laid-out page.
+
+    Shapes are emitted in the same stacking order as the matplotlib renderer: block
+    outlines and jack dots, then label fills, label outlines and finally text. Pages
+    with merged edges (see optimize.py) draw the block outlines and dots after the fills.
+
+    :param page: PageLayout to draw, in inches.
+    :param font: FontFile used to center the text.
+    :param jack_radius: Radius of the TT jack dots in inches.
+    :param block_form: Name prefix of the forms holding one block's outlines and dots,
+                       drawn from its top-left corner; each block size has its own form,
+                       named with the jack count appended. When given, each block is
+                       stamped from its form at ``page.block_origins`` instead of being
+                       drawn out in full.
+    :return: Content stream bytes.
+    """
+    ops = ['1 w 0 G 0 g']
+
+    # Merged label edges leave the label strip border to the block outlines, which
+    # then have to be drawn over the fills
+    merged = page.label_edges is not None
+    if not merged:
+        _add_block_chrome(ops, page, jack_radius, block_form)
+
+    for (x, y, width, height), color in zip(_rows(page.fills), page.fill_colors):
+        ops.append('%s %s %s rg %s %s %s %s re f' % (_rgb(color) + _rect_points((x, y, width, height))))
+
+    ops.append('0 g')
+    if merged:
+        _add_block_chrome(ops, page, jack_radius, block_form)
+        ops.append(_segments(page.label_edges))
+    else:
+        for rect in _rows(page.label_outlines):
+            ops.append('%s %s %s %s re S' % _rect_points(rect))
+
+    ascent = font.lp_ascent / font.units_per_em
+    for x, y, wrapped_text, size in page.texts:
+        lines = wrapped_text.split('\n')
+        line_height = font.line_pitch(size)
+        baseline = y * POINTS_PER_INCH + font.text_height(len(lines), size) / 2 - ascent * size
+        ops.append('BT /F1 %s Tf' % _num(size))
+        for line in lines:
+            # Center what is drawn: characters outside cp1252 come out as '?'
+            line = line.encode('cp1252', errors='replace')
+            line_x = x * POINTS_PER_INCH - font.text_width(line.decode('cp1252'), size) / 2
+            ops.append('1 0 0 1 %s %s Tm (%s) Tj' % (_num(line_x), _num(baseline), _escape(line)))
+            baseline -= line_height
+        ops.append('ET')
+
+    return '\n'.join(ops).encode('latin-1')
+
+
+def place_content(content, x, y):
+    """
+    Wrap a content stream drawn around the origin so it draws at ``(x, y)`` instead.
+
+    :param content: Content stream bytes.
+    :param x: Horizontal offset in inches.
+    :param y: Vertical offset in inches.
+    """
+    return ('q 1 0 0 1 %s %s cm\n' % (_num(x * POINTS_PER_INCH), _num(y * POINTS_PER_INCH))).encode('ascii') + content + b'\nQ'
+
+
+_WIN_ANSI_CHARS = bytes(range(32, 256)).decode('cp1252', errors='replace')
+
+
+def _add_block_chrome(ops, page, jack_radius, block_form):
+    if block_form:
+        for (x, y), jacks in zip(_rows(page.block_origins), _rows(page.block_jacks)):
+            ops.append('q 1 0 0 1 %s %s cm /%s%d Do Q'
+                       % (_num(x * POINTS_PER_INCH), _num(y * POINTS_PER_INCH), block_form, jacks))
+        return
+
+    if page.block_edges is not None:
+        ops.append(_segments(page.block_edges))
+    else:
+        for rect in _rows(page.block_outlines):
+            ops.append('%s %s %s %s re S' % _rect_points(rect))
+
+    radius = jack_radius * POINTS_PER_INCH
+    for x, y in _rows(page.dots):
+        ops.append(_circle(x * POINTS_PER_INCH, y * POINTS_PER_INCH, radius) + ' B')
+
+
+def _segments(segments):
+    # Each horizontal or vertical segment as a zero-width rectangle stretched by half the
+    # 1 pt line width at both ends, so it strokes square ends that close the corners
+    # where two segments meet. Shorter than moveto/lineto pairs, and one path for all.
+    parts = []
+    for x0, y0, x1, y1 in _rows(segments):
+        x, y = x0 * POINTS_PER_INCH, y0 * POINTS_PER_INCH
+        width, height = (x1 - x0) * POINTS_PER_INCH, (y1 - y0) * POINTS_PER_INCH
+        if height:
+            y, height = y - 0.5, height + 1
+        else:
+            x, width = x - 0.5, width + 1
+        parts.append('%s %s %s %s re' % (_num(x), _num(y), _num(width), _num(height)))
+    return '%s S' % ' '.join(parts) if parts else ''
+
+
+@lru_cache(maxsize=16)
+def _compress_font(data):
+    # Font programs, whole or subset, mostly repeat from one document to the next
+    return zlib.compress(data)
+
+
+def _rows(shapes):
+    # Plain floats format much faster than NumPy scalars
+    return shapes.tolist() if hasattr(shapes, 'tolist') else shapes
+
+
+def _num(value):
+    text = '%.3f' % value
+    return text.rstrip('0').rstrip('.') if '.' in text else text
+
+
+def _rect_points(rect):
+    return tuple(_num(value * POINTS_PER_INCH) for value in rect)
+
+
+def _circle(cx, cy, r):
+    k = CIRCLE_KAPPA * r
+    points = [
+        (cx + r, cy + k, cx + k, cy + r, cx, cy + r),
+        (cx - k, cy + r, cx - r, cy + k, cx - r, cy),
+        (cx - r, cy - k, cx - k, cy - r, cx, cy - r),
+        (cx + k, cy - r, cx + r, cy - k, cx + r, cy),
+    ]
+    path = ['%s %s m' % (_num(cx + r), _num(cy))]
+    for segment in points:
+        path.append(' '.join(_num(v) for v in segment) + ' c')
+    return ' '.join(path) + ' h'
+
+
+def _rgb(color):
+    return tuple(_num(channel) for channel in _color_channels(color))
+
+
+def _color_channels(color):
+    """
+    Red, green and blue of a label color, each from 0 to 1, for the native writers.
+    """
+    if isinstance(color, str) and color.startswith('#') and len(color) in (4, 7):
+        color = color[1:]
+        if len(color) == 3:
+            color = ''.join(char * 2 for char in color)
+        return tuple(int(color[i:i + 2], 16) / 255 for i in (0, 2, 4))
+
+    # Named and tuple colors are rare in label data; defer to matplotlib's parser for those.
+    from matplotlib.colors import to_rgb
+    return to_rgb(color)
+
+
+def _escape(data):
+    text = data.decode('latin-1')
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
@@ -0,0 +1,224 @@
+import io
+from functools import lru_cache
+
+# Fixed preview resolutions, each an integer multiple of the ones below it so a
+# rendered level can be downsampled into every lower level.
+PREVIEW_DPIS = (36, 72, 144)
+
+
+class Previewer:
+    """
+    Low-resolution PNG previews of a sheet, per page or per block, for checking edits
+    without opening the print PDF.
+
+    Pages are rasterized straight from the page layout, shapes with matplotlib's Agg
+    backend and text with Pillow, skipping the PDF backend entirely. With a RenderCache, every image is cached at each
+    of the PREVIEW_DPIS: rendering one level also stores the levels below it, and a level
+    that was never rendered is downsampled from a cached higher one when possible. Only
+    pages with a missing image are laid out and rasterized.
+    """
+
+    def __init__(self, generator, cache=None, paginate=True):
+        """
+        :param generator: PatchBayLabelGenerator whose theme and geometry to preview.
+        :param cache: RenderCache, or a directory for one. None renders every time.
+        :param paginate: Preview paper-sized pages rather than one cropped sheet.
+        """
+        if cache is not None:
+            from .cache import open_cache
+            cache = open_cache(cache)
+        self.generator = generator
+        self.cache = cache
+        self.paginate = paginate
+
+    def pages(self, num_groups, labels_per_group, dpi=72):
+        """
+        PNG preview of every page.
+
+        :param num_groups: Number of TT groupings, or None for one per block of label data.
+        :param labels_per_group: Label data for each group.
+        :param dpi: One of PREVIEW_DPIS.
+        :return: List of PNG bytes, one per page.
+        """
+        _check_dpi(dpi)
+        sheet = _Sheet(self, num_groups, labels_per_group, self.paginate)
+        keys = [sheet.page_key(page) for page in range(len(sheet.pages))]
+        previews = [self._lookup(key, dpi) for key in keys]
+
+        missing = [page for page, data in enumerate(previews) if data is None]
+        for page, image in sheet.rasterize(missing, dpi):
+            previews[page] = self._store(keys[page], image, dpi)
+        return previews
+
+    def blocks(self, num_groups, labels_per_group, dpi=72):
+        """
+        PNG preview of every block, cut out of its page.
+
+        Blocks are always cut from paginated pages, so blocks that would run off a
+        single cropped sheet still get a preview.
+
+        :param num_groups: Number of TT groupings, or None for one per block of label data.
+        :param labels_per_group: Label data for each group.
+        :param dpi: One of PREVIEW_DPIS.
+        :return: List of PNG bytes, one per block.
+        """
+        _check_dpi(dpi)
+        sheet = _Sheet(self, num_groups, labels_per_group, paginate=True)
+        keys = [sheet.block_key(block) for block in range(len(sheet.blocks))]
+        previews = [self._lookup(key, dpi) for key in keys]
+
+        missing = {block for block, data in enumerate(previews) if data is None}
+        pages = sorted({sheet.origins[block][0] for block in missing})
+        for page, image in sheet.rasterize(pages, dpi):
+            for block in sheet.pages[page]:
+                if block in missing:
+                    previews[block] = self._store(keys[block], sheet.crop_block(image, block, dpi), dpi)
+        return previews
+
+    def _lookup(self, key, dpi):
+        """
+        Cached PNG for a key at one DPI, downsampling from a cached higher level if need be.
+        """
+        if self.cache is None:
+            return None
+        data = self.cache.get('%s-%d' % (key, dpi))
+        if data is not None:
+            return data
+
+        for level in PREVIEW_DPIS:
+            if level > dpi:
+                source = self.cache.get('%s-%d' % (key, level))
+                if source is not None:
+                    from PIL import Image
+                    return self._store(key, Image.open(io.BytesIO(source)).reduce(level // dpi), dpi)
+        return None
+
+    def _store(self, key, image, dpi):
+        """
+        Cache an image rendered at ``dpi`` along with every fixed level below it.
+
+        :return: PNG bytes at ``dpi``.
+        """
+        data = _png(image)
+        if self.cache is not None:
+            self.cache.put('%s-%d' % (key, dpi), data)
+            for lower in PREVIEW_DPIS:
+                if lower < dpi:
+                    self.cache.put('%s-%d' % (key, lower), _png(image.reduce(dpi // lower)))
+        return data
+
+
+class _Sheet:
+    """
+    Block positions and cache keys of one preview request.
+    """
+
+    def __init__(self, previewer, num_groups, labels_per_group, paginate):
+        generator = previewer.generator
+        if not isinstance(labels_per_group, (list, tuple)):
+            labels_per_group = list(labels_per_group)
+        if num_groups is None:
+            num_groups = len(labels_per_group)
+
+        self.previewer = previewer
+        self.paginate = paginate
+        self.blocks = [labels_per_group[index] if index < len(labels_per_group) else []
+                       for index in range(num_groups)]
+        jacks = generator.block_jacks(self.blocks, num_groups)
+        self.jacks = jacks or [generator.jacks] * num_groups
+        self.origins = list(generator.block_origins(num_groups, paginate, jacks))
+        self.pages = []
+        for block, (page, _, _) in enumerate(self.origins):
+            self.pages.extend([] for _ in range(page + 1 - len(self.pages)))
+            self.pages[page].append(block)
+
+        bbox = None if paginate else generator.content_bbox(num_groups, jacks=jacks)
+        self.bbox = bbox or (0, 0, generator.paper_width, generator.paper_height)
+        self._signature = generator.cache_signature() if previewer.cache is not None else None
+
+    def page_key(self, page):
+        if self.previewer.cache is None:
+            return None
+        label_data = self.previewer.generator._label_key_data
+        blocks = [[label_data(self.blocks[block]), self.origins[block]] for block in self.pages[page]]
+        return self.previewer.cache.key('preview-page', self._signature, self.bbox, blocks)
+
+    def block_key(self, block):
+        if self.previewer.cache is None:
+            return None
+        label_data = self.previewer.generator._label_key_data(self.blocks[block])
+        return self.previewer.cache.key('preview-block', self._signature, label_data)
+
+    def rasterize(self, pages, dpi):
+        """
+        Yield ``(page, image)`` for the given page indices.
+        """
+        if not pages:
+            return
+        generator = self.previewer.generator
+        for layout in generator.layout_pages(len(self.blocks), self.blocks, self.paginate, pages=pages):
+            yield layout.index, _rasterize(generator, layout, self.bbox, dpi)
+
+    def crop_block(self, image, block, dpi):
+        generator = self.previewer.generator
+        x0, _, _, y1 = self.bbox
+        _, x, y = self.origins[block]
+        margin = 2 / 72
+        left, top = x - margin, y + margin
+        right, bottom = x + self.jacks[block] * generator.tt_width + margin, y - generator.block_height * 2 - margin
+        return image.crop((round((left - x0) * dpi), round((y1 - top) * dpi),
+                           round((right - x0) * dpi), round((y1 - bottom) * dpi)))
+
+
+def _rasterize(generator, page, bbox, dpi):
+    """
+    Draw a page's shapes with Agg, then its text with FreeType through Pillow.
+
+    Text is placed from the font's own metrics the same way the native PDF engine
+    places it, which skips matplotlib's much slower text layout.
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    from PIL import Image, ImageDraw
+
+    x0, y0, x1, y1 = bbox
+    fig = Figure(figsize=(x1 - x0, y1 - y0), dpi=dpi)
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_axes([0, 0, 1, 1])
+    ax.set_xlim(x0, x1)
+    ax.set_ylim(y0, y1)
+    ax.axis('off')
+    generator._draw_collections(ax, page)
+    canvas.draw()
+    width, height = canvas.get_width_height()
+    image = Image.frombuffer('RGBA', (width, height), canvas.buffer_rgba(), 'raw', 'RGBA', 0, 1).convert('RGB')
+
+    draw = ImageDraw.Draw(image)
+    font = generator.font_file
+    ascent = font.lp_ascent / font.units_per_em
+    scale = dpi / 72
+    for x, y, wrapped_text, size in page.texts:
+        face = _face(generator.font_path, size * scale)
+        lines = wrapped_text.split('\n')
+        baseline = y * 72 + font.text_height(len(lines), size) / 2 - ascent * size
+        for line in lines:
+            draw.text(((x - x0) * dpi, (y1 * 72 - baseline) * scale), line, fill='black', font=face, anchor='ms')
+            baseline -= font.line_pitch(size)
+    return image
+
+
+@lru_cache(maxsize=64)
+def _face(path, pixels):
+    from PIL import ImageFont
+    return ImageFont.truetype(path, pixels)
+
+
+def _check_dpi(dpi):
+    if dpi not in PREVIEW_DPIS:
+        raise ValueError('Preview DPI must be one of %s.' % ', '.join(map(str, PREVIEW_DPIS)))
+
+
+def _png(image):
+    buffer = io.BytesIO()
+    image.save(buffer, 'PNG', compress_level=1)
+    return buffer.getvalue()
@@ -0,0 +1,193 @@
+import json
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+
+# Profiler collecting for the code running in this thread or task, if any
+_ACTIVE = ContextVar('patchbay_labels_profiler', default=None)
+
+
+class Profiler:
+    """
+    Where a render spends its time: per-phase timers, counters and peak memory.
+
+    Pass one as ``profile=`` to generate_labels, or use it as a context manager around
+    any rendering code. The phases a render goes through are:
+
+    - ``setup``: importing render backends and parsing the font, once per process
+    - ``load``: reading blocks from an iterator such as ``spec.iter_spec``
+    - ``layout``: packing labels into a LabelTable, checking spans, placing blocks
+    - ``text``: wrapping and sizing label text
+    - ``bbox``: cropping a single sheet to its content
+    - ``figure``, ``draw``, ``save``: creating matplotlib figures, creating artists,
+      serializing PDF pages
+    - ``content``, ``write``: native PDF content streams, writing PDF objects
+    - ``cache``: cache keys and lookups
+
+    Phases nest, and each one's time excludes the phases opened inside it, so the
+    phase times add up to the profiled time; whatever no phase covers is ``other``.
+    Counters include ``blocks``, ``labels``, ``pages``, ``artists``, ``glyphs`` and cache
+    hits and misses.
+
+    ``hooks`` are callables taking ``(kind, name, value)``, called with
+    ``('phase', name, seconds)`` as each phase ends and ``('counter', name, amount)``
+    as counters go up, to feed a metrics collector such as StatsD or Prometheus.
+    """
+
+    def __init__(self, trace_memory=False, hooks=()):
+        """
+        :param trace_memory: Track peak Python heap use per phase with tracemalloc.
+                             This makes the render several times slower, so the
+                             default reports only the process's peak resident size.
+        :param hooks: Callables taking ``(kind, name, value)``.
+        """
+        self.trace_memory = trace_memory
+        self.hooks = list(hooks)
+        self.phases = {}  # name -> {'seconds', 'calls'} and 'peak_bytes' with trace_memory
+        self.counters = {}
+        self.seconds = 0.0
+        self._stack = []  # [name, start, seconds spent in nested phases, peak bytes]
+        self._started = None
+        self._depth = 0
+        self._token = None
+        self._peak = 0
+        self._tracing = False
+
+    def __enter__(self):
+        if self._depth == 0:
+            self._token = _ACTIVE.set(self)
+            if self.trace_memory:
+                import tracemalloc
+                self._tracing = not tracemalloc.is_tracing()
+                if self._tracing:
+                    tracemalloc.start()
+                self._fold_peak()
+            self._started = time.perf_counter()
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc_info):
+        self._depth -= 1
+        if self._depth == 0:
+            self.seconds += time.perf_counter() - self._started
+            if self.trace_memory:
+                import tracemalloc
+                self._fold_peak()
+                if self._tracing:
+                    tracemalloc.stop()
+            _ACTIVE.reset(self._token)
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Time a block of code as phase ``name``.
+        """
+        if self.trace_memory:
+            self._fold_peak()
+        self._stack.append([name, time.perf_counter(), 0.0, 0])
+        try:
+            yield
+        finally:
+            _, start, nested, peak = self._stack.pop()
+            elapsed = time.perf_counter() - start
+            if self._stack:
+                self._stack[-1][2] += elapsed
+            stats = self.phases.setdefault(name, {'seconds': 0.0, 'calls': 0})
+            stats['seconds'] += elapsed - nested
+            stats['calls'] += 1
+            if self.trace_memory:
+                peak = max(peak, self._fold_peak())
+                stats['peak_bytes'] = max(stats.get('peak_bytes', 0), peak)
+                if self._stack:
+                    self._stack[-1][3] = max(self._stack[-1][3], peak)
+            for hook in self.hooks:
+                hook('phase', name, elapsed - nested)
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+        for hook in self.hooks:
+            hook('counter', name, amount)
+
+    def _fold_peak(self):
+        """
+        Credit the heap peak since the last call to every open phase, then start over.
+        """
+        import tracemalloc
+
+        peak = tracemalloc.get_traced_memory()[1]
+        if hasattr(tracemalloc, 'reset_peak'):  # Python 3.9+
+            tracemalloc.reset_peak()
+        for entry in self._stack:
+            entry[3] = max(entry[3], peak)
+        self._peak = max(self._peak, peak)
+        return peak
+
+    def report(self):
+        """
+        Everything collected so far as a JSON-serializable dictionary.
+        """
+        phases = {name: dict(stats) for name, stats in self.phases.items()}
+        other = self.seconds - sum(stats['seconds'] for stats in phases.values())
+        phases['other'] = {'seconds': max(other, 0.0), 'calls': 0}
+        for stats in phases.values():
+            stats['share'] = stats['seconds'] / self.seconds if self.seconds else 0.0
+
+        if self.trace_memory:
+            memory = {'peak_bytes': self._peak, 'source': 'tracemalloc'}
+        else:
+            memory = {'peak_bytes': _peak_rss(), 'source': 'rss'}
+        return {'seconds': self.seconds, 'phases': phases, 'counters': dict(self.counters), 'memory': memory}
+
+    def write_report(self, output):
+        """
+        Write report() as JSON to a path or a text file object.
+        """
+        if hasattr(output, 'write'):
+            json.dump(self.report(), output, indent=2)
+            output.write('\n')
+        else:
+            with open(output, 'w', encoding='utf-8') as handle:
+                self.write_report(handle)
+
+
+def profiling(profiler):
+    """
+    Context manager that makes ``profiler`` collect for the code inside it, or does
+    nothing when it is None.
+    """
+    return nullcontext() if profiler is None else profiler
+
+
+def active():
+    """
+    The Profiler collecting for the current thread, or None.
+    """
+    return _ACTIVE.get()
+
+
+def phase(name):
+    """
+    Time a block of code as phase ``name`` if a Profiler is collecting; free otherwise.
+    """
+    profiler = _ACTIVE.get()
+    return nullcontext() if profiler is None else profiler.phase(name)
+
+
+def count(name, amount=1):
+    """
+    Add to counter ``name`` if a Profiler is collecting.
+    """
+    profiler = _ACTIVE.get()
+    if profiler is not None:
+        profiler.count(name, amount)
+
+
+def _peak_rss():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    import sys
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
@@ -0,0 +1,233 @@
+import json
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from . import __version__
+from .spec import SpecError, check_block
+
+MAX_BODY_BYTES = 16 << 20
+CONTENT_TYPES = {'pdf': 'application/pdf', 'png': 'image/png'}
+
+# Per-worker cache of block drawings and whole documents, so repeated requests are cheap
+_WORKER_CACHE = None
+
+
+class RenderService:
+    """
+    HTTP front end for a pool of warm render workers.
+
+    ``POST /render`` takes a spec as a JSON body, either a list of blocks or an object
+    with a "blocks" list, and answers with the rendered bytes. Query parameters choose
+    ``theme`` (color, bw), ``engine`` (native, matplotlib), ``paginate`` (0, 1) and
+    ``format`` (pdf, png), and the bay geometry with ``jacks`` and ``packing`` (grid,
+    shelf); PNGs are previews of one ``page`` at ``dpi`` 36, 72 or 144.
+    ``GET /health`` reports the pool and queue state.
+
+    Requests are handled on threads and rendered in worker processes that keep their
+    fonts, backends and caches loaded. At most ``workers + queue_size`` requests are
+    admitted at a time; beyond that the service answers 503 straight away with a
+    Retry-After header instead of letting a backlog build up.
+    """
+
+    def __init__(self, host='127.0.0.1', port=8765, workers=None, queue_size=16, font=None):
+        """
+        :param host: Interface to listen on.
+        :param port: Port to listen on; 0 picks a free one.
+        :param workers: Worker processes; defaults to the CPU count.
+        :param queue_size: Requests allowed to wait for a free worker.
+        :param font: Label font file for every render.
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.font = font
+        self._slots = threading.BoundedSemaphore(self.workers + queue_size)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._rejected = 0
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_service_worker,
+                                             initargs=([font or ''], ['native', 'matplotlib']))
+        # Start every worker now rather than on the first requests
+        for future in [self._executor.submit(_ping) for _ in range(self.workers)]:
+            future.result()
+
+        handler = type('Handler', (_Handler,), {'service': self})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+
+    @property
+    def address(self):
+        host, port = self.httpd.server_address[:2]
+        return 'http://%s:%d' % (host, port)
+
+    def serve_forever(self):
+        try:
+            self.httpd.serve_forever()
+        finally:
+            self.close()
+
+    def shutdown(self):
+        """
+        Stop serve_forever from another thread.
+        """
+        self.httpd.shutdown()
+
+    def close(self):
+        self.httpd.server_close()
+        self._executor.shutdown(wait=True)
+
+    def health(self):
+        with self._lock:
+            return {
+                'version': __version__,
+                'workers': self.workers,
+                'queue_size': self.queue_size,
+                'in_flight': self._in_flight,
+                'rejected': self._rejected,
+            }
+
+    def render(self, blocks, options):
+        """
+        Render on the pool, or return None if the service is at capacity.
+        """
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            return None
+        with self._lock:
+            self._in_flight += 1
+        try:
+            return self._executor.submit(_render, blocks, options, self.font).result()
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+            self._slots.release()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    service = None
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        if urlparse(self.path).path == '/health':
+            self._send(200, 'application/json', json.dumps(self.service.health()).encode('utf-8'))
+        else:
+            self._error(404, 'not found')
+
+    def do_POST(self):
+        # The body is left unread on a bad length, so the connection cannot be reused
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self.close_connection = True
+            self._error(400, 'Content-Length must be a whole number of bytes')
+            return
+        if length > MAX_BODY_BYTES:
+            self.close_connection = True
+            self._error(413, 'spec larger than %d bytes' % MAX_BODY_BYTES)
+            return
+        # Read the body before anything else can be rejected, or it is taken for the next request
+        body = self.rfile.read(length)
+
+        url = urlparse(self.path)
+        if url.path != '/render':
+            self._error(404, 'not found')
+            return
+        try:
+            options = _options(parse_qs(url.query))
+            spec = json.loads(body or b'null')
+            blocks = spec.get('blocks') if isinstance(spec, dict) else spec
+            if not isinstance(blocks, list):
+                raise SpecError('expected a list of blocks')
+            blocks = [check_block(labels, number, 'request', jacks=options['jacks'])
+                      for number, labels in enumerate(blocks, 1)]
+        except (ValueError, SpecError) as error:
+            self._error(400, str(error))
+            return
+
+        try:
+            data = self.service.render(blocks, options)
+        except ValueError as error:
+            self._error(400, str(error))
+            return
+        except Exception as error:  # report render failures to the client, keep serving
+            self._error(500, '%s: %s' % (type(error).__name__, error))
+            return
+        if data is None:
+            self._error(503, 'render queue is full', {'Retry-After': '1'})
+            return
+        self._send(200, CONTENT_TYPES[options['format']], data)
+
+    def log_message(self, format, *args):
+        pass  # one line per request is too noisy for a render service
+
+    def _error(self, status, message, headers=None):
+        self._send(status, 'application/json', json.dumps({'error': message}).encode('utf-8'), headers)
+
+    def _send(self, status, content_type, body, headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def _options(query):
+    def one(name, default, choices):
+        value = query.get(name, [default])[-1]
+        if value not in choices:
+            raise ValueError("'%s' must be one of %s" % (name, ', '.join(choices)))
+        return value
+
+    options = {
+        'theme': one('theme', 'color', ('color', 'bw')),
+        'engine': one('engine', 'native', ('native', 'matplotlib')),
+        'paginate': one('paginate', '0', ('0', '1', 'false', 'true')) in ('1', 'true'),
+        'format': one('format', 'pdf', tuple(CONTENT_TYPES)),
+        'dpi': int(one('dpi', '72', ('36', '72', '144'))),
+        'packing': one('packing', 'grid', ('grid', 'shelf')),
+    }
+    for name, default in (('page', '1'), ('jacks', '8')):
+        value = query.get(name, [default])[-1]
+        if not value.isdigit() or int(value) < 1:
+            raise ValueError("'%s' must be a positive whole number" % name)
+        options[name] = int(value)
+    return options
+
+
+def _warm_service_worker(fonts, engines):
+    from .batch import _warm_worker
+    from .cache import MemoryCache
+
+    global _WORKER_CACHE
+    _WORKER_CACHE = MemoryCache()
+    _warm_worker(fonts, engines)
+
+
+def _ping():
+    return os.getpid()
+
+
+def _render(blocks, options, font):
+    import io
+    from .batch import _generator
+
+    generator = _generator(font, options['theme'], options['jacks'], options['packing'])
+    if options['format'] == 'png':
+        from .preview import Previewer
+
+        previews = Previewer(generator, _WORKER_CACHE, options['paginate']).pages(None, blocks, options['dpi'])
+        if not 1 <= options['page'] <= len(previews):
+            raise ValueError('page %d out of range 1-%d' % (options['page'], len(previews)))
+        return previews[options['page'] - 1]
+
+    buffer = io.BytesIO()
+    generator.generate_labels(None, blocks, output_file=buffer, paginate=options['paginate'],
+                              engine=options['engine'], cache=_WORKER_CACHE)
+    return buffer.getvalue()
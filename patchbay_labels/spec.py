@@ -0,0 +1,453 @@
+import ast
+import csv
+import itertools
+import json
+import os
+import re
+
+ROWS = ('top', 'bottom', 'both')
+JACKS_PER_ROW = 8
+_HEX_COLOR = re.compile(r'#(?:[0-9a-fA-F]{3}){1,2}')
+
+
+class SpecError(ValueError):
+    """
+    Label data that breaks the block rules, with the place it was found.
+    """
+
+    def __init__(self, message, block=None, label=None, source=None, line=None):
+        """
+        :param message: What is wrong.
+        :param block: 1-indexed block number, if known.
+        :param label: 1-indexed label number within the block, if known.
+        :param source: File name or other description of where the data came from.
+        :param line: 1-indexed line in the source file, if known.
+        """
+        location = []
+        if source is not None:
+            location.append(str(source) if line is None else '%s:%d' % (source, line))
+        if block is not None:
+            location.append('block %d' % block)
+        if label is not None:
+            location.append('label %d' % label)
+        super().__init__('%s: %s' % (', '.join(location), message) if location else message)
+        self.block = block
+        self.label = label
+        self.source = source
+        self.line = line
+
+
+class Block(list):
+    """
+    A block's labels, tagged with the jack count of its bay.
+
+    Blocks are plain lists of labels everywhere; a spec entry written as a mapping,
+    ``{"jacks": 24, "labels": [...]}``, is read into a Block so the size travels with
+    the labels. Blocks without one take the generator's ``jacks``.
+    """
+
+    def __init__(self, labels=(), jacks=JACKS_PER_ROW):
+        super().__init__(labels)
+        self.jacks = jacks
+
+
+def check_label(label, block=None, index=None, source=None, line=None, jacks=JACKS_PER_ROW):
+    """
+    Check one label dictionary against the jack-column, top/bottom/both rules.
+
+    :param label: Dictionary with 'text', 'start', 'span', 'row' and optional 'color'.
+    :param block: 1-indexed block number, for error messages.
+    :param index: 1-indexed label number within the block, for error messages.
+    :param source: Where the label came from, for error messages.
+    :param line: Line of the source file the label is on, for error messages.
+    :param jacks: Jacks per row of the label's block.
+    :raises SpecError: If the label is malformed.
+    """
+    def fail(message):
+        raise SpecError(message, block, index, source, line)
+
+    if not isinstance(label, dict):
+        fail('expected a label mapping, got %s' % type(label).__name__)
+    for key in ('text', 'start', 'span', 'row'):
+        if key not in label:
+            fail("missing '%s'" % key)
+
+    if not isinstance(label['text'], str):
+        fail("'text' must be a string")
+    start, span = label['start'], label['span']
+    if not isinstance(start, int) or isinstance(start, bool) or not 1 <= start <= jacks:
+        fail("'start' must be a whole number from 1 to %d, got %r" % (jacks, start))
+    if not isinstance(span, int) or isinstance(span, bool) or span < 1:
+        fail("'span' must be a positive whole number, got %r" % (span,))
+    if start + span - 1 > jacks:
+        fail('span of %d from jack %d runs past jack %d' % (span, start, jacks))
+    if label['row'] not in ROWS:
+        fail("'row' must be 'top', 'bottom' or 'both', got %r" % (label['row'],))
+    color = label.get('color')
+    if color is not None and not (isinstance(color, str) and _is_color(color)):
+        fail("'color' must be a color such as '#33787E', got %r" % (color,))
+
+
+def _is_color(color):
+    """
+    Whether a color string can be drawn: ``#rgb`` or ``#rrggbb``, or anything else matplotlib accepts.
+    """
+    if _HEX_COLOR.fullmatch(color):
+        return True
+    # Named colors are rare in label data; only load matplotlib's parser for them
+    from matplotlib.colors import is_color_like
+    return is_color_like(color)
+
+
+def check_block(labels, block=None, source=None, line=None, jacks=JACKS_PER_ROW):
+    """
+    Check one block's list of labels.
+
+    :param labels: List of label dictionaries, or a mapping with a "labels" list and an
+                   optional "jacks" count for a block whose bay differs from the sheet's.
+    :param block: 1-indexed block number, for error messages.
+    :param source: Where the block came from, for error messages.
+    :param line: Line of the source file the block starts on, for error messages.
+    :param jacks: Jacks per row of blocks that do not set their own.
+    :return: The labels, as a Block when the block set its own jack count, so checks
+             can be chained into a stream.
+    :raises SpecError: If the block or one of its labels is malformed.
+    """
+    size = None
+    if isinstance(labels, dict):
+        size = labels.get('jacks')
+        if size is not None and (not isinstance(size, int) or isinstance(size, bool) or size < 1):
+            raise SpecError("'jacks' must be a positive whole number, got %r" % (size,), block, source=source,
+                            line=line)
+        labels = labels.get('labels')
+    elif isinstance(labels, Block):
+        size = labels.jacks
+    if not isinstance(labels, list):
+        raise SpecError('expected a list of labels', block, source=source, line=line)
+    for label_number, label in enumerate(labels, 1):
+        check_label(label, block, label_number, source, line, size or jacks)
+    check_spans(labels, block, source, line, size or jacks)
+    return labels if size is None else Block(labels, size)
+
+
+def check_spans(labels, block=None, source=None, line=None, jacks=JACKS_PER_ROW):
+    """
+    Check that no two labels of a block claim the same jack of the same row.
+
+    Each row is indexed as a list of ``(first, last)`` jack intervals sorted by first
+    jack, with 'both' labels entered in both rows, so one sweep per row finds every
+    overlap, including top or bottom labels running into a 'both' label, in
+    O(k log k) for a block of k labels. The labels must already have passed check_label.
+
+    :param labels: List of label dictionaries.
+    :param block: 1-indexed block number, for error messages.
+    :param source: Where the block came from, for error messages.
+    :param line: Line of the source file the block starts on, for error messages.
+    :param jacks: Jacks per row of the block.
+    :return: Unlabeled runs of jacks as ``(row, first, last)``, 1-indexed and
+             inclusive, for callers that want to warn about gaps.
+    :raises SpecError: Naming the later of two overlapping labels and the jacks they share.
+    """
+    gaps = []
+    for row in ('top', 'bottom'):
+        spans = sorted((label['start'], label['start'] + label['span'] - 1, number)
+                       for number, label in enumerate(labels, 1) if label['row'] in (row, 'both'))
+        reach, holder = 0, None  # last jack covered so far on this row, and by which label
+        for first, last, number in spans:
+            if first <= reach:
+                shared = _jack_range(first, min(last, reach))
+                kinds = labels[number - 1]['row'], labels[holder - 1]['row']
+                if kinds[0] != kinds[1] and 'both' in kinds:
+                    message = "'%s' label conflicts with '%s' label %d on %s" % (kinds + (holder, shared))
+                else:
+                    message = 'overlaps label %d on the %s row, %s' % (holder, row, shared)
+                raise SpecError(message, block, number, source, line)
+            if first > reach + 1:
+                gaps.append((row, reach + 1, first - 1))
+            reach, holder = last, number
+        if reach < jacks:
+            gaps.append((row, reach + 1, jacks))
+    return gaps
+
+
+def check_blocks(labels_per_group, source=None, jacks=JACKS_PER_ROW):
+    """
+    Check every label of every block.
+
+    :param labels_per_group: List of label lists, one per block.
+    :param source: Where the data came from, for error messages.
+    :param jacks: Jacks per row of blocks that do not set their own.
+    :return: Number of labels checked.
+    :raises SpecError: On the first malformed block or label.
+    """
+    count = 0
+    for block_number, labels in enumerate(labels_per_group, 1):
+        count += len(check_block(labels, block_number, source, jacks=jacks))
+    return count
+
+
+def _jack_range(first, last):
+    return 'jack %d' % first if first == last else 'jacks %d-%d' % (first, last)
+
+
+def load_spec(path, format=None, jacks=JACKS_PER_ROW):
+    """
+    Load and check a whole spec file.
+
+    :param path: Path to a JSON, JSON Lines, CSV, YAML or Python spec.
+    :param format: Override the format picked from the file extension.
+    :param jacks: Jacks per row of blocks that do not set their own.
+    :return: List of blocks, ready for generate_labels.
+    :raises SpecError: If the file does not describe valid blocks.
+    """
+    return list(iter_spec(path, format, jacks))
+
+
+def iter_spec(path, format=None, jacks=JACKS_PER_ROW):
+    """
+    Stream the blocks of a spec file, checking each label as it is read.
+
+    Blocks are parsed one at a time, so a large export never has to be held in memory
+    as a whole and a bad label fails before the rest of the file is read. The result
+    can be passed straight to ``generate_labels(None, iter_spec(path))``.
+
+    Supported formats, picked by extension:
+
+    - ``.json``: a list of blocks, each a list of label dictionaries in the same format
+      as ``labels_per_group``, or an object with that list under "blocks". Top-level
+      lists are decoded one block at a time.
+    - ``.jsonl`` / ``.ndjson``: one block per line, either a list of labels or an
+      object with a "labels" list.
+    - ``.csv``: one label per row with ``block,text,start,span,row,color`` columns, and
+      an optional ``jacks`` column read from the first row of each block.
+      Consecutive rows with the same block value form a block. A row with only a
+      block value is an empty block.
+    - ``.yaml`` / ``.yml``: a list of blocks, or one block per YAML document. Needs PyYAML.
+    - ``.py``: the ``labels_per_group`` literal of a script such as TT_labels_Color.py.
+      The file is parsed, never run.
+
+    In the other formats a block may also be written as an object with a "labels" list
+    and a "jacks" count, for a 12, 24 or 48-point bay on a sheet of 8-point ones.
+
+    :param path: Path to the spec file.
+    :param format: One of 'json', 'jsonl', 'csv', 'yaml' or 'py' to override the extension.
+    :param jacks: Jacks per row of blocks that do not set their own.
+    :return: Iterator of blocks.
+    :raises SpecError: If the file does not describe valid blocks.
+    """
+    format = spec_format(path, format)
+    if format not in READERS:
+        raise SpecError("unknown spec format '%s'; use json, jsonl, csv, yaml or py" % format, source=path)
+    return READERS[format](path, jacks)
+
+
+def spec_format(path, format=None):
+    """
+    The format of a spec file: ``format`` if given, otherwise its extension. It is a
+    spec iter_spec can read when it is a key of READERS.
+    """
+    return (format or os.path.splitext(path)[1].lstrip('.')).lower()
+
+
+def _iter_json(path, jacks, chunk_size=1 << 16):
+    decoder = json.JSONDecoder()
+    with open(path, encoding='utf-8') as handle:
+        buffer = handle.read(chunk_size)
+        position = _skip_whitespace(buffer, 0)
+
+        if buffer[position:position + 1] != '[':
+            # An object (or anything else) is decoded whole; only top-level lists stream.
+            try:
+                data = json.loads(buffer + handle.read())
+            except json.JSONDecodeError as error:
+                raise SpecError('invalid JSON: %s' % error, source=path)
+            if isinstance(data, dict):
+                data = data.get('blocks')
+            if not isinstance(data, list):
+                raise SpecError('expected a list of blocks', source=path)
+            for block_number, labels in enumerate(data, 1):
+                yield check_block(labels, block_number, path, jacks=jacks)
+            return
+
+        position += 1
+        block_number = 0
+        expect_value = True
+        while True:
+            position = _skip_whitespace(buffer, position)
+            if position >= len(buffer):
+                chunk = handle.read(chunk_size)
+                if not chunk:
+                    raise SpecError('invalid JSON: unexpected end of file', block_number + 1, source=path)
+                buffer = buffer[position:] + chunk
+                position = 0
+                continue
+
+            char = buffer[position]
+            if char == ']' and (block_number == 0 or not expect_value):
+                return
+            if char == ',' and not expect_value:
+                position += 1
+                expect_value = True
+                continue
+            if not expect_value:
+                raise SpecError("invalid JSON: expected ',' or ']' after block", block_number, source=path)
+
+            try:
+                labels, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError as error:
+                chunk = handle.read(chunk_size)
+                if not chunk:
+                    raise SpecError('invalid JSON: %s' % error, block_number + 1, source=path)
+                buffer = buffer[position:] + chunk
+                position = 0
+                continue
+
+            block_number += 1
+            yield check_block(labels, block_number, path, jacks=jacks)
+            position = end
+            expect_value = False
+
+
+def _skip_whitespace(text, position):
+    while position < len(text) and text[position] in ' \t\r\n':
+        position += 1
+    return position
+
+
+def _iter_json_lines(path, jacks):
+    with open(path, encoding='utf-8') as handle:
+        block_number = 0
+        for line_number, line in enumerate(handle, 1):
+            if not line.strip():
+                continue
+            block_number += 1
+            try:
+                labels = json.loads(line)
+            except json.JSONDecodeError as error:
+                raise SpecError('invalid JSON: %s' % error, block_number, source=path, line=line_number)
+            yield check_block(labels, block_number, path, line_number, jacks)
+
+
+def _iter_csv(path, jacks):
+    with open(path, newline='', encoding='utf-8') as handle:
+        reader = csv.DictReader(handle)
+        missing = {'block', 'text', 'start', 'span', 'row'} - set(reader.fieldnames or ())
+        if missing:
+            raise SpecError('missing CSV columns: %s' % ', '.join(sorted(missing)), source=path, line=1)
+
+        block_number = 0
+        current_key = None
+        labels = []
+        for row in reader:
+            line = reader.line_num
+            key = (row.get('block') or '').strip()
+            if key != current_key:
+                if current_key is not None:
+                    check_spans(labels, block_number, path, block_line, getattr(labels, 'jacks', jacks))
+                    yield labels
+                current_key = key
+                block_number += 1
+                block_line = line
+                labels = []
+                size = (row.get('jacks') or '').strip()
+                if size:
+                    if not size.isdigit() or int(size) < 1:
+                        raise SpecError("'jacks' must be a positive whole number, got %r" % size,
+                                        block_number, source=path, line=line)
+                    labels = Block(jacks=int(size))
+
+            if not any((row.get(column) or '').strip() for column in ('text', 'start', 'span', 'row')):
+                continue
+
+            label = {'text': row.get('text') or '', 'row': (row.get('row') or '').strip()}
+            for column in ('start', 'span'):
+                value = (row.get(column) or '').strip()
+                try:
+                    label[column] = int(value)
+                except ValueError:
+                    raise SpecError("'%s' must be a whole number, got %r" % (column, value),
+                                    block_number, len(labels) + 1, path, line)
+            color = (row.get('color') or '').strip()
+            if color:
+                label['color'] = color
+            check_label(label, block_number, len(labels) + 1, path, line, getattr(labels, 'jacks', jacks))
+            labels.append(label)
+
+        if current_key is not None:
+            check_spans(labels, block_number, path, block_line, getattr(labels, 'jacks', jacks))
+            yield labels
+
+
+def _iter_yaml(path, jacks):
+    try:
+        import yaml
+    except ImportError:
+        raise SpecError('YAML specs need PyYAML (pip install pyyaml)', source=path)
+
+    with open(path, encoding='utf-8') as handle:
+        try:
+            documents = yaml.safe_load_all(handle)
+            first = next(documents, None)
+            if isinstance(first, dict) and 'blocks' in first:
+                first = first['blocks']
+            if isinstance(first, list) and all(isinstance(block, list) or (isinstance(block, dict) and 'labels' in block)
+                                               for block in first):
+                # A single document holding the whole list of blocks
+                for block_number, labels in enumerate(first, 1):
+                    yield check_block(labels, block_number, path, jacks=jacks)
+                return
+
+            # Otherwise every document is one block
+            blocks = itertools.chain([first] if first is not None else [], documents)
+            for block_number, labels in enumerate(blocks, 1):
+                yield check_block(labels, block_number, path, jacks=jacks)
+        except yaml.YAMLError as error:
+            raise SpecError('invalid YAML: %s' % error, source=path)
+
+
+def _iter_python(path, jacks, name='labels_per_group'):
+    _, value = _python_list(path, name)
+    for block_number, node in enumerate(value.elts, 1):
+        try:
+            labels = ast.literal_eval(node)
+        except ValueError:
+            raise SpecError('block is not a plain literal', block_number, source=path, line=node.lineno)
+        yield check_block(labels, block_number, path, node.lineno, jacks)
+
+
+def _python_list(path, name):
+    """
+    Parse a script, without running it, for the list literal assigned to ``name``.
+
+    :return: ``(source, node)``: the script's text and the ast.List or ast.Tuple node.
+    :raises SpecError: If the script does not parse or assigns no such list.
+    """
+    with open(path, encoding='utf-8') as handle:
+        source = handle.read()
+    try:
+        module = ast.parse(source, path)
+    except SyntaxError as error:
+        raise SpecError('invalid Python: %s' % error.msg, source=path, line=error.lineno)
+
+    value = None
+    for node in module.body:
+        if isinstance(node, ast.Assign) and any(isinstance(target, ast.Name) and target.id == name
+                                                for target in node.targets):
+            value = node.value
+    if value is None:
+        raise SpecError("no '%s = [...]' assignment found" % name, source=path)
+    if not isinstance(value, (ast.List, ast.Tuple)):
+        raise SpecError("'%s' must be a list of blocks" % name, source=path, line=value.lineno)
+    return source, value
+
+
+# Spec reader of every format, by file extension
+READERS = {
+    'json': _iter_json,
+    'jsonl': _iter_json_lines,
+    'ndjson': _iter_json_lines,
+    'csv': _iter_csv,
+    'yaml': _iter_yaml,
+    'yml': _iter_yaml,
+    'py': _iter_python,
+}
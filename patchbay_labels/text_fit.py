@@ -0,0 +1,76 @@
+import textwrap
+from functools import lru_cache
+
+POINTS_PER_INCH = 72
+MAX_LINES = 3  # a label strip row is too short to read more than three wrapped lines
+PADDING = 0.03  # inches kept clear between the text and the label outline
+
+
+@lru_cache(maxsize=65536)
+def measure(font, text, size):
+    """
+    Width of one line of text in inches, from the font's real advance widths.
+
+    Memoized per ``(font, text, size)``, so labels that repeat across a studio cost
+    one dictionary lookup after the first time they are measured.
+
+    :param font: FontFile to measure with.
+    :param text: Single line of text.
+    :param size: Font size in points.
+    """
+    return font.text_width(text, size) / POINTS_PER_INCH
+
+
+@lru_cache(maxsize=16384)
+def fit_text(font, text, width, height, max_size, wrap_width=None):
+    """
+    Pick the line wrap and font size that make a label fill its span.
+
+    Every way of wrapping the text at word boundaries (up to ``MAX_LINES`` lines) is
+    measured, and the one that allows the largest font size wins. Ties go to fewer
+    lines, so text that already fits at ``max_size`` stays on one line.
+
+    :param font: FontFile to measure with.
+    :param text: Label text.
+    :param width: Width of the label span in inches.
+    :param height: Height of the label cell in inches.
+    :param max_size: Largest font size to use, in points.
+    :param wrap_width: Force wrapping at this many characters instead of searching.
+    :return: ``(wrapped_text, font_size)``.
+    """
+    available_width = max(width - 2 * PADDING, 0)
+    available_height = max(height - 2 * PADDING, 0)
+
+    best_lines, best_size = None, -1
+    for lines in _candidate_wraps(text, wrap_width):
+        size = max_size
+        line_width = max(measure(font, line, 1) for line in lines)
+        if line_width > 0:
+            size = min(size, available_width / line_width)
+        line_height = font.text_height(len(lines), 1) / POINTS_PER_INCH
+        if line_height > 0:
+            size = min(size, available_height / line_height)
+        if size > best_size + 1e-9:
+            best_lines, best_size = lines, size
+
+    return '\n'.join(best_lines), best_size
+
+
+def _candidate_wraps(text, wrap_width):
+    if wrap_width:
+        return [tuple(textwrap.wrap(text, width=wrap_width)) or ('',)]
+
+    words = text.split()
+    if not words:
+        return [('',)]
+
+    candidates = []
+    seen = set()
+    for line_width in range(len(text), max(len(word) for word in words) - 1, -1):
+        lines = tuple(textwrap.wrap(text, width=line_width))
+        if len(lines) > MAX_LINES:
+            break
+        if lines not in seen:
+            seen.add(lines)
+            candidates.append(lines)
+    return candidates
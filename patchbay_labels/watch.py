@@ -0,0 +1,180 @@
+import os
+import time
+
+from .spec import SpecError, load_spec
+
+
+class SheetWatcher:
+    """
+    Re-render a sheet whenever its spec file changes, keeping everything warm in between.
+
+    The generator, its parsed font and text-fitting caches, and the render backend stay
+    loaded for the life of the watcher. Each change is diffed block by block against the
+    previous version of the spec and only what changed is redrawn:
+
+    - native engine: each block's drawing is kept in memory, so only changed blocks are
+      laid out and drawn before the PDF is reassembled.
+    - matplotlib engine: one figure per page is kept open, and only pages holding a
+      changed block are cleared and redrawn before the figures are saved again.
+
+    The output is written to a temporary file and moved into place, so a PDF viewer
+    never sees a half-written file.
+    """
+
+    def __init__(self, generator, spec, output_file, paginate=False, engine='native', batched=True, log=print):
+        """
+        :param generator: PatchBayLabelGenerator to render with.
+        :param spec: Spec file to watch, in any format spec.iter_spec reads.
+        :param output_file: PDF to keep up to date.
+        :param paginate: Break the sheet onto paper-sized pages.
+        :param engine: 'native' or 'matplotlib'.
+        :param batched: Draw matplotlib shapes as collections.
+        :param log: Called with one line of text per render or error.
+        """
+        if engine not in ('matplotlib', 'native'):
+            raise ValueError("Engine must be 'matplotlib' or 'native'.")
+        from .cache import MemoryCache
+
+        self.generator = generator
+        self.spec = spec
+        self.output_file = output_file
+        self.paginate = paginate
+        self.engine = engine
+        self.batched = batched
+        self.log = log
+        self._cache = MemoryCache()
+        self._stamp = None
+        self._blocks = None
+        self._figures = []
+        self._origins = []
+        self._bbox = None
+
+    def check(self):
+        """
+        Render if the spec changed since the last check.
+
+        :return: True if a render was attempted.
+        """
+        try:
+            stat = os.stat(self.spec)
+        except FileNotFoundError:
+            return False
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if stamp == self._stamp:
+            return False
+        self._stamp = stamp
+        self.render()
+        return True
+
+    def render(self):
+        """
+        Load the spec and redraw whatever changed. Spec and render errors are logged,
+        not raised, so a half-saved edit does not end the watch, and the last good
+        output is left in place.
+
+        :return: Number of blocks that changed, or None if the spec could not be loaded
+                 or rendered.
+        """
+        start = time.perf_counter()
+        try:
+            blocks = load_spec(self.spec, jacks=self.generator.jacks)
+        except (SpecError, OSError) as error:
+            self.log('error: %s' % error)
+            return None
+
+        label_data = self.generator._label_key_data
+        previous = self._blocks or []
+        changed = [index for index, labels in enumerate(blocks)
+                   if index >= len(previous) or label_data(labels) != label_data(previous[index])]
+        changed += range(len(blocks), len(previous))
+
+        temp_file = '%s.tmp%d' % (self.output_file, os.getpid())
+        try:
+            if self.engine == 'native':
+                self.generator.generate_labels(len(blocks), blocks, output_file=temp_file, paginate=self.paginate,
+                                               engine='native', cache=self._cache)
+                redrawn = ''
+            else:
+                pages = self._render_figures(blocks, changed, temp_file)
+                redrawn = ', %d of %d pages redrawn' % (pages, len(self._figures))
+            os.replace(temp_file, self.output_file)
+        except Exception as error:
+            self.log('error: %s: %s' % (type(error).__name__, error))
+            self.close()  # kept figures may be half redrawn; start the next render afresh
+            try:
+                os.remove(temp_file)
+            except OSError:
+                pass
+            return None
+        self._blocks = blocks
+
+        self.log('%s: %d of %d blocks changed%s, written in %.0f ms'
+                 % (self.output_file, len(changed), len(blocks), redrawn, (time.perf_counter() - start) * 1000))
+        return len(changed)
+
+    def run(self, interval=0.1, stop=None):
+        """
+        Poll the spec until interrupted, rendering on every change.
+
+        :param interval: Seconds between checks.
+        :param stop: Optional threading.Event that ends the loop when set.
+        """
+        try:
+            while stop is None or not stop.is_set():
+                self.check()
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.close()
+
+    def close(self):
+        """
+        Drop the figures kept open for the matplotlib engine.
+        """
+        self._figures = []
+        self._origins = []
+
+    def _render_figures(self, blocks, changed, output_file):
+        generator = self.generator
+        jacks = generator.block_jacks(blocks, len(blocks))
+        origins = list(generator.block_origins(len(blocks), self.paginate, jacks))
+        page_count = max(page for page, _, _ in origins) + 1 if blocks else 0
+        if not self.paginate:
+            page_count = 1  # a single sheet is saved even when it is empty
+        bbox = None if self.paginate else generator.content_bbox(len(blocks), jacks=jacks)
+
+        # Blocks that moved (a resized block can reflow its row, or with shelf packing the
+        # whole sheet) dirty both the page they left and the page they landed on, and so do
+        # removed blocks.
+        previous = self._origins
+        moved = [index for index in range(max(len(origins), len(previous)))
+                 if index >= len(origins) or index >= len(previous) or origins[index] != previous[index]]
+        touched = set(changed) | set(moved)
+        pages = {origins[index][0] for index in touched if index < len(origins)}
+        pages |= {previous[index][0] for index in touched if index < len(previous)}
+
+        if bbox != self._bbox or page_count != len(self._figures):
+            # The sheet changed shape, so no kept figure can be reused
+            self.close()
+            self._bbox = bbox
+            self._figures = [generator._new_page(bbox) for _ in range(page_count)]
+            dirty = range(page_count)
+        else:
+            dirty = sorted(page for page in pages if page < page_count)
+        self._origins = origins
+
+        for page in generator.layout_pages(len(blocks), blocks, self.paginate, pages=dirty):
+            _, ax = self._figures[page.index]
+            for artist in ax.collections[:] + ax.texts[:] + ax.patches[:]:
+                artist.remove()
+            generator.draw_page(ax, page, batched=self.batched)
+
+        if self.paginate:
+            from matplotlib.backends.backend_pdf import PdfPages
+            with PdfPages(output_file) as pdf:
+                for fig, _ in self._figures:
+                    pdf.savefig(fig)
+        elif self._figures:
+            self._figures[0][0].savefig(output_file, format='pdf')
+        return len(dirty)
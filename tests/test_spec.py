@@ -0,0 +1,102 @@
+import json
+
+import pytest
+
+from patchbay_labels.layout import LabelTable
+from patchbay_labels.spec import SpecError, check_blocks, check_label, iter_spec
+
+
+def label(text='A', start=1, span=2, row='top', **fields):
+    return dict(text=text, start=start, span=span, row=row, **fields)
+
+
+def error_of(function, *args):
+    with pytest.raises(SpecError) as caught:
+        function(*args)
+    return str(caught.value)
+
+
+def read(path):
+    return list(iter_spec(path))
+
+
+def write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+
+def test_json_names_block_and_label(tmp_path):
+    path = write(tmp_path, 'bay.json', json.dumps([[label()], [label(), label('B', start=9)]]))
+    assert error_of(read, path) == (
+        "%s, block 2, label 2: 'start' must be a whole number from 1 to 8, got 9" % path)
+
+
+def test_json_lines_names_line(tmp_path):
+    path = write(tmp_path, 'bay.jsonl', '%s\n\n%s\n' % (json.dumps([label()]), json.dumps([label(row='middle')])))
+    assert error_of(read, path) == (
+        "%s:3, block 2, label 1: 'row' must be 'top', 'bottom' or 'both', got 'middle'" % path)
+
+
+def test_csv_names_label_line(tmp_path):
+    path = write(tmp_path, 'bay.csv', 'block,text,start,span,row\n1,A,1,2,top\n2,B,1,2,top\n2,C,x,2,top\n')
+    assert error_of(read, path) == "%s:4, block 2, label 2: 'start' must be a whole number, got 'x'" % path
+
+
+def test_csv_overlap_names_block_line(tmp_path):
+    path = write(tmp_path, 'bay.csv', 'block,text,start,span,row\n1,A,1,2,top\n2,B,1,2,top\n2,C,2,2,top\n')
+    assert error_of(read, path) == "%s:3, block 2, label 2: overlaps label 1 on the top row, jack 2" % path
+
+
+def test_yaml_names_block(tmp_path):
+    pytest.importorskip('yaml')
+    path = write(tmp_path, 'bay.yaml', '- - {text: A, start: 1, span: 2, row: top}\n- - {text: B, start: 1, row: top}\n')
+    assert error_of(read, path) == "%s, block 2, label 1: missing 'span'" % path
+
+
+def test_python_names_block_line(tmp_path):
+    path = write(tmp_path, 'bay.py', 'labels_per_group = [\n    [%r],\n    [%r, %r],\n]\n'
+                 % (label(), label(), label('B', row='both')))
+    assert error_of(read, path) == (
+        "%s:3, block 2, label 2: 'both' label conflicts with 'top' label 1 on jacks 1-2" % path)
+
+
+def test_python_never_runs_the_script(tmp_path):
+    path = write(tmp_path, 'bay.py', 'labels_per_group = [open("x")]\n')
+    assert error_of(read, path) == '%s:1, block 1: block is not a plain literal' % path
+
+
+@pytest.mark.parametrize('color', ['#abc', '#33787E', 'red', 'tab:blue'])
+def test_color_accepted(color):
+    check_label(label(color=color))
+
+
+@pytest.mark.parametrize('color', ['bogus', '#12', '#gggggg', '', 5])
+def test_color_rejected(color):
+    assert error_of(check_blocks, [[label(color=color)]]) == (
+        "block 1, label 1: 'color' must be a color such as '#33787E', got %r" % (color,))
+
+
+@pytest.mark.parametrize('blocks', [
+    [[label(), label('B', start=2)]],
+    [[label(span=3), label('B', start=3, row='both')]],
+    [[label(row='both')], [label(start=7, span=2), label('B', start=8, span=1, row='bottom'),
+                           label('C', start=4, span=5, row='bottom')]],
+    [[label(start=8)]],
+    [[label(start=0)]],
+    [[label(span=0)]],
+    [[label(), label('B')], [label(start=9)]],
+    [[label(start=9), label('B')]],
+    [[label(), label('B', start=2)], [label(color='bogus')]],
+    [[label(color='bogus'), label('B', start=2)]],
+    [[label(start=3.9)]],
+    [[label(start=40000)]],
+    [[label(text=5)]],
+    [[label(start=True)]],
+    [[label(), label('B', start=2)], [label(text=5)]],
+])
+def test_table_checks_match_spec_checks(blocks):
+    expected = error_of(check_blocks, blocks)
+
+    table_error = error_of(lambda: LabelTable.from_blocks(blocks, len(blocks)).check_spans())
+    assert table_error == expected